@@ -2,160 +2,426 @@
 """
 Audit complet de toutes les pages reviews GlowPicked
 Compare données hardcodées vs real-review-counts.json
+(ou vs un snapshot historique de review-history.jsonl avec --as-of)
+--built: audite le HTML construit (dist/reviews/*/index.html, JSON-LD + cartes)
 """
 
-import json
-import re
+import argparse
 import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from glowpicked.audit_cache import AuditCache
+from glowpicked.columnar import ProductColumns, RealColumns, evaluate
+from glowpicked.audit_report import FORMATS, make_reporter, summary_record
+from glowpicked.extractor import extract_products
+from glowpicked.history import NoSnapshotError, ReviewHistory, history_path
+from glowpicked.html_audit import conservative_round_down, extract_built_page, find_built_pages
+from glowpicked.profiling import PROFILER, init_worker
+from glowpicked.watch import watch_batches
+from glowpicked.realdata import open_real_data
+
+# Configuration
+REVIEWS_DIR = Path('/Users/alfred/.openclaw/workspace/projects/glowpicked/site/src/pages/reviews')
+REAL_DATA_PATH = '/Users/alfred/.openclaw/workspace/projects/glowpicked/data/real-review-counts.json'
+DIST_DIR = Path('/Users/alfred/.openclaw/workspace/projects/glowpicked/site/dist')
+CACHE_PATH = Path(REAL_DATA_PATH).parent / '.audit-cache.pickle'
+PROFILE_PATH = 'audit-profile.json'
+
 def extract_product_data(file_path):
     """Extract ASIN, rating, reviewCount from Astro file"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Find all products with ASIN, rating, reviewCount patterns
-        # Pattern for both JS and JSON format
-        pattern1 = r'{\s*name:\s*["\']([^"\']+)["\']\s*,\s*asin:\s*["\']([A-Z0-9]+)["\']\s*,\s*rating:\s*([\d.]+)\s*,\s*reviewCount:\s*(\d+)'
-        pattern2 = r'{\s*["\']name["\']\s*:\s*["\']([^"\']+)["\']\s*,\s*["\']asin["\']\s*:\s*["\']([A-Z0-9]+)["\']\s*,\s*["\']rating["\']\s*:\s*([\d.]+)\s*,\s*["\']reviewCount["\']\s*:\s*(\d+)'
-        
+        name = os.path.basename(file_path)
+        with PROFILER.phase('read', name) as span:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            span.add(len(content))
+        with PROFILER.phase('extract', name, len(content)):
+            extracted = extract_products(content)
         products = []
-        matches1 = re.findall(pattern1, content, re.MULTILINE | re.DOTALL)
-        matches2 = re.findall(pattern2, content, re.MULTILINE | re.DOTALL)
-        
-        all_matches = matches1 + matches2
-        
-        for match in all_matches:
-            name, asin, rating, reviewCount = match
+        for product in extracted:
+            # Products without rating/reviewCount (no fallback) can't be audited
+            if 'rating' not in product or 'reviewCount' not in product:
+                continue
             products.append({
-                'name': name.strip(),
-                'asin': asin.strip(), 
-                'rating': float(rating),
-                'reviewCount': int(reviewCount),
-                'file': os.path.basename(file_path)
+                'name': product['name'],
+                'asin': product['asin'],
+                'rating': float(product['rating']),
+                'reviewCount': int(product['reviewCount']),
+                'file': name
             })
             
         return products
         
     except Exception as e:
-        print(f"❌ Erreur lecture {file_path}: {e}")
+        print(f"❌ Erreur lecture {file_path}: {e}", file=sys.stderr)
         return []
 
-def load_real_data():
-    """Load real review data"""
+def load_real_data(path=REAL_DATA_PATH, as_of=None, history=None):
+    """Load real review data (binary sidecar if fresh, else JSON), or the snapshot as of a date.
+
+    Raises NoSnapshotError when there is no snapshot as of that date.
+    """
+    if as_of:
+        return ReviewHistory(history or history_path(path)).as_of(as_of, strict=True)
     try:
-        with open('/Users/alfred/.openclaw/workspace/projects/glowpicked/data/real-review-counts.json', 'r') as f:
-            return json.load(f)
+        return open_real_data(path)
     except Exception as e:
-        print(f"❌ Erreur lecture real data: {e}")
+        print(f"❌ Erreur lecture real data: {e}", file=sys.stderr)
         return {}
 
-def audit_all_pages():
-    """Audit all review pages"""
-    print("🔍 AUDIT COMPLET - TOUTES LES PAGES REVIEWS")
-    print("=" * 80)
+def check_product(product, real_data):
+    """Compare one product to real data.
+
+    Returns (real_rating, real_reviews, rating_error, reviews_error).
+    """
+    real = real_data.get(product['asin'], {})
+    if real is None:
+        real = {}
+    real_rating = real.get('rating', 'N/A') if real else 'N/A'
+    real_reviews = real.get('reviews', 'N/A') if real else 'N/A'
+    
+    # Check for errors
+    rating_error = False
+    reviews_error = False
+    
+    if isinstance(real_rating, (int, float)):
+        if abs(product['rating'] - real_rating) > 0.05:  # 0.05 tolerance
+            rating_error = True
+    else:
+        rating_error = True  # No real data available
+        
+    if isinstance(real_reviews, (int, float)):
+        # Allow 10% tolerance or 1000 reviews, whichever is larger
+        tolerance = max(real_reviews * 0.1, 1000)
+        if abs(product['reviewCount'] - real_reviews) > tolerance:
+            reviews_error = True
+    else:
+        reviews_error = True  # No real data available
+    
+    return real_rating, real_reviews, rating_error, reviews_error
+
+def check_built_product(product, real_data):
+    """check_product() of a built page: the site renders the real review count rounded down
+    (conservativeRoundDown), so a count within tolerance of either value is correct"""
+    checked = check_product(product, real_data)
+    real_rating, real_reviews, rating_error, reviews_error = checked
+    if reviews_error and isinstance(real_reviews, (int, float)):
+        rounded = {'rating': real_rating, 'reviews': conservative_round_down(real_reviews)}
+        reviews_error = check_product(product, {product['asin']: rounded})[3]
+    return real_rating, real_reviews, rating_error, reviews_error
+
+def iter_page_products(astro_files, jobs=1, cache=None, extract=extract_product_data):
+    """Yield (file_path, products) for each page, in the order of astro_files.
+
+    With jobs > 1 the extraction is spread over a process pool; results are
+    still yielded in input order so the report is identical to a serial run.
+    With a cache, only pages whose content changed are extracted again.
+    `extract` must be a module-level function (it is pickled for the pool).
+    """
+    cached = {}
+    to_parse = astro_files
+    if cache is not None:
+        for file_path in astro_files:
+            products = cache.cached_products(file_path)
+            if products is not None:
+                cached[file_path] = products
+        to_parse = [f for f in astro_files if f not in cached]
+
+    if jobs <= 1 or len(to_parse) < 2:
+        parsed = map(extract, to_parse)
+        executor = None
+    else:
+        # Big chunks keep IPC overhead low on catalogs with thousands of pages
+        chunksize = max(1, len(to_parse) // (jobs * 4))
+        executor = ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                                       initargs=(PROFILER.worker_config(),))
+        parsed = executor.map(extract, to_parse, chunksize=chunksize)
+
+    try:
+        for file_path in astro_files:
+            products = cached.get(file_path)
+            if products is None:
+                products = next(parsed)
+                if cache is not None:
+                    cache.store_products(file_path, products)
+            yield file_path, products
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+def check_columnar(pages, real_data):
+    """Collect every page's products, then check them all in one vectorized pass.
+
+    Returns (pages, checks): the collected (file_path, products) list and an
+    iterator of check_product()-shaped results in the same row order.
+    """
+    pages = list(pages)
+    columns = ProductColumns()
+    for _, products in pages:
+        columns.extend(products)
+    with PROFILER.phase('check_columnar'):
+        return pages, evaluate(columns, RealColumns(real_data)).rows()
+
+def audit_all_pages(reviews_dir=REVIEWS_DIR, real_data_path=REAL_DATA_PATH, jobs=1, cache_path=None,
+                    output_format='text', out=None, columnar=False, as_of=None, history=None):
+    """Audit all review pages; return the summary record"""
+    reporter = make_reporter(output_format, out)
     
     # Load real data
-    real_data = load_real_data()
-    print(f"📊 Vraies données chargées: {len(real_data)} produits")
-    print()
+    with PROFILER.phase('load_real_data'):
+        real_data = load_real_data(real_data_path, as_of, history)
+    if as_of:
+        reporter.note(f"🗂️  Snapshot historique au {as_of}: {len(real_data)} ASINs")
+    reporter.start(len(real_data))
     
     # Find all review pages
-    reviews_dir = Path('/Users/alfred/.openclaw/workspace/projects/glowpicked/site/src/pages/reviews')
-    astro_files = list(reviews_dir.glob('*.astro'))
-    astro_files = [f for f in astro_files if f.name != 'index.astro']  # Skip index
+    reviews_dir = Path(reviews_dir)
+    with PROFILER.phase('discover'):
+        astro_files = list(reviews_dir.glob('*.astro'))
+        astro_files = [f for f in astro_files if f.name != 'index.astro']  # Skip index
+    
+    cache = None
+    if cache_path:
+        with PROFILER.phase('cache_load'):
+            cache = AuditCache(cache_path)
+            cache.sync_real_data(real_data)
     
-    all_errors = []
+    error_count = 0
     total_products = 0
+    pages = iter_page_products(sorted(astro_files), jobs, cache)
+    if columnar:
+        pages, checks = check_columnar(pages, real_data)
     
-    for file_path in sorted(astro_files):
-        print(f"📝 ANALYSE: {file_path.name}")
-        print("-" * 60)
+    for file_path, products in pages:
+        reporter.page_start(file_path.name)
         
-        products = extract_product_data(file_path)
         total_products += len(products)
         
         if not products:
-            print("   ⚠️  Aucun produit trouvé (format non reconnu)")
-            print()
+            reporter.page_empty(file_path.name)
             continue
-            
-        page_errors = []
         
-        for product in products:
-            asin = product['asin']
-            site_rating = product['rating']
-            site_reviews = product['reviewCount']
-            name = product['name']
-            
-            # Get real data
-            real = real_data.get(asin, {})
-            if real is None:
-                real = {}
-            real_rating = real.get('rating', 'N/A') if real else 'N/A'
-            real_reviews = real.get('reviews', 'N/A') if real else 'N/A'
-            
-            # Check for errors
-            rating_error = False
-            reviews_error = False
-            
-            if isinstance(real_rating, (int, float)):
-                if abs(site_rating - real_rating) > 0.05:  # 0.05 tolerance
-                    rating_error = True
-            else:
-                rating_error = True  # No real data available
+        with PROFILER.phase('check', file_path.name):
+            for product in products:
+                if columnar:
+                    real_rating, real_reviews, rating_error, reviews_error = next(checks)
+                elif cache is not None:
+                    real_rating, real_reviews, rating_error, reviews_error = cache.check(product, real_data, check_product)
+                else:
+                    real_rating, real_reviews, rating_error, reviews_error = check_product(product, real_data)
                 
-            if isinstance(real_reviews, (int, float)):
-                # Allow 10% tolerance or 1000 reviews, whichever is larger
-                tolerance = max(real_reviews * 0.1, 1000)
-                if abs(site_reviews - real_reviews) > tolerance:
-                    reviews_error = True
-            else:
-                reviews_error = True  # No real data available
-            
-            status = "✅ OK"
-            if rating_error or reviews_error:
-                status = "❌ ERREUR"
-                page_errors.append({
-                    'asin': asin,
-                    'name': name,
+                if rating_error or reviews_error:
+                    error_count += 1
+                
+                reporter.product({
+                    'asin': product['asin'],
+                    'name': product['name'],
                     'file': file_path.name,
-                    'site_rating': site_rating,
+                    'site_rating': product['rating'],
                     'real_rating': real_rating,
-                    'site_reviews': site_reviews, 
+                    'site_reviews': product['reviewCount'],
                     'real_reviews': real_reviews,
                     'rating_error': rating_error,
                     'reviews_error': reviews_error
                 })
-            
-            print(f"   {asin[:12]} | {name[:25]:<25} | {site_rating:>4} vs {real_rating:>4} | {site_reviews:>8,} vs {real_reviews:>8} | {status}")
         
-        all_errors.extend(page_errors)
-        print()
+        reporter.page_end(file_path.name)
     
     # Summary
-    print("📊 RÉSUMÉ AUDIT COMPLET")
-    print("=" * 80)
-    print(f"📄 Pages analysées: {len(astro_files)}")
-    print(f"🛍️  Produits analysés: {total_products}")
-    print(f"❌ Erreurs trouvées: {len(all_errors)}")
-    print(f"✅ Précision: {((total_products - len(all_errors)) / total_products * 100):.1f}%")
-    print()
+    summary = summary_record(len(astro_files), total_products, error_count)
+    reporter.summary(summary)
     
-    if all_errors:
-        print("🚨 ERREURS DÉTAILLÉES:")
-        print("-" * 80)
-        for error in all_errors:
-            print(f"📄 {error['file']}")
-            print(f"   🛍️  {error['name']} ({error['asin']})")
-            if error['rating_error']:
-                print(f"   ⭐ Rating: {error['site_rating']} (site) vs {error['real_rating']} (réel)")
-            if error['reviews_error']:
-                print(f"   📊 Reviews: {error['site_reviews']:,} (site) vs {error['real_reviews']} (réel)")
-            print()
+    if cache is not None:
+        with PROFILER.phase('cache_save'):
+            cache.save()
+        reporter.note(f"💾 Cache: {cache.stats['hits'] + cache.stats['rehashed']} pages en cache, "
+                      f"{cache.stats['parsed']} re-parsées, {cache.stats['rechecked']} produits re-vérifiés")
     
-    return all_errors, total_products
+    return summary
+
+def report_products(reporter, file_name, products, real_data, check=check_product):
+    """check() every product of a page and report it; return the number of errors"""
+    errors = 0
+    for product in products:
+        real_rating, real_reviews, rating_error, reviews_error = check(product, real_data)
+        if rating_error or reviews_error:
+            errors += 1
+        reporter.product({
+            'asin': product['asin'],
+            'name': product['name'],
+            'file': file_name,
+            'site_rating': product['rating'],
+            'real_rating': real_rating,
+            'site_reviews': product['reviewCount'],
+            'real_reviews': real_reviews,
+            'rating_error': rating_error,
+            'reviews_error': reviews_error
+        })
+    return errors
+
+def audit_built_pages(dist_dir=DIST_DIR, real_data_path=REAL_DATA_PATH, jobs=1,
+                      output_format='text', out=None, as_of=None, history=None):
+    """Audit the built HTML (JSON-LD ItemList + cards) of every review page; return the summary record"""
+    reporter = make_reporter(output_format, out)
+
+    with PROFILER.phase('load_real_data'):
+        real_data = load_real_data(real_data_path, as_of, history)
+    if as_of:
+        reporter.note(f"🗂️  Snapshot historique au {as_of}: {len(real_data)} ASINs")
+    reporter.note(f"🏗️  HTML construit: {Path(dist_dir) / 'reviews'}")
+    reporter.start(len(real_data))
+
+    with PROFILER.phase('discover'):
+        html_files = find_built_pages(dist_dir)
+    error_count = 0
+    issue_count = 0
+    total_products = 0
+
+    for file_path, page in iter_page_products(html_files, jobs, extract=extract_built_page):
+        file_name = f"{file_path.parent.name}/{file_path.name}"
+        products = page['products']
+        reporter.page_start(file_name)
+        total_products += len(products)
+
+        for issue in page['issues']:
+            issue_count += 1
+            reporter.issue(issue)
+
+        if not products:
+            reporter.page_empty(file_name)
+            continue
+
+        with PROFILER.phase('check', file_name):
+            error_count += report_products(reporter, file_name, products, real_data, check_built_product)
+        reporter.page_end(file_name)
+
+    summary = summary_record(len(html_files), total_products, error_count, issue_count)
+    reporter.summary(summary)
+    return summary
+
+def watch_audit(reviews_dir=REVIEWS_DIR, real_data_path=REAL_DATA_PATH, output_format='text', out=None):
+    """--watch: full audit, then re-audit only what each burst of changes touches.
+
+    Real data and every page's products stay in memory. A changed page is
+    re-extracted and re-checked; a change of the real data re-checks only the
+    pages that show an ASIN whose entry changed. Runs until interrupted.
+    """
+    reviews_dir = Path(reviews_dir).resolve()
+    real_path = Path(real_data_path).resolve()
+
+    def is_page(path):
+        return path.parent == reviews_dir and path.suffix == '.astro' and path.name != 'index.astro'
+
+    real_data = dict(load_real_data(real_path).items())
+    pages = {path.resolve(): products for path, products in
+             iter_page_products(sorted(f for f in reviews_dir.glob('*.astro') if is_page(f)))}
+    page_errors = {}
+
+    # One reporter for the whole session: the CSV header is written once
+    reporter = make_reporter(output_format, out)
+
+    def audit_pages(paths):
+        for path in sorted(paths):
+            products = pages.get(path)
+            if products is None:
+                page_errors.pop(path, None)
+                reporter.note(f"🗑️  {path.name} supprimée")
+                continue
+            reporter.page_start(path.name)
+            if not products:
+                page_errors[path] = 0
+                reporter.page_empty(path.name)
+                continue
+            page_errors[path] = report_products(reporter, path.name, products, real_data)
+            reporter.page_end(path.name)
+        reporter.summary(summary_record(len(pages), sum(len(p) for p in pages.values()),
+                                        sum(page_errors.values())))
+
+    reporter.start(len(real_data))
+    audit_pages(pages)
+    reporter.note(f"👀 Surveillance de {reviews_dir} et {real_path.name} (Ctrl+C pour arrêter)")
+
+    for batch in watch_batches([reviews_dir, real_path.parent]):
+        start = time.perf_counter()
+        touched = set()
+        if real_path in batch:
+            new_data = dict(load_real_data(real_path).items())
+            changed = {asin for asin in real_data.keys() | new_data.keys() if real_data.get(asin) != new_data.get(asin)}
+            real_data = new_data
+            touched.update(path for path, products in pages.items()
+                           if any(product['asin'] in changed for product in products))
+            reporter.note(f"📊 Vraies données rechargées: {len(changed)} ASIN(s) modifié(s)")
+        for path in batch:
+            if not is_page(path):
+                continue
+            if path.exists():
+                pages[path] = extract_product_data(path)
+            else:
+                pages.pop(path, None)
+            touched.add(path)
+        if not touched:
+            continue
+        reporter.note(f"🔄 {len(batch)} fichier(s) modifié(s) → {len(touched)} page(s) à ré-auditer")
+        audit_pages(touched)
+        reporter.note(f"⚡ Ré-audit en {(time.perf_counter() - start) * 1000:.0f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit des pages reviews vs real-review-counts.json")
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help="Nombre de processus pour l'extraction (0 = tous les coeurs)")
+    parser.add_argument('--reviews-dir', default=REVIEWS_DIR, help="Dossier des pages .astro")
+    parser.add_argument('--real-data', default=REAL_DATA_PATH, help="Chemin vers real-review-counts.json")
+    parser.add_argument('--cache', nargs='?', const=CACHE_PATH, default=None, metavar='PATH',
+                        help=f"Audit incrémental: ne re-parse que les pages modifiées (défaut: {CACHE_PATH})")
+    parser.add_argument('--format', choices=FORMATS, default='text',
+                        help="text: rapport console; jsonl/csv: un enregistrement par produit, en streaming")
+    parser.add_argument('--columnar', action='store_true',
+                        help="Vérifie tous les produits en une passe vectorisée (NumPy si installé)")
+    parser.add_argument('--as-of', metavar='YYYY-MM-DD',
+                        help="Audit contre les vraies données telles qu'elles étaient à cette date")
+    parser.add_argument('--history', metavar='PATH',
+                        help="Historique des snapshots (défaut: review-history.jsonl à côté de --real-data)")
+    parser.add_argument('--built', nargs='?', const=DIST_DIR, default=None, metavar='DIST_DIR',
+                        help=f"Audite le HTML construit (JSON-LD + cartes data-asin) au lieu des .astro (défaut: {DIST_DIR})")
+    parser.add_argument('--profile', nargs='?', const=PROFILE_PATH, default=None, metavar='TRACE',
+                        help=f"Temps mur/CPU/octets par phase et par page + trace Chrome/Perfetto (défaut: {PROFILE_PATH})")
+    parser.add_argument('--cprofile', action='store_true',
+                        help="Avec --profile: cProfile du processus principal (top fonctions + TRACE.pstats)")
+    parser.add_argument('--watch', action='store_true',
+                        help="Reste actif: ré-audite les pages modifiées et les ASINs dont les vraies données changent")
+    args = parser.parse_args()
+
+    if args.watch:
+        # The watch loop keeps everything in memory and re-audits serially
+        ignored = [flag for flag, used in (('--jobs', args.jobs != 1), ('--cache', args.cache),
+                                           ('--as-of', args.as_of), ('--history', args.history),
+                                           ('--built', args.built), ('--columnar', args.columnar),
+                                           ('--profile', args.profile), ('--cprofile', args.cprofile)) if used]
+        if ignored:
+            parser.error(f"--watch ne prend pas en charge {', '.join(ignored)}")
+        try:
+            watch_audit(args.reviews_dir, args.real_data, args.format)
+        except KeyboardInterrupt:
+            print("\n👋 Surveillance arrêtée", file=sys.stderr)
+        return
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    if args.profile:
+        PROFILER.start(cprofile=args.cprofile)
+    try:
+        if args.built:
+            audit_built_pages(args.built, args.real_data, jobs, args.format, as_of=args.as_of, history=args.history)
+        else:
+            audit_all_pages(args.reviews_dir, args.real_data, jobs, args.cache, args.format, columnar=args.columnar,
+                            as_of=args.as_of, history=args.history)
+    except NoSnapshotError as e:
+        sys.exit(f"❌ {e}: audit --as-of {args.as_of} impossible")
+    if args.profile:
+        # Same stream as the reporter notes: machine formats keep stdout clean
+        PROFILER.report(args.profile, sys.stdout if args.format == 'text' else sys.stderr)
 
 if __name__ == "__main__":
-    audit_all_pages()
\ No newline at end of file
+    main()
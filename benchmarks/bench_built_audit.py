@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark audit du HTML construit - audit-all-pages.py --built
+
+Écrit N pages dist/reviews/<slug>/index.html synthétiques (~35 KB, JSON-LD
+Organization + ItemList de 6 produits, cartes data-asin) et les vraies
+données correspondantes, puis chronomètre l'audit complet en série et avec
+un pool de processus. Vérifie que les deux runs donnent le même résumé.
+
+Usage: python3 benchmarks/bench_built_audit.py [--pages 20000] [--jobs 0]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from glowpicked.scripts import load_script  # noqa: E402
+
+PRODUCTS_PER_PAGE = 6
+ORGANIZATION = json.dumps({
+    '@context': 'https://schema.org', '@type': 'Organization', 'name': 'GlowPicked',
+    'url': 'https://glowpicked.com', 'sameAs': [],
+}, indent=2)
+# Stands in for the CSS, navigation and review text of a real page
+FILLER = '<p class="review-text">' + 'Lightweight texture, fragrance-free formula. ' * 40 + '</p>\n'
+
+
+def page_products(page):
+    return [{
+        'name': f'Synthetic Product {page}-{i}',
+        'asin': f'B{page * PRODUCTS_PER_PAGE + i:09d}',
+        'rating': 4.0 + i / 10,
+        'reviewCount': 1000 + page * 7 + i,
+    } for i in range(PRODUCTS_PER_PAGE)]
+
+
+def built_page(page, products):
+    item_list = {
+        '@context': 'https://schema.org',
+        '@type': 'ItemList',
+        'name': f'Synthetic Category {page}',
+        'numberOfItems': len(products),
+        'itemListElement': [{
+            '@type': 'ListItem',
+            'position': i + 1,
+            'item': {
+                '@type': 'Product',
+                'name': p['name'],
+                'url': f"https://www.amazon.com/dp/{p['asin']}/ref=nosim?tag=glowpicked0c-20",
+                'aggregateRating': {'@type': 'AggregateRating', 'ratingValue': p['rating'],
+                                    'bestRating': 5, 'reviewCount': p['reviewCount']},
+            },
+        } for i, p in enumerate(products)],
+    }
+    cards = ''.join(
+        f'<div class="product-card" data-asin="{p["asin"]}"><h3>{p["name"]}</h3>{FILLER * 2}</div>\n'
+        for p in products
+    )
+    return (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8">'
+        f'<script type="application/ld+json">\n{ORGANIZATION}\n</script>'
+        f'<script type="application/ld+json">{json.dumps(item_list)}</script></head>\n'
+        f'<body>{FILLER * 6}{cards}</body></html>\n'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--pages', type=int, default=20000)
+    parser.add_argument('--jobs', type=int, default=0, help="Processus du run parallèle (0 = tous les coeurs)")
+    args = parser.parse_args()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    audit = load_script('audit', 'audit-all-pages.py')
+    with tempfile.TemporaryDirectory() as tmp:
+        real_data = {}
+        size = 0
+        for page in range(args.pages):
+            products = page_products(page)
+            for p in products:
+                real_data[p['asin']] = {'reviews': p['reviewCount'], 'rating': p['rating']}
+            page_dir = Path(tmp, 'dist', 'reviews', f'category-{page:06d}')
+            page_dir.mkdir(parents=True)
+            html = built_page(page, products)
+            size += len(html)
+            (page_dir / 'index.html').write_text(html, encoding='utf-8')
+        real_path = os.path.join(tmp, 'real-review-counts.json')
+        with open(real_path, 'w') as f:
+            json.dump(real_data, f)
+
+        results = {}
+        for label, workers in (('série', 1), (f'{jobs} processus', jobs)):
+            start = time.perf_counter()
+            with contextlib.redirect_stderr(io.StringIO()):
+                summary = audit.audit_built_pages(Path(tmp, 'dist'), real_path, workers,
+                                                  output_format='jsonl', out=io.StringIO())
+            results[label] = (summary, time.perf_counter() - start)
+
+        summaries = [summary for summary, _ in results.values()]
+        assert summaries[0] == summaries[1], summaries
+        assert summaries[0]['errors'] == 0 and summaries[0]['issues'] == 0, summaries[0]
+
+        print(f"📄 {args.pages:,} pages construites ({size / 1e6:.0f} Mo), "
+              f"{summaries[0]['products']:,} produits")
+        for label, (_, seconds) in results.items():
+            print(f"⏱️  {label:<14} {seconds:>7.2f}s  ({seconds / args.pages * 1000:.2f}ms / page)")
+        print("✅ Résumés identiques, aucune erreur")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark audit en colonnes - check_product() en boucle vs glowpicked.columnar
+
+Génère N lignes produit synthétiques (ASINs connus, inconnus, entrées null ou
+incomplètes) contre un jeu de vraies données, vérifie que les deux chemins
+donnent exactement les mêmes résultats puis compare leurs temps.
+
+Usage: python3 benchmarks/bench_columnar.py [--rows 1000000] [--asins 200000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from glowpicked import columnar  # noqa: E402
+from glowpicked.columnar import ProductColumns, RealColumns, evaluate  # noqa: E402
+from glowpicked.scripts import load_script  # noqa: E402
+
+
+def synthetic_real(count, rng):
+    real = {}
+    for i in range(count):
+        entry = {'reviews': rng.randrange(50, 200000), 'rating': rng.randrange(30, 50) / 10}
+        roll = rng.random()
+        if roll < 0.01:
+            entry = None
+        elif roll < 0.02:
+            del entry['rating']
+        elif roll < 0.03:
+            entry['reviews'] = None
+        real[f"B{i:09d}"] = entry
+    return real
+
+
+def synthetic_rows(count, real_data, rng):
+    asins = list(real_data)
+    rows = []
+    for _ in range(count):
+        # ~5% of rows point at ASINs missing from the real data
+        asin = rng.choice(asins) if rng.random() > 0.05 else f"X{rng.randrange(10 ** 9):09d}"
+        real = real_data.get(asin) or {}
+        rating = real.get('rating') or 4.5
+        reviews = real.get('reviews') or 10000
+        # Mostly within tolerance, with some drift
+        rows.append({
+            'asin': asin,
+            'rating': round(rating + rng.choice((0, 0, 0, 0.1, -0.2)), 1),
+            'reviewCount': int(reviews * rng.choice((1, 1, 1.05, 1.5))),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--asins', type=int, default=200_000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    real_data = synthetic_real(args.asins, rng)
+    rows = synthetic_rows(args.rows, real_data, rng)
+    check_product = load_script('audit', 'audit-all-pages.py').check_product
+
+    start = time.perf_counter()
+    expected = [check_product(row, real_data) for row in rows]
+    loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    real = RealColumns(real_data)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    columns = ProductColumns()
+    columns.extend(rows)
+    result = evaluate(columns, real)
+    errors = result.error_count()
+    vectorized = time.perf_counter() - start
+
+    assert list(result.rows()) == expected
+    assert errors == sum(1 for r in expected if r[2] or r[3])
+
+    backend = 'numpy' if columnar.np is not None else 'array'
+    print(f"📊 {args.rows:,} lignes | {args.asins:,} ASINs réels | {errors:,} erreurs | backend {backend}")
+    print(f"🔁 Boucle check_product: {loop * 1000:>9.1f}ms")
+    print(f"🧮 Colonnes (évaluation): {vectorized * 1000:>8.1f}ms (+ {build * 1000:.1f}ms pour indexer les vraies données)")
+    print("✅ Résultats identiques")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark extracteur - regex historiques vs glowpicked.extractor
+
+Génère des pages Astro synthétiques (format JS et JSON) de 10 KB à 10 MB et
+compare le temps d'extraction des deux regex DOTALL d'origine (audit +
+générateur) à l'extracteur en une passe.
+
+Usage: python3 benchmarks/bench_extractor.py [--sizes 10000,100000,...]
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from glowpicked.extractor import extract_products  # noqa: E402
+
+# Regex d'origine (audit-all-pages.py / generate-all-dynamic-pages.py), gardées comme référence
+LEGACY_AUDIT = [
+    re.compile(r'{\s*name:\s*["\']([^"\']+)["\']\s*,\s*asin:\s*["\']([A-Z0-9]+)["\']\s*,\s*rating:\s*([\d.]+)\s*,\s*reviewCount:\s*(\d+)', re.MULTILINE | re.DOTALL),
+    re.compile(r'{\s*["\']name["\']\s*:\s*["\']([^"\']+)["\']\s*,\s*["\']asin["\']\s*:\s*["\']([A-Z0-9]+)["\']\s*,\s*["\']rating["\']\s*:\s*([\d.]+)\s*,\s*["\']reviewCount["\']\s*:\s*(\d+)', re.MULTILINE | re.DOTALL),
+]
+LEGACY_GENERATOR = [
+    re.compile(r'{\s*name:\s*["\']([^"\']+)["\']\s*,\s*asin:\s*["\']([A-Z0-9]+)["\']\s*,\s*rating:\s*([\d.]+)\s*,\s*reviewCount:\s*(\d+)\s*,\s*pros:\s*\[(.*?)\]\s*,\s*con:\s*["\']([^"\']+)["\']', re.MULTILINE | re.DOTALL),
+    re.compile(r'{\s*["\']name["\']\s*:\s*["\']([^"\']+)["\']\s*,\s*["\']asin["\']\s*:\s*["\']([A-Z0-9]+)["\']\s*,\s*["\']rating["\']\s*:\s*([\d.]+)\s*,\s*["\']reviewCount["\']\s*:\s*(\d+)\s*,\s*["\']pros["\']\s*:\s*\[(.*?)\]\s*,\s*["\']con["\']\s*:\s*["\']([^"\']+)["\']', re.MULTILINE | re.DOTALL),
+]
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+
+
+def js_product(i):
+    return (
+        '    {\n'
+        f'      name: "Synthetic Product {i}",\n'
+        f'      asin: "B{i:09d}",\n'
+        f'      rating: 4.{i % 10},\n'
+        f'      reviewCount: {1000 + i * 7},\n'
+        '      pros: [\n'
+        '        "Lightweight texture",\n'
+        '        "Fragrance-free formula",\n'
+        '        "Great value"\n'
+        '      ],\n'
+        '      con: "Small tube"\n'
+        '    }'
+    )
+
+
+def json_product(i):
+    return json.dumps({
+        'name': f'Synthetic Product {i}',
+        'asin': f'B{i:09d}',
+        'rating': 4.0 + (i % 10) / 10,
+        'reviewCount': 1000 + i * 7,
+        'pros': ['Lightweight texture', 'Fragrance-free formula', 'Great value'],
+        'con': 'Small tube',
+    }, indent=6)
+
+
+def adversarial_product(i):
+    """JS product with a long pros array and a key between `pros` and `con`.
+
+    The generator regex `pros:\\s*\\[(.*?)\\]\\s*,\\s*con:` never finds its
+    terminator, so each product makes the lazy match scan to the end of file.
+    """
+    pros = ',\n'.join(f'        "Benefit number {j} for product {i}"' for j in range(20))
+    return (
+        '    {\n'
+        f'      name: "Synthetic Product {i}",\n'
+        f'      asin: "B{i:09d}",\n'
+        f'      rating: 4.{i % 10},\n'
+        f'      reviewCount: {1000 + i * 7},\n'
+        f'      pros: [\n{pros}\n      ],\n'
+        '      badge: "bestseller",\n'
+        '      con: "Small tube"\n'
+        '    }'
+    )
+
+
+STYLES = {'js': js_product, 'json': json_product, 'adversarial': adversarial_product}
+
+
+def build_page(target_bytes, style):
+    """Page Astro synthétique d'environ target_bytes octets"""
+    make = STYLES[style]
+    items = []
+    size = 0
+    i = 0
+    while size < target_bytes:
+        item = make(i)
+        items.append(item)
+        size += len(item) + 2
+        i += 1
+    return (
+        "---\nimport Layout from '../../layouts/Layout.astro';\n\n"
+        "const products = {\n  budget: [\n" + ',\n'.join(items) + "\n  ]\n};\n---\n"
+        "<Layout title=\"Synthetic\"><div>{products.budget.length}</div></Layout>\n"
+    ), i
+
+
+def legacy_extract(content, patterns):
+    count = 0
+    for pattern in patterns:
+        count += len(pattern.findall(content))
+    return count
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help="Tailles de page en octets, séparées par des virgules")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--styles', default='js,json,adversarial',
+                        help="Formats de page: " + ', '.join(STYLES))
+    parser.add_argument('--max-adversarial', type=int, default=1_000_000,
+                        help="Taille max pour le format adversarial (la regex générateur y est quadratique)")
+    args = parser.parse_args()
+
+    print(f"{'format':<11} {'taille':>10} {'produits':>9} | {'audit regex':>12} {'gen regex':>12} {'extractor':>12}")
+    print('-' * 77)
+    for style in args.styles.split(','):
+        for target in (int(s) for s in args.sizes.split(',')):
+            if style == 'adversarial' and target > args.max_adversarial:
+                continue
+            content, expected = build_page(target, style)
+            t_audit, n_audit = best_of(lambda: legacy_extract(content, LEGACY_AUDIT), args.repeat)
+            t_gen, n_gen = best_of(lambda: legacy_extract(content, LEGACY_GENERATOR), args.repeat)
+            t_new, products = best_of(lambda: extract_products(content), args.repeat)
+            assert len(products) == expected, (len(products), expected)
+            print(f"{style:<11} {len(content):>10,} {expected:>9,} | "
+                  f"{t_audit * 1000:>10.1f}ms {t_gen * 1000:>10.1f}ms {t_new * 1000:>10.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark générateur - rendu des templates vs écriture disque
+
+Rend N pages reviews synthétiques (3 budget + 3 luxury chacune) avec le
+template précompilé de generate-all-dynamic-pages.py, puis les écrit dans un
+dossier temporaire. Affiche le temps de rendu, le temps d'écriture (avec
+fsync optionnel) et la part de chacun: le rendu doit rester minoritaire.
+
+Usage: python3 benchmarks/bench_generator.py [--pages 10000] [--fsync]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from glowpicked.scripts import load_script  # noqa: E402
+
+
+def synthetic_products(page, count=6):
+    return [
+        {
+            'name': f'Synthetic Product {page}-{i}',
+            'asin': f'B{page * count + i:09d}',
+            'rating': 4.0 + i / 10,
+            'reviewCount': 1000 + page * 7 + i,
+            'pros': ['Lightweight texture', 'Fragrance-free formula', 'Great value'],
+            'con': 'Small tube',
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--pages', type=int, default=10_000)
+    parser.add_argument('--fsync', action='store_true', help="fsync chaque page (écriture durable)")
+    args = parser.parse_args()
+
+    generator = load_script('generator', 'generate-all-dynamic-pages.py')
+    catalog = [synthetic_products(page) for page in range(args.pages)]
+
+    start = time.perf_counter()
+    pages = [
+        generator.generate_dynamic_page_template(
+            f'category-{page}', f'Best Category {page} 2026',
+            'We researched Amazon customer reviews to find the top picks.',
+            products[:3], products[3:6])
+        for page, products in enumerate(catalog)
+    ]
+    render = time.perf_counter() - start
+    total_bytes = sum(len(page.encode('utf-8')) for page in pages)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        for page, content in enumerate(pages):
+            with open(os.path.join(tmp, f'category-{page}.astro'), 'w', encoding='utf-8') as f:
+                f.write(content)
+                if args.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+        write = time.perf_counter() - start
+
+    total = render + write
+    print(f"📄 {args.pages:,} pages | {total_bytes / 1e6:.1f} MB | {total_bytes / args.pages:,.0f} octets/page")
+    print(f"🧩 Rendu:    {render * 1000:>9.1f}ms ({render / total:.0%}) | {render / args.pages * 1e6:.1f}µs/page")
+    print(f"💾 Écriture: {write * 1000:>9.1f}ms ({write / total:.0%}) | {write / args.pages * 1e6:.1f}µs/page"
+          f"{' (fsync)' if args.fsync else ''}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark historique - snapshots append-only vs une copie JSON complète par semaine
+
+Génère N semaines de vraies données synthétiques (une partie des ASINs bouge
+chaque semaine), les ajoute à un ReviewHistory puis mesure la taille sur
+disque, "as of" (dernier snapshot et une date ancienne), l'évolution d'un
+ASIN et les top movers. Vérifie au passage que chaque as_of() redonne
+exactement la semaine d'origine.
+
+Usage: python3 benchmarks/bench_history.py [--asins 20000] [--weeks 260]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from glowpicked.history import ReviewHistory  # noqa: E402
+
+
+def weeks_of_data(asins, weeks, rng):
+    current = {f"B{i:09d}": {'reviews': rng.randrange(50, 200000), 'rating': rng.randrange(30, 50) / 10}
+               for i in range(asins)}
+    day = date(2021, 1, 4)
+    for _ in range(weeks):
+        current = dict(current)
+        # ~20% of the products get new reviews, a few change rating
+        for asin in rng.sample(list(current), asins // 5):
+            entry = current[asin]
+            rating = entry['rating']
+            if rng.random() < 0.05:
+                rating = min(5.0, max(1.0, round(rating + rng.choice((-0.1, 0.1)), 1)))
+            current[asin] = {'reviews': entry['reviews'] + rng.randrange(1, 300), 'rating': rating}
+        yield day.isoformat(), current
+        day += timedelta(days=7)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--asins', type=int, default=20000)
+    parser.add_argument('--weeks', type=int, default=260)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        history = ReviewHistory(os.path.join(tmp, 'review-history.jsonl'))
+        checkpoints = {}
+        json_bytes = 0
+        start = time.perf_counter()
+        for i, (day, data) in enumerate(weeks_of_data(args.asins, args.weeks, rng)):
+            history.append(day, data)
+            json_bytes += len(json.dumps(data, indent=2))
+            if i in (0, args.weeks // 3, args.weeks - 1):
+                checkpoints[day] = data
+        append = (time.perf_counter() - start) * 1000 / args.weeks
+
+        history = ReviewHistory(history.path)
+        for day, data in checkpoints.items():
+            assert history.as_of(day) == data
+        first, old, last = checkpoints
+
+        _, latest_ms = timed(history.as_of)
+        _, old_ms = timed(history.as_of, old)
+        columns, range_ms = timed(history.range, 'B000000042', first, last)
+        _, movers_ms = timed(history.top_movers, first, last, 10)
+
+        size = os.path.getsize(history.path)
+        print(f"📊 {args.asins:,} ASINs × {args.weeks} semaines | {len(history)} snapshots")
+        print(f"💾 Historique: {size / 1e6:>8.1f} Mo (copies JSON complètes: {json_bytes / 1e6:.1f} Mo)")
+        print(f"➕ Append: {append:>13.1f}ms / snapshot")
+        print(f"🕐 As of dernier: {latest_ms:>6.1f}ms | as of {old}: {old_ms:.1f}ms")
+        print(f"📈 Range 1 ASIN: {range_ms:>7.1f}ms ({len(columns['dates'])} points sur {args.weeks} semaines)")
+        print(f"🚀 Top movers: {movers_ms:>9.1f}ms")
+        print("✅ Snapshots relus à l'identique")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark vraies données - json.load vs sidecar binaire (RealDataStore)
+
+Génère un real-review-counts.json synthétique de N ASINs, construit le
+sidecar, puis mesure dans un processus séparé par variante: temps de
+chargement, RSS ajoutée et temps de 10k lookups. Mesure aussi le build JS
+(JSON.parse vs src/utils/realDataStore.js) si node est disponible.
+
+Usage: python3 benchmarks/bench_realdata.py [--asins 200000]
+"""
+
+import argparse
+import json
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from glowpicked.realdata import build_sidecar, sidecar_path  # noqa: E402
+
+PY_PROBE = r'''
+import json, random, sys, time
+sys.path.insert(0, sys.argv[3])
+
+def rss_kb():
+    try:
+        with open('/proc/self/statm') as f:
+            import os
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except OSError:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss // 1024 if sys.platform == 'darwin' else rss
+
+from glowpicked.realdata import RealDataStore
+variant, path = sys.argv[1], sys.argv[2]
+before = rss_kb()
+start = time.perf_counter()
+data = json.load(open(path)) if variant == 'json' else RealDataStore(path)
+load = time.perf_counter() - start
+after = rss_kb()
+keys = [f"B{random.randrange(int(sys.argv[4])):09d}" for _ in range(10000)]
+start = time.perf_counter()
+for key in keys:
+    data.get(key)
+lookups = time.perf_counter() - start
+print(json.dumps({'load': load, 'rss_kb': after - before, 'lookups': lookups}))
+'''
+
+JS_PROBE = r'''
+const fs = require('fs');
+const [variant, path, root, n] = process.argv.slice(1);
+(async () => {
+  const { RealDataStore } = await import(root + '/src/utils/realDataStore.js');
+  global.gc && global.gc();
+  const before = process.memoryUsage().rss;
+  const start = process.hrtime.bigint();
+  const data = variant === 'json'
+    ? JSON.parse(fs.readFileSync(path, 'utf8'))
+    : new RealDataStore(fs.readFileSync(path));
+  const load = Number(process.hrtime.bigint() - start) / 1e9;
+  const after = process.memoryUsage().rss;
+  const keys = Array.from({ length: 10000 }, () => 'B' + String(Math.floor(Math.random() * n)).padStart(9, '0'));
+  const t = process.hrtime.bigint();
+  for (const k of keys) variant === 'json' ? data[k] : data.get(k);
+  const lookups = Number(process.hrtime.bigint() - t) / 1e9;
+  console.log(JSON.stringify({ load, rss_kb: Math.round((after - before) / 1024), lookups }));
+})();
+'''
+
+
+def write_synthetic(path, count):
+    rng = random.Random(42)
+    data = {
+        f"B{i:09d}": {'reviews': rng.randrange(50, 200000), 'rating': rng.randrange(30, 50) / 10}
+        for i in range(count)
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def run_probe(cmd):
+    out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def report(label, result):
+    print(f"{label:<22} load {result['load'] * 1000:>9.1f}ms | "
+          f"RSS +{result['rss_kb'] / 1024:>7.1f} MB | 10k lookups {result['lookups'] * 1000:>7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--asins', type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / 'real-review-counts.json'
+        write_synthetic(json_path, args.asins)
+        start = time.perf_counter()
+        bin_path = build_sidecar(json_path)
+        build = time.perf_counter() - start
+        print(f"📊 {args.asins:,} ASINs | JSON {json_path.stat().st_size / 1e6:.1f} MB | "
+              f"sidecar {Path(sidecar_path(json_path)).stat().st_size / 1e6:.1f} MB (conversion {build:.2f}s)")
+
+        for variant, path in (('json', json_path), ('sidecar', bin_path)):
+            report(f"python {variant}", run_probe(
+                [sys.executable, '-c', PY_PROBE, variant, str(path), str(ROOT), str(args.asins)]))
+
+        if shutil.which('node'):
+            for variant, path in (('json', json_path), ('sidecar', bin_path)):
+                report(f"node {variant}", run_probe(
+                    ['node', '-e', JS_PROBE, variant, str(path), str(ROOT), str(args.asins)]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks - extraction, audit complet et rendu sur un corpus synthétique
+
+For each corpus size (10 / 1k / 100k pages by default) a corpus is written by
+benchmarks/corpus.py in a temporary directory, then three stages are timed
+(best of --repeat):
+
+- extract: extract_product_data() of audit-all-pages.py on every page
+- audit:   audit_all_pages() end to end (JSONL report into memory)
+- render:  generate_dynamic_page_template() for every page of the catalog
+
+Results are appended to benchmarks/results.jsonl (one line per size, with the
+commit and a machine fingerprint; local to each machine, not committed) and
+compared with the last run of the same size on the same machine: a stage slower by more than --threshold percent is
+flagged as a regression (exit status 1 with --fail-on-regression).
+
+Usage: python3 benchmarks/bench_suite.py [--sizes 10,1000,100000] [--asins 20000]
+       [--repeat 3] [--jobs 1] [--no-save] [--fail-on-regression]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from corpus import build_corpus, corpus_bytes  # noqa: E402
+from glowpicked.scripts import load_script  # noqa: E402
+
+RESULTS_PATH = Path(__file__).resolve().parent / 'results.jsonl'
+DEFAULT_SIZES = '10,1000,100000'
+STAGES = ('extract', 'audit', 'render')
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def machine():
+    """Fingerprint: results are only compared between runs of the same machine/interpreter"""
+    return (f"{platform.system()}-{platform.machine()}-{os.cpu_count()}cpu-"
+            f"{platform.python_implementation()}{platform.python_version()}")
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{commit}{'-dirty' if dirty else ''}"
+
+
+def run_size(audit, generator, pages, asins, repeat, jobs):
+    with tempfile.TemporaryDirectory() as tmp:
+        reviews_dir, real_data_path, catalog = build_corpus(tmp, pages, asins)
+        size = corpus_bytes(reviews_dir)
+        files = sorted(reviews_dir.glob('*.astro'))
+
+        extract_s, extracted = best_of(lambda: [audit.extract_product_data(f) for f in files], repeat)
+        products = sum(len(p) for p in extracted)
+        assert products == pages * 6, (products, pages * 6)
+
+        def run_audit():
+            with contextlib.redirect_stderr(io.StringIO()):
+                return audit.audit_all_pages(reviews_dir, real_data_path, jobs, output_format='jsonl',
+                                             out=io.StringIO())
+        audit_s, summary = best_of(run_audit, repeat)
+        assert summary['products'] == products, summary
+
+        def render():
+            return [generator.generate_dynamic_page_template(slug, f'Best {slug}', 'Synthetic page.', budget, luxury)
+                    for slug, budget, luxury in catalog]
+        render_s, rendered = best_of(render, repeat)
+
+    return {
+        'pages': pages,
+        'asins': asins,
+        'jobs': jobs,
+        'bytes': size,
+        'products': products,
+        'errors': summary['errors'],
+        'rendered_bytes': sum(len(page) for page in rendered),
+        'extract': round(extract_s, 6),
+        'audit': round(audit_s, 6),
+        'render': round(render_s, 6),
+    }
+
+
+def load_results(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except OSError:
+        return []
+
+
+def previous_result(results, record):
+    for old in reversed(results):
+        if all(old.get(key) == record[key] for key in ('machine', 'pages', 'asins', 'jobs')):
+            return old
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help="Nombres de pages, séparés par des virgules")
+    parser.add_argument('--asins', type=int, default=20000, help="ASINs dans real-review-counts.json")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--jobs', type=int, default=1, help="Processus de l'audit complet")
+    parser.add_argument('--threshold', type=float, default=15.0, help="Régression au-delà de ce %% de ralentissement")
+    parser.add_argument('--results', default=RESULTS_PATH, help=f"Historique des résultats (défaut: {RESULTS_PATH})")
+    parser.add_argument('--no-save', action='store_true', help="N'ajoute pas ce run à l'historique")
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    audit = load_script('audit', 'audit-all-pages.py')
+    generator = load_script('generator', 'generate-all-dynamic-pages.py')
+    results = load_results(args.results)
+    run = {'date': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'commit': git_commit(),
+           'machine': machine()}
+    print(f"🖥️  {run['machine']} | commit {run['commit'] or '?'}")
+    print(f"{'pages':>8} {'Mo':>7} | {'extract':>9} {'µs/page':>8} | {'audit':>9} {'µs/page':>8} | "
+          f"{'render':>9} {'µs/page':>8}")
+    print('-' * 86)
+
+    regressions = []
+    records = []
+    for pages in (int(s) for s in args.sizes.split(',')):
+        record = {**run, **run_size(audit, generator, pages, args.asins, args.repeat, args.jobs)}
+        records.append(record)
+        print(f"{pages:>8,} {record['bytes'] / 1e6:>7.1f} | " + ' | '.join(
+            f"{record[stage]:>8.3f}s {record[stage] / pages * 1e6:>8.1f}" for stage in STAGES))
+
+        old = previous_result(results, record)
+        if old is None:
+            continue
+        deltas = []
+        for stage in STAGES:
+            change = (record[stage] - old[stage]) / old[stage] * 100 if old[stage] else 0.0
+            flag = ''
+            if change > args.threshold:
+                flag = ' ⚠️'
+                regressions.append((pages, stage, change, old['commit']))
+            deltas.append(f"{stage} {change:+.0f}%{flag}")
+        print(f"{'':>8} {'':>7}   vs {old['commit'] or '?'}: {', '.join(deltas)}")
+
+    if not args.no_save:
+        with open(args.results, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+        print(f"\n💾 Résultats ajoutés à {args.results}")
+
+    if regressions:
+        print(f"\n🚨 {len(regressions)} régression(s) > {args.threshold:.0f}%:")
+        for pages, stage, change, commit in regressions:
+            print(f"   {stage} @ {pages:,} pages: {change:+.0f}% vs {commit or '?'}")
+        if args.fail_on_regression:
+            sys.exit(1)
+    else:
+        print("✅ Aucune régression")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Corpus synthétique - N pages reviews .astro + real-review-counts.json (M ASINs)
+
+Pages are written in the formats the extractor reads: JS object literals
+(`name: "..."`, like the historical pages) and JSON (`"name": "..."`), each
+with 3 budget + 3 luxury products carrying rating/reviewCount/pros/con.
+Every ADVERSARIAL_EVERY-th page is adversarial: long `pros` arrays whose
+strings contain brackets, braces, escaped quotes and commas, plus an extra
+key between `pros` and `con` (the case that made the old DOTALL regexes scan
+to the end of the file).
+
+Product ASINs are drawn from the M ASINs of the real data, so products are
+shared between pages like in the real catalog. About ERROR_RATE of the
+products get real values outside the audit tolerances, the rest match.
+
+Deterministic (seeded): the same arguments always give the same corpus.
+
+Usage: python3 benchmarks/corpus.py OUT_DIR [--pages 1000] [--asins 5000]
+"""
+
+import argparse
+import json
+import os
+import random
+from pathlib import Path
+
+PRODUCTS_PER_TIER = 3
+ADVERSARIAL_EVERY = 10
+ADVERSARIAL_PROS = 60
+ERROR_RATE = 0.1
+
+
+def asin(i):
+    return f"B{i:09d}"
+
+
+def _product(rng, page, slot, asins):
+    i = rng.randrange(asins)
+    return {
+        'name': f"Synthetic Product {i} (page {page})",
+        'asin': asin(i),
+        'rating': round(3.5 + (i % 15) / 10, 1),
+        'reviewCount': 500 + (i * 37) % 200_000,
+        'pros': [f"Benefit {slot}-{j} of product {i}" for j in range(3)],
+        'con': f"Small tube ({slot})",
+    }
+
+
+def _adversarial_pros(product):
+    return [
+        f'Works on [dry] and {{oily}} skin, "really" #{j} - {product["asin"]}'
+        for j in range(ADVERSARIAL_PROS)
+    ]
+
+
+def _js_string(value):
+    return json.dumps(value, ensure_ascii=False)
+
+
+def js_product(product, adversarial=False):
+    pros = ',\n'.join(f'        {_js_string(p)}' for p in product['pros'])
+    extra = '      badge: "bestseller",\n' if adversarial else ''
+    return (
+        '    {\n'
+        f'      name: {_js_string(product["name"])},\n'
+        f'      asin: "{product["asin"]}",\n'
+        f'      rating: {product["rating"]},\n'
+        f'      reviewCount: {product["reviewCount"]},\n'
+        f'      pros: [\n{pros}\n      ],\n'
+        f'{extra}'
+        f'      con: {_js_string(product["con"])}\n'
+        '    }'
+    )
+
+
+def json_product(product, adversarial=False):
+    data = dict(product)
+    if adversarial:
+        con = data.pop('con')
+        data['badge'] = 'bestseller'
+        data['con'] = con
+    return '    ' + json.dumps(data, ensure_ascii=False, indent=2).replace('\n', '\n    ')
+
+
+def page_source(slug, budget, luxury, style, adversarial=False):
+    """Contenu .astro d'une page (style 'js' ou 'json')"""
+    make = js_product if style == 'js' else json_product
+    tiers = ',\n'.join(
+        f"  {tier}: [\n" + ',\n'.join(make(p, adversarial) for p in products) + "\n  ]"
+        for tier, products in (('budget', budget), ('luxury', luxury))
+    )
+    return (
+        "---\nimport Layout from '../../layouts/Layout.astro';\n\n"
+        f"const products = {{\n{tiers}\n}};\n---\n"
+        f'<Layout title="{slug}"><main>{{products.budget.length + products.luxury.length}}</main></Layout>\n'
+    )
+
+
+def build_corpus(out_dir, pages, asins, seed=42):
+    """Write out_dir/reviews/*.astro and out_dir/real-review-counts.json.
+
+    Returns (reviews_dir, real_data_path, catalog) where catalog lists
+    (slug, budget, luxury) as written.
+    """
+    rng = random.Random(seed)
+    reviews_dir = Path(out_dir) / 'reviews'
+    reviews_dir.mkdir(parents=True, exist_ok=True)
+    catalog = []
+    for page in range(pages):
+        slug = f"category-{page:06d}"
+        adversarial = page % ADVERSARIAL_EVERY == ADVERSARIAL_EVERY - 1
+        tiers = [[_product(rng, page, f"{tier}{n}", asins) for n in range(PRODUCTS_PER_TIER)]
+                 for tier in ('b', 'l')]
+        if adversarial:
+            for product in tiers[0] + tiers[1]:
+                product['pros'] = _adversarial_pros(product)
+        style = 'json' if page % 2 else 'js'
+        with open(reviews_dir / f"{slug}.astro", 'w', encoding='utf-8') as f:
+            f.write(page_source(slug, tiers[0], tiers[1], style, adversarial))
+        catalog.append((slug, tiers[0], tiers[1]))
+
+    real_data = {}
+    for i in range(asins):
+        rating = round(3.5 + (i % 15) / 10, 1)
+        reviews = 500 + (i * 37) % 200_000
+        if rng.random() < ERROR_RATE:
+            rating = round(max(1.0, rating - 0.4), 1)
+            reviews = reviews * 2 + 5000
+        real_data[asin(i)] = {'reviews': reviews, 'rating': rating}
+    real_data_path = Path(out_dir) / 'real-review-counts.json'
+    with open(real_data_path, 'w', encoding='utf-8') as f:
+        json.dump(real_data, f, indent=2)
+    return reviews_dir, real_data_path, catalog
+
+
+def corpus_bytes(reviews_dir):
+    return sum(entry.stat().st_size for entry in os.scandir(reviews_dir))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('out_dir')
+    parser.add_argument('--pages', type=int, default=1000)
+    parser.add_argument('--asins', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    reviews_dir, real_data_path, _ = build_corpus(args.out_dir, args.pages, args.asins, args.seed)
+    print(f"✅ {args.pages:,} pages dans {reviews_dir} ({corpus_bytes(reviews_dir) / 1e6:.1f} Mo)")
+    print(f"✅ {args.asins:,} ASINs dans {real_data_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,65 +5,132 @@ Convertit toutes les pages reviews vers le système dynamique
 Plus jamais de données hardcodées!
 """
 
-import os
+import argparse
+import difflib
 import json
-import re
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from glowpicked.extractor import extract_products
+from glowpicked.manifest import GeneratorManifest, inputs_digest
+from glowpicked.page_index import INDEX_NAME, PageIndex
+from glowpicked.profiling import PROFILER, init_worker
+from glowpicked.realdata import open_real_data
+from glowpicked.template import PageTemplate, js_mapping, js_rows, js_value
+from glowpicked.watch import watch_batches
+
 # Configuration
 REVIEWS_DIR = Path('/Users/alfred/.openclaw/workspace/projects/glowpicked/site/src/pages/reviews')
 REAL_DATA_PATH = '/Users/alfred/.openclaw/workspace/projects/glowpicked/data/real-review-counts.json'
+CATEGORIES_PATH = '/Users/alfred/.openclaw/workspace/projects/glowpicked/data/verified-asins-all.json'
+MANIFEST_PATH = Path(CATEGORIES_PATH).parent / '.generator-manifest.json'
+PAGE_INDEX_PATH = Path(CATEGORIES_PATH).parent / INDEX_NAME
+PROFILE_PATH = 'generator-profile.json'
+
+# Textes historiques des pages; les autres catégories ont un titre dérivé du slug
+# (ou "title"/"description" dans leur entrée de verified-asins-all.json)
+PAGE_TEXTS = {
+    'cleansers': {
+        'title': 'Best Facial Cleansers 2026',
+        'description': 'We researched Amazon customer reviews to find the top 3 budget and top 3 luxury facial cleansers.'
+    },
+    'serums': {
+        'title': 'Best Serums 2026',
+        'description': 'We researched Amazon customer reviews to find the top vitamin C, hyaluronic, and retinol serums.'
+    },
+    'sunscreen': {
+        'title': 'Best Sunscreens 2026',
+        'description': 'We researched Amazon customer reviews to find the top sunscreens without white cast.'
+    },
+    'eye-creams': {
+        'title': 'Best Eye Creams 2026',
+        'description': 'We researched Amazon customer reviews to find the top budget and luxury eye creams.'
+    },
+    'lip-care': {
+        'title': 'Best Lip Care 2026',
+        'description': 'We researched Amazon customer reviews to find the top lip balms and treatments.'
+    },
+}
+
+# Template compilé une seule fois: le balisage, la logique et les styles
+# communs sont dans src/layouts/ReviewPageLayout.astro, chaque page ne porte
+# que ses produits, ses fallbacks et ses textes.
+REVIEW_PAGE = PageTemplate('''---
+/**
+ * {{title_upper}} - VERSION DYNAMIQUE 100% VÉRIDIQUE
+ * Plus jamais de données hardcodées!
+ * Utilise automatiquement real-review-counts.json
+ * Auto-généré par generate-all-dynamic-pages.py
+ */
+import ReviewPageLayout from '../../layouts/ReviewPageLayout.astro';
 
-def load_real_data():
-    """Charge les vraies données pour validation"""
+// DONNÉES DE BASE - Seules infos qu'on contrôle
+// Rating et reviewCount seront automatiquement récupérés des vraies données
+const baseProducts = {
+  budget: {{budget}},
+  luxury: {{luxury}}
+};
+
+// FALLBACKS au cas où vraies données indisponibles (basé sur anciennes données hardcodées)
+const fallbacks = {{fallbacks}};
+---
+
+<ReviewPageLayout
+  pageName={ {{page_name}} }
+  title={ {{title}} }
+  description={ {{description}} }
+  baseProducts={baseProducts}
+  fallbacks={fallbacks}
+/>
+''')
+
+def load_real_data(path=REAL_DATA_PATH):
+    """Charge les vraies données pour validation (sidecar binaire si à jour)"""
     try:
-        with open(REAL_DATA_PATH) as f:
-            return json.load(f)
+        return open_real_data(path)
     except Exception as e:
         print(f"❌ Erreur chargement données: {e}")
         return {}
 
+# path -> (mtime_ns, size, products): a page is only re-parsed once it changed
+# (matters in --watch, where the process and its pool stay up)
+_EXTRACTED = {}
+
 def extract_products_from_page(file_path):
     """Extract tous les produits d'une page existante"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Patterns pour les deux formats
-        pattern1 = r'{\s*name:\s*["\']([^"\']+)["\']\s*,\s*asin:\s*["\']([A-Z0-9]+)["\']\s*,\s*rating:\s*([\d.]+)\s*,\s*reviewCount:\s*(\d+)\s*,\s*pros:\s*\[(.*?)\]\s*,\s*con:\s*["\']([^"\']+)["\']'
-        pattern2 = r'{\s*["\']name["\']\s*:\s*["\']([^"\']+)["\']\s*,\s*["\']asin["\']\s*:\s*["\']([A-Z0-9]+)["\']\s*,\s*["\']rating["\']\s*:\s*([\d.]+)\s*,\s*["\']reviewCount["\']\s*:\s*(\d+)\s*,\s*["\']pros["\']\s*:\s*\[(.*?)\]\s*,\s*["\']con["\']\s*:\s*["\']([^"\']+)["\']'
-        
+        st = os.stat(file_path)
+        cached = _EXTRACTED.get(str(file_path))
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            return cached[2]
+        name = os.path.basename(file_path)
+        with PROFILER.phase('read', name) as span:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            span.add(len(content))
+        with PROFILER.phase('extract', name, len(content)):
+            extracted = extract_products(content)
         products = []
+        for product in extracted:
+            # Le template a besoin de pros/con pour chaque produit
+            if 'pros' not in product or 'con' not in product:
+                continue
+            entry = {
+                'name': product['name'],
+                'asin': product['asin'],
+                'pros': [str(p).strip() for p in product['pros']],
+                'con': str(product['con']).strip()
+            }
+            if 'rating' in product and 'reviewCount' in product:
+                entry['rating'] = float(product['rating'])
+                entry['reviewCount'] = int(product['reviewCount'])
+            products.append(entry)
         
-        # Essayer pattern 1 (JS style)
-        matches = re.findall(pattern1, content, re.MULTILINE | re.DOTALL)
-        for match in matches:
-            name, asin, rating, reviewCount, pros_raw, con = match
-            pros = [p.strip().strip('"\'') for p in pros_raw.split(',') if p.strip()]
-            products.append({
-                'name': name.strip(),
-                'asin': asin.strip(),
-                'rating': float(rating),
-                'reviewCount': int(reviewCount), 
-                'pros': pros,
-                'con': con.strip()
-            })
-        
-        # Si pas de matches, essayer pattern 2 (JSON style)
-        if not products:
-            matches = re.findall(pattern2, content, re.MULTILINE | re.DOTALL)
-            for match in matches:
-                name, asin, rating, reviewCount, pros_raw, con = match
-                pros = [p.strip().strip('"\'') for p in pros_raw.split(',') if p.strip()]
-                products.append({
-                    'name': name.strip(),
-                    'asin': asin.strip(),
-                    'rating': float(rating),
-                    'reviewCount': int(reviewCount),
-                    'pros': pros,
-                    'con': con.strip()
-                })
-        
+        _EXTRACTED[str(file_path)] = (st.st_mtime_ns, st.st_size, products)
         return products
         
     except Exception as e:
@@ -93,6 +160,7 @@ def generate_dynamic_page_template(page_name, title, description, products_budge
                 'reviewCount': p['reviewCount']
             }
             for p in products
+            if 'rating' in p
         }
     
     base_budget = convert_to_base_products(products_budget)
@@ -102,313 +170,338 @@ def generate_dynamic_page_template(page_name, title, description, products_budge
     fallbacks_luxury = generate_fallbacks(products_luxury)
     fallbacks = {**fallbacks_budget, **fallbacks_luxury}
     
-    template = f'''---
-/**
- * {title.upper()} - VERSION DYNAMIQUE 100% VÉRIDIQUE
- * Plus jamais de données hardcodées!
- * Utilise automatiquement real-review-counts.json
- * Auto-généré par generate-all-dynamic-pages.py
- */
-import Layout from '../../layouts/Layout.astro';
-import {{ processProductsList, generateProductSchema, generateGlobalStats }} from '../../utils/realProductData.js';
+    return REVIEW_PAGE.render(
+        title_upper=title.upper(),
+        budget=js_rows(base_budget),
+        luxury=js_rows(base_luxury),
+        fallbacks=js_mapping(fallbacks),
+        page_name=js_value(page_name),
+        title=js_value(title),
+        description=js_value(description),
+    )
 
-// DONNÉES DE BASE - Seules infos qu'on contrôle
-// Rating et reviewCount seront automatiquement récupérés des vraies données
-const baseProducts = {{
-  budget: {json.dumps(base_budget, indent=4)},
-  luxury: {json.dumps(base_luxury, indent=4)}
-}};
+def load_categories(path=CATEGORIES_PATH):
+    """Charge les catégories (slug -> budget/luxury) de verified-asins-all.json"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            categories = json.load(f)['categories']
+    except (OSError, KeyError, TypeError, json.JSONDecodeError) as e:
+        print(f"❌ Config catégories illisible ({path}): {e}")
+        return {}
+    if not isinstance(categories, dict):
+        print(f"❌ Config catégories invalide ({path}): 'categories' doit être un objet")
+        return {}
+    return categories
 
-// FALLBACKS au cas où vraies données indisponibles (basé sur anciennes données hardcodées)
-const fallbacks = {json.dumps(fallbacks, indent=2)};
-
-// PROCESS avec vraies données
-const products = {{
-  budget: processProductsList(baseProducts.budget, fallbacks),
-  luxury: processProductsList(baseProducts.luxury, fallbacks)
-}};
-
-// Find top pick in each tier (highest rating from REAL data)
-const budgetTopIdx = products.budget.reduce((best, p, i) => 
-  p.rating > products.budget[best].rating ? i : best, 0);
-const luxuryTopIdx = products.luxury.reduce((best, p, i) => 
-  p.rating > products.luxury[best].rating ? i : best, 0);
-
-// Generate schema with REAL data
-const allProducts = [...products.budget, ...products.luxury];
-const pageSchema = JSON.stringify(
-  generateProductSchema(allProducts, "{title} - Budget & Luxury Picks")
-);
-
-// Global stats for transparency
-const globalStats = generateGlobalStats();
-console.log('📊 {page_name} Stats:', globalStats);
-
-// Log product validation for debugging
-allProducts.forEach(product => {{
-  console.log(`✅ {page_name} product:`, {{
-    asin: product.asin,
-    rating: product.rating,
-    reviewCount: product.reviewCount,
-    dataSource: product.dataSource,
-    verified: product.verified
-  }});
-}});
----
+def page_texts(slug, category):
+    """Titre/description: config de la catégorie, textes historiques, ou dérivés du slug"""
+    texts = PAGE_TEXTS.get(slug, {})
+    label = slug.replace('-', ' ')
+    return (
+        category.get('title') or texts.get('title') or f'Best {label.title()} 2026',
+        category.get('description') or texts.get('description') or
+        f'We researched Amazon customer reviews to find the top 3 budget and top 3 luxury {label}.'
+    )
+
+def source_products(reviews_dir, slug):
+    """pros/con/fallbacks par ASIN, depuis la page et ses anciennes versions"""
+    known = {}
+    for suffix in ('', '-OLD', '-v2'):
+        page_path = Path(reviews_dir) / f'{slug}{suffix}.astro'
+        if page_path.exists():
+            for product in extract_products_from_page(page_path):
+                known.setdefault(product['asin'], product)
+    return known
+
+def category_asins(category):
+    """ASINs d'une catégorie de la config, budget puis luxury"""
+    return [item['asin'] for tier in ('budget', 'luxury') for item in category.get(tier, [])]
+
+def real_fallbacks(real_data, asins):
+    """rating/reviewCount des vraies données pour ces ASINs (valeurs numériques seulement)"""
+    fallbacks = {}
+    for asin in asins:
+        real = real_data.get(asin)
+        if real and isinstance(real.get('rating'), (int, float)) and isinstance(real.get('reviews'), (int, float)):
+            fallbacks[asin] = {'rating': float(real['rating']), 'reviewCount': int(real['reviews'])}
+    return fallbacks
+
+def render_category(job):
+    """Worker: rend la page d'une catégorie.
+
+    Returns (slug, content, missing ASINs, inputs hash); content is None when
+    a product of the config has no pros/con in any existing version of the page,
+    or when the inputs hash equals `previous` (manifest): the page is not rendered.
+    `synced` (ASIN -> rating/reviewCount) replaces the fallbacks of the old page.
+    """
+    slug, category, reviews_dir, synced, previous = job
+    known = source_products(reviews_dir, slug)
+    tiers = {}
+    missing = []
+    for tier in ('budget', 'luxury'):
+        tiers[tier] = []
+        for item in category.get(tier, []):
+            product = known.get(item['asin'])
+            if product is None:
+                missing.append(item['asin'])
+                continue
+            tiers[tier].append({**product, 'name': item['name'], **synced.get(item['asin'], {})})
+    if missing:
+        return slug, None, missing, None
 
-<Layout 
-  title="{title} | GlowPicked"
-  description="{description} All ratings verified from real data."
->
-  <section class="products-section">
-    <div class="container">
-      <div class="page-header">
-        <h1>{title}</h1>
-        <p class="last-updated">📅 Last updated: February 2026 | 📊 Data verified: {{globalStats.verifiedCount}} products</p>
-        <p class="lead-text">All ratings and review counts verified against real Amazon data - no invented numbers!</p>
-      </div>
-
-      <section class="budget-section">
-        <h2><span class="accent-budget">🏆 Top 3 Budget</span> (Under $30)</h2>
-        <div class="products-grid">
-          {{products.budget.map((product, index) => (
-            <div class="product-card" key={{product.asin}} data-asin={{product.asin}}>
-              {{index === budgetTopIdx && <div class="top-pick-badge">🏅 Our Top Pick</div>}}
-              {{!product.verified && <div class="data-warning">⚠️ Limited data available</div>}}
-              <h3 class="product-name">{{product.name}}</h3>
-              <div class="product-meta">
-                <span class="rating">{{product.rating.toFixed(1)}}⭐</span>
-                <span class="reviews">
-                  Based on {{product.reviewCount.toLocaleString()}}+ verified Amazon ratings
-                  {{product.dataSource === 'real-data' && <span class="verified-badge">✓ Verified</span>}}
-                </span>
-              </div>
-              <ul class="pros-list">
-                {{product.pros.map((pro, i) => (
-                  <li key={{i}}>✅ {{pro}}</li>
-                ))}}
-              </ul>
-              <div class="con">
-                ❌ {{product.con}}
-              </div>
-              <div class="cta-wrapper">
-                <a href={{`https://www.amazon.com/dp/${{product.asin}}/ref=nosim?tag=glowpicked0c-20`}} class="cta-button" target="_blank" rel="nofollow sponsored">
-                  Check Price on Amazon
-                </a>
-              </div>
-            </div>
-          ))}}
-        </div>
-      </section>
-
-      <section class="luxury-section">
-        <h2><span class="accent-luxury">💎 Top 3 Luxury</span></h2>
-        <div class="products-grid">
-          {{products.luxury.map((product, index) => (
-            <div class="product-card" key={{product.asin}} data-asin={{product.asin}}>
-              {{index === luxuryTopIdx && <div class="top-pick-badge">🏅 Our Top Pick</div>}}
-              {{!product.verified && <div class="data-warning">⚠️ Limited data available</div>}}
-              <h3 class="product-name">{{product.name}}</h3>
-              <div class="product-meta">
-                <span class="rating">{{product.rating.toFixed(1)}}⭐</span>
-                <span class="reviews">
-                  Based on {{product.reviewCount.toLocaleString()}}+ verified Amazon ratings
-                  {{product.dataSource === 'real-data' && <span class="verified-badge">✓ Verified</span>}}
-                </span>
-              </div>
-              <ul class="pros-list">
-                {{product.pros.map((pro, i) => (
-                  <li key={{i}}>✅ {{pro}}</li>
-                ))}}
-              </ul>
-              <div class="con">
-                ❌ {{product.con}}
-              </div>
-              <div class="cta-wrapper">
-                <a href={{`https://www.amazon.com/dp/${{product.asin}}/ref=nosim?tag=glowpicked0c-20`}} class="cta-button" target="_blank" rel="nofollow sponsored">
-                  Check Price on Amazon
-                </a>
-              </div>
-            </div>
-          ))}}
-        </div>
-      </section>
-    </div>
-  </section>
-
-  <section class="transparency-section">
-    <div class="container">
-      <h2>🔍 Data Transparency</h2>
-      <p>
-        <strong>100% Verified Data:</strong> All ratings and review counts are automatically synchronized with real Amazon data. 
-        We've analyzed {{globalStats.totalReviews.toLocaleString()}} total reviews across {{globalStats.totalProducts}} products. 
-        No invented numbers - if we don't have verified data, we clearly mark it.
-      </p>
-      <p class="data-timestamp">Data last synchronized: {{new Date().toLocaleDateString()}}</p>
-    </div>
-  </section>
-
-  <section class="methodology-section">
-    <div class="container">
-      <h2>How We Pick Products</h2>
-      <p>
-        Our team uses AI tools to research popular Amazon products in each category.
-        We look at overall ratings, review volume, common praise and complaints, and value for money.
-        Products are selected based on consistent positive feedback from real customers.
-        We do not physically test products — our recommendations are based entirely on
-        published customer review data from Amazon.
-      </p>
-    </div>
-  </section>
-  
-  <section class="disclaimer-section">
-    <div class="container">
-      <p>
-        <strong>Health Disclaimer:</strong> This content is for informational purposes only and is not medical advice. Consult a dermatologist for personalized recommendations.
-      </p>
-      <p class="affiliate-disclosure">
-        As an Amazon Associate I earn from qualifying purchases.
-      </p>
-    </div>
-  </section>
-  <script type="application/ld+json" set:html={{pageSchema}} />
-</Layout>
-
-<style>
-  /* Styles basiques - peut être étendu selon le besoin */
-  :root {{
-    --green-budget: #28a745;
-    --purple-luxury: #6f42c1;
-  }}
-  .container {{ max-width: 1200px; margin: 0 auto; padding: 0 2rem; }}
-  @media (max-width: 768px) {{ .container {{ padding: 0 1rem; }} }}
-  .page-header {{ text-align: center; margin-bottom: 3rem; }}
-  .page-header h1 {{ font-size: 3rem; font-weight: 700; margin-bottom: 1rem; font-family: 'Playfair Display', serif; }}
-  .lead-text {{ font-size: 1.3rem; color: var(--text-light); font-weight: 600; }}
-  .budget-section, .luxury-section {{ margin-bottom: 4rem; }}
-  .budget-section h2 {{ color: var(--text); font-size: 2rem; margin-bottom: 2rem; font-family: 'Playfair Display', serif; }}
-  .accent-budget {{ color: var(--green-budget); }}
-  .accent-luxury {{ color: var(--purple-luxury); }}
-  .products-grid {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(350px, 1fr)); gap: 2rem; }}
-  @media (max-width: 768px) {{ .products-grid {{ grid-template-columns: 1fr; gap: 1.5rem; }} }}
-  .product-card {{ background: white; border-radius: var(--border-radius); box-shadow: var(--shadow); padding: 2rem; transition: all 0.3s ease; position: relative; }}
-  .product-card:hover {{ box-shadow: var(--shadow-lg); transform: translateY(-4px); }}
-  .product-name {{ font-size: 1.4rem; font-weight: 700; margin-bottom: 1rem; color: var(--text); font-family: 'Playfair Display', serif; }}
-  .product-meta {{ display: flex; gap: 1rem; align-items: center; margin-bottom: 1.5rem; flex-wrap: wrap; }}
-  .rating {{ font-size: 1.2rem; font-weight: 700; color: #ffc107; }}
-  .reviews {{ color: var(--text-light); font-size: 0.95rem; }}
-  .verified-badge {{ background: #28a745; color: white; padding: 0.2rem 0.5rem; border-radius: 12px; font-size: 0.8rem; font-weight: 600; margin-left: 0.5rem; }}
-  .data-warning {{ background: #ffc107; color: #000; padding: 0.3rem 0.8rem; border-radius: 20px; font-size: 0.8rem; font-weight: 600; position: absolute; top: 1rem; right: 1rem; }}
-  .pros-list {{ list-style: none; margin-bottom: 1.5rem; }}
-  .pros-list li {{ margin-bottom: 0.5rem; color: var(--text); font-size: 1rem; }}
-  .con {{ background: #f8f9fa; padding: 1rem; border-left: 4px solid #dc3545; margin-bottom: 1.5rem; color: var(--text); border-radius: 0 8px 8px 0; }}
-  .cta-button {{ display: inline-block; background: linear-gradient(135deg, var(--primary), var(--primary-dark)); color: white; text-decoration: none; padding: 0.7rem 1.8rem; text-align: center; font-weight: 600; font-size: 0.95rem; border-radius: 50px; transition: all 0.3s ease; }}
-  .cta-wrapper {{ text-align: center; }}
-  .cta-button:hover {{ transform: translateY(-2px); box-shadow: var(--shadow-lg); }}
-  .transparency-section {{ background: #e8f5e8; padding: 3rem 0; text-align: center; }}
-  .transparency-section h2 {{ font-size: 2rem; margin-bottom: 1.5rem; color: var(--green-budget); font-family: 'Playfair Display', serif; }}
-  .transparency-section p {{ max-width: 800px; margin: 0 auto 1rem; font-size: 1.1rem; line-height: 1.7; color: var(--text); }}
-  .data-timestamp {{ font-size: 0.9rem; color: var(--text-light); font-style: italic; }}
-  .methodology-section {{ background: var(--bg-light); padding: 4rem 0; }}
-  .methodology-section h2 {{ text-align: center; font-size: 2rem; margin-bottom: 2rem; font-family: 'Playfair Display', serif; }}
-  .methodology-section p {{ max-width: 800px; margin: 0 auto; font-size: 1.1rem; line-height: 1.7; color: var(--text); }}
-  .disclaimer-section {{ padding: 3rem 0; background: #f8f9fa; }}
-  .disclaimer-section p {{ text-align: center; max-width: 800px; margin: 0 auto 1rem; color: var(--text-light); font-size: 0.95rem; }}
-  .affiliate-disclosure {{ font-size: 0.9rem; background: rgba(233, 30, 99, 0.1); padding: 1rem; border-radius: var(--border-radius); border-left: 4px solid var(--primary); }}
-  .last-updated {{ text-align: center; color: #888; font-size: 0.9rem; margin-top: -0.5rem; margin-bottom: 2rem; }}
-  .top-pick-badge {{ background: linear-gradient(135deg, #ff6f00, #ff8f00); color: white; padding: 0.4rem 1rem; border-radius: 50px; font-size: 0.85rem; font-weight: 700; display: inline-block; margin-bottom: 0.75rem; box-shadow: 0 2px 8px rgba(255,111,0,0.3); letter-spacing: 0.02em; }}
-</style>'''
-
-    return template
-
-def process_all_pages():
-    """Process toutes les pages reviews"""
+    title, description = page_texts(slug, category)
+    inputs = inputs_digest(REVIEW_PAGE.version, slug, title, description, tiers['budget'], tiers['luxury'])
+    if inputs == previous:
+        return slug, None, missing, inputs
+    with PROFILER.phase('render', f'{slug}.astro') as span:
+        content = generate_dynamic_page_template(slug, title, description, tiers['budget'], tiers['luxury'])
+        span.add(len(content))
+    return slug, content, missing, inputs
+
+def write_atomic(path, content):
+    """Écrit via un fichier temporaire du même dossier puis os.replace"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f'.{os.path.basename(path)}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def iter_rendered(jobs_list, jobs=1):
+    """Yield render_category() results in config order, over a process pool if jobs > 1"""
+    if jobs <= 1 or len(jobs_list) < 2:
+        yield from map(render_category, jobs_list)
+        return
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                             initargs=(PROFILER.worker_config(),)) as executor:
+        yield from executor.map(render_category, jobs_list)
+
+def process_all_pages(categories_path=CATEGORIES_PATH, reviews_dir=REVIEWS_DIR, jobs=1,
+                      only=None, dry_run=False, diff=False, manifest_path=MANIFEST_PATH, force=False,
+                      asins=None, sync_fallbacks=False, index_path=PAGE_INDEX_PATH, real_data_path=REAL_DATA_PATH):
+    """Régénère les pages de toutes les catégories de la config (ou celles qui montrent `asins`)"""
     print('🏭 GÉNÉRATEUR AUTOMATIQUE - Pages Dynamiques')
     print('=============================================')
     
-    real_data = load_real_data()
-    print(f'📊 Vraies données chargées: {len(real_data)} produits\n')
-    
-    # Configuration pages
-    pages_config = {
-        'cleansers.astro': {
-            'title': 'Best Facial Cleansers 2026',
-            'description': 'We researched Amazon customer reviews to find the top 3 budget and top 3 luxury facial cleansers.'
-        },
-        'serums.astro': {
-            'title': 'Best Serums 2026',
-            'description': 'We researched Amazon customer reviews to find the top vitamin C, hyaluronic, and retinol serums.'
-        },
-        'sunscreen.astro': {
-            'title': 'Best Sunscreens 2026',
-            'description': 'We researched Amazon customer reviews to find the top sunscreens without white cast.'
-        },
-        'eye-creams.astro': {
-            'title': 'Best Eye Creams 2026', 
-            'description': 'We researched Amazon customer reviews to find the top budget and luxury eye creams.'
-        },
-        'lip-care.astro': {
-            'title': 'Best Lip Care 2026',
-            'description': 'We researched Amazon customer reviews to find the top lip balms and treatments.'
-        }
-        # Ajouter d'autres pages selon besoin
-    }
-    
-    processed = 0
-    errors = 0
+    with PROFILER.phase('load_real_data'):
+        real_data = load_real_data(real_data_path)
+    print(f'📊 Vraies données chargées: {len(real_data)} produits')
+
+    with PROFILER.phase('load_categories'):
+        categories = load_categories(categories_path)
+    reviews_dir = Path(reviews_dir)
+    with PROFILER.phase('page_index'):
+        index = PageIndex(index_path)
+        if len(index) == 0 and reviews_dir.is_dir():
+            print(f'🔎 Index ASIN -> pages absent, construit depuis {reviews_dir}: {index.rebuild(reviews_dir)} pages')
+    if asins:
+        only = set(only or ()) | set(index.pages_for_many(asins))
+        print(f'🔎 {len(asins)} ASIN(s) → {len(only)} page(s): {", ".join(sorted(only)) or "aucune"}')
+        if not only:
+            categories = {}
+    if only:
+        unknown = set(only) - categories.keys()
+        for slug in sorted(unknown):
+            print(f'   ⚠️  Catégorie inconnue: {slug}')
+        categories = {slug: c for slug, c in categories.items() if slug in only}
+    print(f'🗂️  Catégories: {len(categories)}{" (dry-run)" if dry_run or diff else ""}\n')
+
+    manifest = GeneratorManifest(manifest_path)
+    counts = render_pages(categories, real_data, reviews_dir, index, manifest, jobs, dry_run, diff, force,
+                          sync_fallbacks)
     
-    for page_file, config in pages_config.items():
+    print(f'\n🏁 GÉNÉRATION TERMINÉE')
+    print(f'✅ Pages {"à écrire" if dry_run or diff else "écrites"}: {counts["written"]}')
+    print(f'⏭️  Pages inchangées: {counts["unchanged"]}')
+    print(f'❌ Erreurs: {counts["errors"]}')
+    if not (dry_run or diff):
+        print(f'\n🎉 SYSTÈME DYNAMIQUE DÉPLOYÉ!')
+        print('Plus jamais de données hardcodées dans les pages reviews!')
+    return counts
+
+def render_pages(categories, real_data, reviews_dir, index, manifest, jobs=1, dry_run=False, diff=False,
+                 force=False, sync_fallbacks=False):
+    """Rend et écrit les pages de `categories`, met à jour manifeste et index; returns the counts"""
+    jobs_list = [
+        (slug, category, str(reviews_dir), real_fallbacks(real_data, category_asins(category)) if sync_fallbacks else {},
+         None if force else manifest.pages.get(slug, {}).get('inputs'))
+        for slug, category in categories.items()
+    ]
+    counts = {'written': 0, 'unchanged': 0, 'errors': 0}
+
+    for job, (slug, content, missing, inputs) in zip(jobs_list, iter_rendered(jobs_list, jobs)):
+        page_file = f'{slug}.astro'
         print(f'📝 PROCESSING: {page_file}')
-        
-        page_path = REVIEWS_DIR / page_file
-        
-        if not page_path.exists():
-            print(f'   ⚠️  Fichier non trouvé, skip')
+        if missing:
+            print(f'   ❌ pros/con introuvables pour: {", ".join(missing)}, skip')
+            counts['errors'] += 1
             continue
-            
-        # Extract products from existing page
-        products = extract_products_from_page(page_path)
-        
-        if not products:
-            print(f'   ❌ Aucun produit extrait, skip')
-            errors += 1
+
+        page_path = reviews_dir / page_file
+        if not (dry_run or diff):
+            index.set_page(slug, category_asins(categories[slug]))
+        if content is None:
+            # Entrées inchangées: pas rendue, sauf si le fichier a changé depuis (édité à la main)
+            if manifest.is_fresh(slug, inputs, page_path):
+                print('   ⏭️  Entrées inchangées')
+                counts['unchanged'] += 1
+                continue
+            slug, content, missing, inputs = render_category(job[:-1] + (None,))
+
+        with PROFILER.phase('compare', page_file, len(content)):
+            current = page_path.read_text(encoding='utf-8') if page_path.exists() else None
+            same = content == current
+        if same:
+            # Sortie identique: on garde le fichier (et son mtime) tel quel
+            manifest.record(slug, inputs, page_path)
+            print('   ⏭️  Inchangée')
+            counts['unchanged'] += 1
             continue
-            
-        if len(products) < 6:
-            print(f'   ⚠️  Seulement {len(products)} produits trouvés, peut-être format non reconnu')
-        
-        # Split into budget/luxury (assume first half budget, second half luxury)
-        mid = len(products) // 2
-        products_budget = products[:3]  # First 3
-        products_luxury = products[3:6] if len(products) >= 6 else products[mid:]  # Next 3
-        
-        # Generate new dynamic page
-        dynamic_content = generate_dynamic_page_template(
-            page_file.replace('.astro', ''),
-            config['title'],
-            config['description'],
-            products_budget,
-            products_luxury
-        )
-        
-        # Backup original
-        backup_path = REVIEWS_DIR / f"{page_file.replace('.astro', '')}-OLD.astro"
-        if not backup_path.exists():
-            os.rename(page_path, backup_path)
-            print(f'   💾 Backup créé: {backup_path.name}')
-        
-        # Write new dynamic page
-        with open(page_path, 'w', encoding='utf-8') as f:
-            f.write(dynamic_content)
-        
-        print(f'   ✅ Page dynamique générée: {len(products_budget)} budget + {len(products_luxury)} luxury')
-        processed += 1
-    
-    print(f'\n🏁 GÉNÉRATION TERMINÉE')
-    print(f'✅ Pages processées: {processed}')
-    print(f'❌ Erreurs: {errors}')
-    print(f'\n🎉 SYSTÈME DYNAMIQUE DÉPLOYÉ!')
-    print('Plus jamais de données hardcodées dans les pages reviews!')
+
+        if diff:
+            sys.stdout.writelines(difflib.unified_diff(
+                (current or '').splitlines(keepends=True), content.splitlines(keepends=True),
+                f'a/{page_file}', f'b/{page_file}'))
+        if dry_run or diff:
+            print(f'   📝 {"Serait modifiée" if current is not None else "Serait créée"}')
+            counts['written'] += 1
+            continue
+
+        # Backup original (une seule fois), puis remplacement atomique
+        backup_path = reviews_dir / f'{slug}-OLD.astro'
+        with PROFILER.phase('write', page_file, len(content)):
+            if current is not None and not backup_path.exists():
+                write_atomic(backup_path, current)
+                print(f'   💾 Backup créé: {backup_path.name}')
+            write_atomic(page_path, content)
+            manifest.record(slug, inputs, page_path, content.encode('utf-8'))
+        print('   ✅ Page dynamique générée')
+        counts['written'] += 1
+
+    if not (dry_run or diff):
+        with PROFILER.phase('save'):
+            manifest.save()
+            index.save()
+    return counts
+
+def source_slug(page_path):
+    """cleansers.astro / cleansers-OLD.astro / cleansers-v2.astro -> cleansers"""
+    stem = Path(page_path).stem
+    for suffix in ('-OLD', '-v2'):
+        if stem.endswith(suffix):
+            return stem[:-len(suffix)]
+    return stem
+
+def is_own_write(manifest, slug, page_path):
+    """True if the page still holds exactly what this generator last wrote"""
+    entry = manifest.pages.get(slug)
+    try:
+        st = os.stat(page_path)
+    except OSError:
+        return False
+    return bool(entry) and (st.st_mtime_ns, st.st_size) == (entry['mtime_ns'], entry['size'])
+
+def watch_pages(categories_path=CATEGORIES_PATH, reviews_dir=REVIEWS_DIR, manifest_path=MANIFEST_PATH, force=False,
+                sync_fallbacks=False, index_path=PAGE_INDEX_PATH, real_data_path=REAL_DATA_PATH):
+    """--watch: régénération complète, puis seulement les pages touchées par chaque rafale de changements.
+
+    Config, real data, index and manifest stay in memory. A change of the
+    config regenerates the categories whose entry changed; an edited source
+    page (<slug>.astro, -OLD, -v2) regenerates its category; with
+    --sync-fallbacks a change of the real data regenerates the pages that
+    show an ASIN whose entry changed. Our own writes are recognized through
+    the manifest and ignored. Runs until interrupted.
+    """
+    process_all_pages(categories_path, reviews_dir, 1, manifest_path=manifest_path, force=force,
+                      sync_fallbacks=sync_fallbacks, index_path=index_path, real_data_path=real_data_path)
+
+    reviews_dir = Path(reviews_dir).resolve()
+    config_path = Path(categories_path).resolve()
+    real_path = Path(real_data_path).resolve()
+    real_data = dict(load_real_data(real_path).items())
+    categories = load_categories(config_path)
+    index = PageIndex(index_path)
+    manifest = GeneratorManifest(manifest_path)
+
+    watched = {reviews_dir, config_path.parent} | ({real_path.parent} if sync_fallbacks else set())
+    print(f'\n👀 Surveillance de {", ".join(sorted(str(d) for d in watched))} (Ctrl+C pour arrêter)')
+
+    for batch in watch_batches(watched):
+        start = time.perf_counter()
+        slugs = set()
+        if config_path in batch:
+            new_categories = load_categories(config_path)
+            if new_categories or not categories:
+                slugs.update(slug for slug in new_categories.keys() | categories.keys()
+                             if new_categories.get(slug) != categories.get(slug))
+                categories = new_categories
+                print(f'🗂️  Config rechargée: {len(slugs)} catégorie(s) modifiée(s)')
+        if sync_fallbacks and real_path in batch:
+            new_data = dict(load_real_data(real_path).items())
+            changed = {asin for asin in real_data.keys() | new_data.keys() if real_data.get(asin) != new_data.get(asin)}
+            real_data = new_data
+            pages = index.pages_for_many(changed)
+            slugs.update(pages)
+            print(f'📊 Vraies données rechargées: {len(changed)} ASIN(s) → {len(pages)} page(s)')
+        for path in batch:
+            if path.parent != reviews_dir or path.suffix != '.astro':
+                continue
+            slug = source_slug(path)
+            if path.name == f'{slug}.astro' and is_own_write(manifest, slug, path):
+                continue
+            slugs.add(slug)
+
+        todo = {slug: categories[slug] for slug in sorted(slugs) if slug in categories}
+        if not todo:
+            continue
+        print(f'\n🔄 {len(batch)} fichier(s) modifié(s) → {len(todo)} page(s): {", ".join(todo)}')
+        counts = render_pages(todo, real_data, reviews_dir, index, manifest, force=force,
+                              sync_fallbacks=sync_fallbacks)
+        print(f'⚡ {counts["written"]} écrite(s), {counts["unchanged"]} inchangée(s), {counts["errors"]} erreur(s) '
+              f'en {(time.perf_counter() - start) * 1000:.0f} ms')
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère les pages reviews dynamiques depuis verified-asins-all.json")
+    parser.add_argument('categories', nargs='*', help="Slugs à régénérer (défaut: toutes les catégories)")
+    parser.add_argument('--config', default=CATEGORIES_PATH, help="Chemin vers verified-asins-all.json")
+    parser.add_argument('--reviews-dir', default=REVIEWS_DIR, help="Dossier des pages .astro")
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help="Nombre de processus pour le rendu (0 = tous les coeurs)")
+    parser.add_argument('--dry-run', action='store_true', help="N'écrit rien, liste les pages qui changeraient")
+    parser.add_argument('--diff', action='store_true', help="Comme --dry-run, avec le diff unifié de chaque page")
+    parser.add_argument('--manifest', default=MANIFEST_PATH, help=f"Manifeste des entrées par page (défaut: {MANIFEST_PATH})")
+    parser.add_argument('--force', action='store_true', help="Ignore le manifeste et compare chaque page rendue")
+    parser.add_argument('--asins', type=lambda v: [a for a in v.split(',') if a], metavar='ASIN,...',
+                        help="Ne régénère que les pages qui montrent ces ASINs (index ASIN -> pages)")
+    parser.add_argument('--sync-fallbacks', action='store_true',
+                        help="Remplace les fallbacks des pages par les vraies données actuelles")
+    parser.add_argument('--real-data', default=REAL_DATA_PATH, help="Chemin vers real-review-counts.json")
+    parser.add_argument('--page-index', default=PAGE_INDEX_PATH, help=f"Index ASIN -> pages (défaut: {PAGE_INDEX_PATH})")
+    parser.add_argument('--profile', nargs='?', const=PROFILE_PATH, default=None, metavar='TRACE',
+                        help=f"Temps mur/CPU/octets par phase et par page + trace Chrome/Perfetto (défaut: {PROFILE_PATH})")
+    parser.add_argument('--cprofile', action='store_true',
+                        help="Avec --profile: cProfile du processus principal (top fonctions + TRACE.pstats)")
+    parser.add_argument('--watch', action='store_true',
+                        help="Reste actif: régénère les pages dont la config, la page source ou les vraies données changent")
+    args = parser.parse_args()
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    if args.watch:
+        try:
+            watch_pages(args.config, args.reviews_dir, args.manifest, args.force, args.sync_fallbacks,
+                        args.page_index, args.real_data)
+        except KeyboardInterrupt:
+            print('\n👋 Surveillance arrêtée')
+        return
+    if args.profile:
+        PROFILER.start(cprofile=args.cprofile)
+    process_all_pages(args.config, args.reviews_dir, jobs, args.categories, args.dry_run, args.diff,
+                      args.manifest, args.force, args.asins, args.sync_fallbacks, args.page_index,
+                      args.real_data)
+    if args.profile:
+        PROFILER.report(args.profile)
 
 if __name__ == '__main__':
-    process_all_pages()
\ No newline at end of file
+    main()
\ No newline at end of file
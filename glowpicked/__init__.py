@@ -0,0 +1,3 @@
+"""
+Outils partagés GlowPicked (audit, générateur, benchmarks)
+"""
@@ -0,0 +1,148 @@
+"""
+Cache incrémental de l'audit - pages parsées et vérifications par ASIN
+
+Pages are keyed by path and validated by (mtime_ns, size) first, then by a
+content hash, so a touched-but-identical file is not re-parsed. Check
+results are memoized per (asin, site rating, site reviews) and dropped only
+for ASINs whose entry in real-review-counts.json changed since the last run.
+
+The cache is a pickle written atomically next to the real data; a warm run
+with nothing changed costs one stat() per page and no parsing. It is
+discarded when its format (CACHE_VERSION) or the extractor
+(EXTRACTOR_VERSION) changed, since the cached products would be stale.
+"""
+
+import hashlib
+import os
+import pickle
+
+from glowpicked.extractor import EXTRACTOR_VERSION
+
+CACHE_VERSION = 1
+
+
+def file_digest(data):
+    """Content hash of a page (bytes)"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _real_entry(real):
+    if not real:
+        return None
+    return (real.get('rating'), real.get('reviews'))
+
+
+class AuditCache:
+    """On-disk cache of extracted products and check results"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.pages = {}
+        self.real = {}
+        self.checks = {}
+        self.dirty = False
+        self._pending = {}
+        self._seen = set()
+        self.stats = {'hits': 0, 'rehashed': 0, 'parsed': 0, 'rechecked': 0}
+        self._load()
+
+    def _load(self):
+        """Load the cache; a missing, stale or corrupt one leaves it empty"""
+        try:
+            with open(self.path, 'rb') as f:
+                data = pickle.load(f)
+            if (not isinstance(data, dict) or data.get('version') != CACHE_VERSION
+                    or data.get('extractor') != EXTRACTOR_VERSION):
+                return
+            pages, real, checks = data['pages'], data['real'], data['checks']
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError,
+                IndexError, KeyError, TypeError):
+            # Truncated write, or pickled by another version of the code
+            return
+        if isinstance(pages, dict) and isinstance(real, dict) and isinstance(checks, dict):
+            self.pages, self.real, self.checks = pages, real, checks
+
+    def cached_products(self, file_path):
+        """Return the cached products of a page, or None if it must be re-parsed"""
+        key = str(file_path)
+        self._seen.add(key)
+        try:
+            st = os.stat(key)
+            entry = self.pages.get(key)
+            if entry and entry['mtime_ns'] == st.st_mtime_ns and entry['size'] == st.st_size:
+                self.stats['hits'] += 1
+                return entry['products']
+
+            with open(key, 'rb') as f:
+                digest = file_digest(f.read())
+        except OSError:
+            # Unreadable page: not cached, the extraction reports it as it does uncached
+            if self.pages.pop(key, None) is not None:
+                self.dirty = True
+            return None
+        if entry and entry['digest'] == digest:
+            # Touched (git checkout, editor save) but same content
+            entry['mtime_ns'] = st.st_mtime_ns
+            entry['size'] = st.st_size
+            self.dirty = True
+            self.stats['rehashed'] += 1
+            return entry['products']
+
+        self._pending[key] = (st.st_mtime_ns, st.st_size, digest)
+        return None
+
+    def store_products(self, file_path, products):
+        """Record freshly extracted products for a page seen by cached_products()"""
+        key = str(file_path)
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return  # Unreadable when seen: nothing to cache
+        mtime_ns, size, digest = pending
+        self.pages[key] = {'mtime_ns': mtime_ns, 'size': size, 'digest': digest, 'products': products}
+        self.dirty = True
+        self.stats['parsed'] += 1
+
+    def sync_real_data(self, real_data):
+        """Drop memoized checks of ASINs whose real data changed; return those ASINs"""
+        current = {asin: _real_entry(real) for asin, real in real_data.items()}
+        changed = {
+            asin for asin in current.keys() | self.real.keys()
+            if current.get(asin) != self.real.get(asin)
+        }
+        if changed:
+            self.checks = {key: result for key, result in self.checks.items() if key[0] not in changed}
+            self.real = current
+            self.dirty = True
+        return changed
+
+    def check(self, product, real_data, check_fn):
+        """Memoized check_fn(product, real_data)"""
+        key = (product['asin'], product['rating'], product['reviewCount'])
+        result = self.checks.get(key)
+        if result is None:
+            result = check_fn(product, real_data)
+            self.checks[key] = result
+            self.dirty = True
+            self.stats['rechecked'] += 1
+        return result
+
+    def save(self):
+        """Write the cache atomically if anything changed; forget pages not seen this run"""
+        stale = self.pages.keys() - self._seen
+        if stale:
+            for key in stale:
+                del self.pages[key]
+            self.dirty = True
+        if not self.dirty:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({
+                'version': CACHE_VERSION,
+                'extractor': EXTRACTOR_VERSION,
+                'pages': self.pages,
+                'real': self.real,
+                'checks': self.checks,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
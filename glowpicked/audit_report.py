@@ -0,0 +1,187 @@
+"""
+Sorties de l'audit - texte console, JSONL ou CSV
+
+The text reporter is the historical emoji report; it keeps the error list
+for the detailed section at the end. The JSONL and CSV reporters write one
+record per product as each page is processed, flush per page, and end with
+a single summary record, so memory stays flat whatever the catalog size.
+"""
+
+import csv
+import json
+import sys
+from abc import ABC, abstractmethod
+
+FORMATS = ('text', 'jsonl', 'csv')
+
+CSV_FIELDS = [
+    'type', 'file', 'asin', 'name',
+    'site_rating', 'real_rating', 'site_reviews', 'real_reviews',
+    'rating_error', 'reviews_error', 'status',
+    'kind', 'detail',
+    'pages', 'products', 'errors', 'issues', 'accuracy',
+]
+
+
+def _real_value(value):
+    """'N/A' in the console report, null in machine formats"""
+    return value if isinstance(value, (int, float)) else None
+
+
+def summary_record(pages, products, errors, issues=None):
+    record = {
+        'type': 'summary',
+        'pages': pages,
+        'products': products,
+        'errors': errors,
+        'accuracy': round((products - errors) / products * 100, 1) if products else None,
+    }
+    if issues is not None:
+        record['issues'] = issues
+    return record
+
+
+class TextReporter:
+    """Rapport console historique (emoji, français)"""
+
+    def __init__(self, out=None):
+        self.out = out or sys.stdout
+        self.errors = []
+        self.issues = []
+
+    def _print(self, *args):
+        print(*args, file=self.out)
+
+    def start(self, real_count):
+        self._print("🔍 AUDIT COMPLET - TOUTES LES PAGES REVIEWS")
+        self._print("=" * 80)
+        self._print(f"📊 Vraies données chargées: {real_count} produits")
+        self._print()
+
+    def page_start(self, file_name):
+        self._print(f"📝 ANALYSE: {file_name}")
+        self._print("-" * 60)
+
+    def page_empty(self, file_name):
+        self._print("   ⚠️  Aucun produit trouvé (format non reconnu)")
+        self._print()
+
+    def product(self, record):
+        status = "✅ OK"
+        if record['rating_error'] or record['reviews_error']:
+            status = "❌ ERREUR"
+            self.errors.append(record)
+        self._print(f"   {record['asin'][:12]} | {record['name'][:25]:<25} | "
+                    f"{record['site_rating']:>4} vs {record['real_rating']:>4} | "
+                    f"{record['site_reviews']:>8,} vs {record['real_reviews']:>8} | {status}")
+
+    def issue(self, record):
+        """Page structure problem (built HTML audit): card vs JSON-LD mismatch, missing schema..."""
+        self.issues.append(record)
+        asin = f"{record['asin']} " if record['asin'] else ''
+        detail = f" ({record['detail']})" if record['detail'] else ''
+        self._print(f"   ⚠️  {asin}{record['kind']}{detail}")
+
+    def page_end(self, file_name):
+        self._print()
+
+    def summary(self, summary):
+        self._print("📊 RÉSUMÉ AUDIT COMPLET")
+        self._print("=" * 80)
+        self._print(f"📄 Pages analysées: {summary['pages']}")
+        self._print(f"🛍️  Produits analysés: {summary['products']}")
+        self._print(f"❌ Erreurs trouvées: {summary['errors']}")
+        if 'issues' in summary:
+            self._print(f"⚠️  Problèmes de structure: {summary['issues']}")
+        if summary['accuracy'] is not None:
+            self._print(f"✅ Précision: {summary['accuracy']:.1f}%")
+        self._print()
+
+        if self.errors:
+            self._print("🚨 ERREURS DÉTAILLÉES:")
+            self._print("-" * 80)
+            for error in self.errors:
+                self._print(f"📄 {error['file']}")
+                self._print(f"   🛍️  {error['name']} ({error['asin']})")
+                if error['rating_error']:
+                    self._print(f"   ⭐ Rating: {error['site_rating']} (site) vs {error['real_rating']} (réel)")
+                if error['reviews_error']:
+                    self._print(f"   📊 Reviews: {error['site_reviews']:,} (site) vs {error['real_reviews']} (réel)")
+                self._print()
+        # The detailed list covers one run: a --watch batch reuses the reporter
+        self.errors = []
+        self.issues = []
+
+    def note(self, message):
+        self._print(message)
+
+
+class _StreamingReporter(ABC):
+    """Base for machine formats: nothing kept in memory, notes go to stderr"""
+
+    def __init__(self, out=None):
+        self.out = out or sys.stdout
+
+    def start(self, real_count):
+        pass
+
+    def page_start(self, file_name):
+        pass
+
+    def page_empty(self, file_name):
+        self.write({'type': 'warning', 'file': file_name, 'status': 'no_products'})
+
+    def product(self, record):
+        self.write({
+            'type': 'product',
+            **record,
+            'real_rating': _real_value(record['real_rating']),
+            'real_reviews': _real_value(record['real_reviews']),
+            'status': 'error' if record['rating_error'] or record['reviews_error'] else 'ok',
+        })
+
+    def issue(self, record):
+        self.write({'type': 'issue', 'file': record['file'], 'asin': record['asin'],
+                    'kind': record['kind'], 'detail': record['detail']})
+
+    def page_end(self, file_name):
+        self.out.flush()
+
+    def summary(self, summary):
+        self.write(summary)
+        self.out.flush()
+
+    def note(self, message):
+        print(message, file=sys.stderr)
+
+    @abstractmethod
+    def write(self, record):
+        """Write one record in the output format"""
+
+
+class JsonlReporter(_StreamingReporter):
+    """Un objet JSON par ligne"""
+
+    def write(self, record):
+        self.out.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+class CsvReporter(_StreamingReporter):
+    """CSV à colonnes fixes; une ligne issue remplit kind/detail, la ligne summary
+    pages/products/errors/issues/accuracy"""
+
+    def __init__(self, out=None):
+        super().__init__(out)
+        self.writer = csv.DictWriter(self.out, fieldnames=CSV_FIELDS, extrasaction='ignore')
+        self.writer.writeheader()
+
+    def write(self, record):
+        self.writer.writerow(record)
+
+
+def make_reporter(output_format, out=None):
+    return {
+        'text': TextReporter,
+        'jsonl': JsonlReporter,
+        'csv': CsvReporter,
+    }[output_format](out)
@@ -0,0 +1,160 @@
+"""
+Audit en colonnes - vérification vectorisée site vs vraies données
+
+All extracted products are laid out as columns (ASIN, site rating, site
+reviews), joined once to the real data by ASIN, and the deltas, tolerance
+flags and missing-data flags are computed for every row in one pass:
+NumPy when it is installed, the stdlib `array` module otherwise. Results are
+row-for-row identical to audit-all-pages.py's check_product():
+
+    rating error   no numeric real rating, or |site - real| > RATING_TOLERANCE
+    reviews error  no numeric real count, or |site - real| > max(real * 10%, 1000)
+
+Deltas are NaN on rows whose real value is missing.
+"""
+
+from array import array
+from itertools import repeat
+from operator import itemgetter, sub
+
+try:
+    import numpy as np
+except ImportError:  # optional: the array-module path gives the same results
+    np = None
+
+RATING_TOLERANCE = 0.05
+REVIEWS_TOLERANCE_RATIO = 0.1
+REVIEWS_TOLERANCE_MIN = 1000
+MISSING = 'N/A'
+NAN = float('nan')
+
+
+def _is_number(value):
+    return isinstance(value, (int, float))
+
+
+class RealColumns:
+    """real-review-counts.json (dict or RealDataStore) as columns indexed by ASIN"""
+
+    def __init__(self, real_data):
+        self.index = {}
+        # Raw values as check_product() reports them ('N/A' when absent)
+        self.rating_values = []
+        self.reviews_values = []
+        self.rating = array('d')
+        self.reviews = array('d')
+        self.has_rating = array('b')
+        self.has_reviews = array('b')
+        for asin, real in real_data.items():
+            rating = real.get('rating', MISSING) if real else MISSING
+            reviews = real.get('reviews', MISSING) if real else MISSING
+            self.index[asin] = len(self.rating_values)
+            self.rating_values.append(rating)
+            self.reviews_values.append(reviews)
+            self.has_rating.append(_is_number(rating))
+            self.has_reviews.append(_is_number(reviews))
+            self.rating.append(rating if _is_number(rating) else NAN)
+            self.reviews.append(reviews if _is_number(reviews) else NAN)
+
+    def __len__(self):
+        return len(self.rating_values)
+
+
+class ProductColumns:
+    """Extracted products as columns; rows keep the order in which they were added"""
+
+    def __init__(self):
+        self.asins = []
+        self.rating = array('d')
+        self.reviews = array('d')
+
+    def extend(self, products):
+        if not isinstance(products, list):
+            products = list(products)
+        self.asins.extend(map(itemgetter('asin'), products))
+        self.rating.extend(map(itemgetter('rating'), products))
+        self.reviews.extend(map(itemgetter('reviewCount'), products))
+
+    def __len__(self):
+        return len(self.asins)
+
+
+class ColumnarResult:
+    """Per-row join index, deltas and flags (array-like columns)"""
+
+    def __init__(self, real, real_index, rating_delta, reviews_delta,
+                 rating_missing, reviews_missing, rating_error, reviews_error):
+        self.real = real
+        self.real_index = real_index
+        self.rating_delta = rating_delta
+        self.reviews_delta = reviews_delta
+        self.rating_missing = rating_missing
+        self.reviews_missing = reviews_missing
+        self.rating_error = rating_error
+        self.reviews_error = reviews_error
+
+    def __len__(self):
+        return len(self.real_index)
+
+    def error_count(self):
+        if np is not None and isinstance(self.rating_error, np.ndarray):
+            return int(np.count_nonzero(self.rating_error | self.reviews_error))
+        return sum(1 for r, n in zip(self.rating_error, self.reviews_error) if r or n)
+
+    def rows(self):
+        """Yield (real_rating, real_reviews, rating_error, reviews_error) like check_product()"""
+        real = self.real
+        for i, rating_error, reviews_error in zip(self.real_index, self.rating_error, self.reviews_error):
+            if i < 0:
+                yield MISSING, MISSING, True, True
+            else:
+                yield real.rating_values[i], real.reviews_values[i], bool(rating_error), bool(reviews_error)
+
+
+def _evaluate_numpy(real, idx, site_rating, site_reviews):
+    idx = np.frombuffer(idx, dtype=np.int64)
+    found = idx >= 0
+    safe = np.where(found, idx, 0)
+
+    real_rating = np.where(found, np.frombuffer(real.rating, dtype=np.float64)[safe], np.nan)
+    real_reviews = np.where(found, np.frombuffer(real.reviews, dtype=np.float64)[safe], np.nan)
+    rating_missing = ~(found & (np.frombuffer(real.has_rating, dtype=np.int8)[safe] != 0))
+    reviews_missing = ~(found & (np.frombuffer(real.has_reviews, dtype=np.int8)[safe] != 0))
+
+    rating_delta = np.frombuffer(site_rating, dtype=np.float64) - real_rating
+    reviews_delta = np.frombuffer(site_reviews, dtype=np.float64) - real_reviews
+    tolerance = np.maximum(real_reviews * REVIEWS_TOLERANCE_RATIO, REVIEWS_TOLERANCE_MIN)
+    return ColumnarResult(
+        real, idx, rating_delta, reviews_delta, rating_missing, reviews_missing,
+        rating_missing | (np.abs(rating_delta) > RATING_TOLERANCE),
+        reviews_missing | (np.abs(reviews_delta) > tolerance),
+    )
+
+
+def _evaluate_array(real, idx, site_rating, site_reviews):
+    # One sentinel "missing" row at the end: index -1 (ASIN not found) lands on it
+    real_rating = real.rating + array('d', [NAN])
+    real_reviews = real.reviews + array('d', [NAN])
+    has_rating = real.has_rating + array('b', [0])
+    has_reviews = real.has_reviews + array('b', [0])
+
+    rating_missing = array('b', [not has_rating[i] for i in idx])
+    reviews_missing = array('b', [not has_reviews[i] for i in idx])
+    matched_reviews = [real_reviews[i] for i in idx]
+    rating_delta = array('d', map(sub, site_rating, [real_rating[i] for i in idx]))
+    reviews_delta = array('d', map(sub, site_reviews, matched_reviews))
+    tolerance = map(max, [n * REVIEWS_TOLERANCE_RATIO for n in matched_reviews], repeat(REVIEWS_TOLERANCE_MIN))
+
+    rating_error = array('b', [m or abs(d) > RATING_TOLERANCE
+                               for m, d in zip(rating_missing, rating_delta)])
+    reviews_error = array('b', [m or abs(d) > t
+                                for m, d, t in zip(reviews_missing, reviews_delta, tolerance)])
+    return ColumnarResult(real, idx, rating_delta, reviews_delta,
+                          rating_missing, reviews_missing, rating_error, reviews_error)
+
+
+def evaluate(columns, real):
+    """Join product columns to RealColumns by ASIN and compute every flag in one pass"""
+    idx = array('q', map(real.index.get, columns.asins, repeat(-1)))
+    evaluate_fn = _evaluate_numpy if np is not None and len(real) else _evaluate_array
+    return evaluate_fn(real, idx, columns.rating, columns.reviews)
@@ -0,0 +1,289 @@
+"""
+Extracteur produits - une seule passe sur le frontmatter Astro
+
+Scans the frontmatter once, left to right, with precompiled patterns and
+evaluates every `const x = {...}` / `const x = [...]` literal on the way,
+whether it is written JS-style (`name: "..."`) or JSON-style
+(`"name": "..."`). Every object with a `name` and an `asin` is a product,
+in source order.
+
+JSON-compatible sub-literals (the arrays json.dumps() writes into generated
+pages, JSON-style pages) are decoded by the C json scanner; only JS-only
+syntax goes through the token parser. Nothing backtracks across products.
+
+Pages produced by generate-all-dynamic-pages.py carry no rating/reviewCount
+in `baseProducts`; those are filled in from the page's `fallbacks` object.
+"""
+
+import json
+import re
+
+# Start of a top-level literal declaration: `const name = {` / `= [`
+_DECLARATION_RE = re.compile(r'\b(?:const|let|var)\s+([A-Za-z_$][\w$]*)\s*=\s*(?=[{\[])')
+
+# Next significant token; whitespace and comments are skipped in the prefix
+_TOKEN_RE = re.compile(r"""
+    (?:\s|//[^\n]*|/\*.*?\*/)*
+    (
+        "[^"\\\n]*(?:\\.[^"\\\n]*)*" | '[^'\\\n]*(?:\\.[^'\\\n]*)*'
+      | `[^`\\$]*(?:(?:\\.|\$(?!\{))[^`\\$]*)*`
+      | -?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?
+      | [A-Za-z_$][\w$]*
+      | \.\.\. | .
+    )
+""", re.VERBOSE | re.DOTALL)
+
+# A flat object: keys mapping to scalars or arrays of scalars, no comments.
+# That is the shape of a JS-style product, matched (and split) in C.
+_STRING = r'"[^"\\\n]*(?:\\.[^"\\\n]*)*"|\'[^\'\\\n]*(?:\\.[^\'\\\n]*)*\''
+_SCALAR = r'(?:' + _STRING + r'|-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?|true|false|null|undefined)'
+_ARRAY = r'\[\s*(?:' + _SCALAR + r'\s*(?:,\s*' + _SCALAR + r'\s*)*,?\s*)?\]'
+_PAIR = r'([A-Za-z_$][\w$]*|' + _STRING + r')\s*:\s*(' + _SCALAR + r'|' + _ARRAY + r')'
+_FLAT_OBJECT_RE = re.compile(r'\{\s*(?:' + _PAIR + r'\s*(?:,\s*' + _PAIR + r'\s*)*,?\s*)?\}')
+_PAIR_RE = re.compile(_PAIR)
+_SCALAR_RE = re.compile(_SCALAR)
+
+_FRONTMATTER_RE = re.compile(r'\A\s*---[ \t]*\r?\n(.*?)^---[ \t]*$', re.DOTALL | re.MULTILINE)
+
+_ESCAPE_RE = re.compile(r'\\(u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|.)', re.DOTALL)
+_SIMPLE_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v', '0': '\0'}
+
+_KEYWORD_VALUES = {'true': True, 'false': False, 'null': None, 'undefined': None}
+
+_json_decode = json.JSONDecoder().raw_decode
+
+FALLBACKS_NAME = 'fallbacks'
+
+# Bump whenever extract_products() can return something different for the
+# same page: caches of extracted products (audit cache) are discarded
+EXTRACTOR_VERSION = 2
+
+
+class _NotLiteral(Exception):
+    """Raised when a declaration's value is code rather than a plain literal"""
+
+
+def _unescape(match):
+    esc = match.group(1)
+    if esc[0] in 'ux' and len(esc) > 1:
+        return chr(int(esc[1:], 16))
+    return _SIMPLE_ESCAPES.get(esc, esc)
+
+
+def _string_value(token):
+    body = token[1:-1]
+    if '\\' not in body:
+        return body
+    return _ESCAPE_RE.sub(_unescape, body)
+
+
+def _number_value(token):
+    if '.' in token or 'e' in token or 'E' in token:
+        return float(token)
+    return int(token)
+
+
+def _is_string(token):
+    return token[0] in '"\'`'
+
+
+def _is_number(token):
+    c = token[0]
+    return c.isdigit() or (c in '-.' and len(token) > 1 and token[1].isdigit())
+
+
+def _is_ident(token):
+    c = token[0]
+    return c.isalpha() or c in '_$'
+
+
+def _token(source, pos):
+    """Return (token, token_start, next_pos) for the token at or after pos"""
+    match = _TOKEN_RE.match(source, pos)
+    if match is None:
+        raise _NotLiteral('<eof>')
+    return match.group(1), match.start(1), match.end()
+
+
+def _looks_like_json(source, token, pos):
+    """Cheap lookahead after an opening bracket: is this literal JSON-style?
+
+    A failed json decode costs O(position) (the error computes a line
+    number), so it is only attempted when it is expected to succeed.
+    """
+    nxt, _, after = _token(source, pos)
+    if token == '[':
+        if nxt != '{':
+            return nxt == ']' or nxt == '[' or nxt[0] == '"' or _is_number(nxt) or nxt in _KEYWORD_VALUES
+        nxt, _, _ = _token(source, after)
+    return nxt == '}' or nxt[0] == '"'
+
+
+def _scalar_value(token):
+    if _is_string(token):
+        return _string_value(token)
+    if token in _KEYWORD_VALUES:
+        return _KEYWORD_VALUES[token]
+    return _number_value(token)
+
+
+def _flat_object_value(text):
+    obj = {}
+    for key, value in _PAIR_RE.findall(text):
+        if _is_string(key):
+            key = _string_value(key)
+        if value[0] == '[':
+            obj[key] = [_scalar_value(item) for item in _SCALAR_RE.findall(value)]
+        else:
+            obj[key] = _scalar_value(value)
+    return obj
+
+
+def _parse_value(source, pos):
+    """Parse one literal at or after pos; return (value, next_pos)"""
+    return _value_at(source, *_token(source, pos))
+
+
+def _value_at(source, token, start, pos):
+    """Parse the literal whose first token was just read"""
+    if token == '{':
+        # Fast paths, both in C: flat JS/JSON object, then any JSON object
+        match = _FLAT_OBJECT_RE.match(source, start)
+        if match is not None:
+            return _flat_object_value(match.group()), match.end()
+        if _looks_like_json(source, token, pos):
+            try:
+                return _json_decode(source, start)
+            except ValueError:
+                pass
+        return _parse_object(source, pos)
+    if token == '[':
+        if _looks_like_json(source, token, pos):
+            try:
+                return _json_decode(source, start)
+            except ValueError:
+                pass
+        return _parse_array(source, pos)
+    if _is_string(token):
+        return _string_value(token), pos
+    if _is_number(token):
+        return _number_value(token), pos
+    if token in _KEYWORD_VALUES:
+        return _KEYWORD_VALUES[token], pos
+    raise _NotLiteral(token)
+
+
+def _parse_object(source, pos):
+    obj = {}
+    while True:
+        token, _, pos = _token(source, pos)
+        if token == '}':
+            return obj, pos
+        if _is_string(token):
+            key = _string_value(token)
+        elif _is_ident(token) or _is_number(token):
+            key = token
+        else:
+            raise _NotLiteral(token)
+        token, _, pos = _token(source, pos)
+        if token != ':':
+            raise _NotLiteral(token)
+        obj[key], pos = _parse_value(source, pos)
+        token, _, pos = _token(source, pos)
+        if token == '}':
+            return obj, pos
+        if token != ',':
+            raise _NotLiteral(token)
+
+
+def _parse_array(source, pos):
+    items = []
+    while True:
+        token, start, pos = _token(source, pos)
+        if token == ']':
+            return items, pos
+        value, pos = _value_at(source, token, start, pos)
+        items.append(value)
+        token, _, pos = _token(source, pos)
+        if token == ']':
+            return items, pos
+        if token != ',':
+            raise _NotLiteral(token)
+
+
+def parse_declarations(source):
+    """Return [(name, value)] for every `const name = <literal>` in source, in source order.
+
+    A name declared twice (in two blocks) gives two entries: both are data.
+    """
+    bindings = []
+    pos = 0
+    while True:
+        match = _DECLARATION_RE.search(source, pos)
+        if match is None:
+            return bindings
+        try:
+            value, pos = _parse_value(source, match.end())
+        except _NotLiteral:
+            # Code, not data (e.g. `{ asin: product.asin }`): keep scanning
+            pos = match.end()
+            continue
+        bindings.append((match.group(1), value))
+
+
+def _is_product(obj):
+    return isinstance(obj.get('name'), str) and isinstance(obj.get('asin'), str)
+
+
+def _collect_products(value, out):
+    if isinstance(value, dict):
+        if _is_product(value):
+            out.append(value)
+            return
+        for item in value.values():
+            _collect_products(item, out)
+    elif isinstance(value, list):
+        for item in value:
+            _collect_products(item, out)
+
+
+def frontmatter(content):
+    """Return the Astro frontmatter block, or the whole content if there is none"""
+    match = _FRONTMATTER_RE.match(content)
+    return match.group(1) if match else content
+
+
+def extract_products(content):
+    """Extract every product of an Astro page, in source order.
+
+    Each product is a dict with at least `name` and `asin`, plus whatever
+    else the literal carries (`rating`, `reviewCount`, `pros`, `con`...).
+    Missing rating/reviewCount are taken from the page's `fallbacks`.
+    """
+    fallbacks = {}
+    found = []
+    for name, value in parse_declarations(frontmatter(content)):
+        if name == FALLBACKS_NAME:
+            if isinstance(value, dict):
+                fallbacks.update(value)
+            continue
+        _collect_products(value, found)
+
+    products = []
+    for raw in found:
+        product = dict(raw)
+        product['name'] = product['name'].strip()
+        product['asin'] = product['asin'].strip()
+        fallback = fallbacks.get(product['asin'])
+        if isinstance(fallback, dict):
+            for key in ('rating', 'reviewCount'):
+                if key not in product and key in fallback:
+                    product[key] = fallback[key]
+        products.append(product)
+    return products
+
+
+def extract_products_from_file(file_path):
+    """Read an Astro page and extract its products"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return extract_products(f.read())
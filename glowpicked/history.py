@@ -0,0 +1,415 @@
+"""
+Historique des vraies données - snapshots append-only de real-review-counts.json
+
+Every weekly verification appends one snapshot of every value it observed to
+`review-history.jsonl`; real-review-counts.json, what the site publishes,
+only takes the significant changes. `materialize` regenerates it from a
+snapshot (to roll back, or to publish every observed value).
+
+Each line is one snapshot, stored as columns:
+
+    {"date": "2026-10-12", "full": false, "asins": [...], "rating": [...],
+     "reviews": [...], "removed": [...]}
+
+A "full" snapshot (keyframe) lists every ASIN with absolute values. The
+others only list the ASINs that changed since the previous snapshot, and
+their review counts are deltas from the previous count (absolute when there
+was no previous count). A keyframe is written every KEYFRAME_EVERY snapshots,
+so reading the data as of any date replays at most that many lines.
+
+`review-history.idx` holds one `date offset length full` line per snapshot:
+queries seek straight to the keyframe they need instead of reading the whole
+history. It is rebuilt from the history if missing or behind. The same
+format is written by scripts/lib/review-history.js (weekly verification).
+
+Usage: python3 -m glowpicked.history {import,materialize,as-of,range,movers} ...
+"""
+
+import argparse
+import bisect
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+KEYFRAME_EVERY = 8
+HISTORY_NAME = 'review-history.jsonl'
+
+
+class NoSnapshotError(LookupError):
+    """No snapshot taken on or before the requested date (or an empty history)"""
+
+
+def history_path(json_path):
+    """data/real-review-counts.json -> data/review-history.jsonl"""
+    return os.path.join(os.path.dirname(str(json_path)), HISTORY_NAME)
+
+
+def index_path(path):
+    root, _ = os.path.splitext(str(path))
+    return root + '.idx'
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _entry(rating, reviews):
+    return {'reviews': reviews, 'rating': rating}
+
+
+def _js_number(value):
+    """4.0 -> 4, as JSON.stringify writes it (history lines and views stay byte-identical to the JS)"""
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e21:
+        return int(value)
+    return value
+
+
+def _js_numbers(data):
+    if isinstance(data, dict):
+        return {key: _js_numbers(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_js_numbers(value) for value in data]
+    return _js_number(data)
+
+
+def write_json_atomic(path, data):
+    """real-review-counts.json as the weekly script always wrote it (indent 2, no final newline).
+
+    Left untouched (same mtime) when it already holds this data; returns True if written.
+    """
+    content = json.dumps(_js_numbers(data), indent=2, ensure_ascii=False)
+    try:
+        with open(path, encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return True
+
+
+class ReviewHistory:
+    """Append-only snapshot store; every query returns plain dicts like real-review-counts.json"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.index_path = index_path(self.path)
+        # One entry per snapshot: (date, offset, length, full)
+        self.index = []
+        self._load_index()
+
+    def __len__(self):
+        return len(self.index)
+
+    def dates(self):
+        return [entry[0] for entry in self.index]
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, encoding='ascii') as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) == 4:
+                        self.index.append((parts[0], int(parts[1]), int(parts[2]), parts[3] == '1'))
+        except (OSError, ValueError):
+            self.index = []
+        self._catch_up()
+
+    def _catch_up(self):
+        """Index the complete snapshots the index does not know about (crash between the two writes)"""
+        end = self.index[-1][1] + self.index[-1][2] if self.index else 0
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        if end > size:
+            # History truncated or replaced: start over
+            self.index, end = [], 0
+        if end == size:
+            return
+        added = []
+        with open(self.path, 'rb') as f:
+            f.seek(end)
+            offset = end
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Half-written last snapshot: ignored, truncated by the next append
+                try:
+                    snapshot = json.loads(line)
+                except ValueError:
+                    break
+                added.append((snapshot['date'], offset, len(line), bool(snapshot.get('full'))))
+                offset += len(line)
+        self.index.extend(added)
+        self._write_index(rewrite=True)
+
+    def _write_index(self, rewrite=False, entries=None):
+        mode = 'w' if rewrite else 'a'
+        with open(self.index_path, mode, encoding='ascii') as f:
+            for date, offset, length, full in (self.index if rewrite else entries):
+                f.write(f"{date} {offset} {length} {int(full)}\n")
+
+    def _position(self, date):
+        """Index of the last snapshot taken on or before date (-1 if none)"""
+        if date is None:
+            return len(self.index) - 1
+        return bisect.bisect_right(self.dates(), str(date)) - 1
+
+    def _lines(self, first, last):
+        """Raw lines of snapshots first..last (inclusive), read at once"""
+        start = self.index[first][1]
+        end = self.index[last][1] + self.index[last][2]
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            return f.read(end - start).splitlines()
+
+    def _snapshots(self, first, last):
+        return [json.loads(line) for line in self._lines(first, last)]
+
+    def _keyframe_before(self, position):
+        while position > 0 and not self.index[position][3]:
+            position -= 1
+        return position
+
+    @staticmethod
+    def _apply(state, snapshot):
+        if snapshot.get('full'):
+            state.clear()
+        for asin in snapshot.get('removed', ()):
+            state.pop(asin, None)
+        for asin, rating, reviews in zip(snapshot['asins'], snapshot['rating'], snapshot['reviews']):
+            previous = state.get(asin)
+            if (reviews is not None and not snapshot.get('full') and previous
+                    and _is_number(previous['reviews'])):
+                reviews += previous['reviews']
+            state[asin] = _entry(rating, reviews)
+
+    def as_of(self, date=None, strict=False):
+        """Real data as it was on date (ISO string; None = latest).
+
+        Before the first snapshot: {}, or NoSnapshotError if strict.
+        """
+        position = self._position(date)
+        state = {}
+        if position < 0:
+            if strict:
+                raise NoSnapshotError(f"Aucun snapshot au {date}" if date and self.index
+                                      else f"Historique vide: {self.path}")
+            return state
+        for snapshot in self._snapshots(self._keyframe_before(position), position):
+            self._apply(state, snapshot)
+        return state
+
+    def range(self, asin, start=None, end=None):
+        """Columns (dates, rating, reviews) of an ASIN between two dates, one row per recorded change.
+
+        The first row is its value as of `start`.
+        """
+        columns = {'dates': [], 'rating': [], 'reviews': []}
+        last = self._position(end)
+        if last < 0:
+            return columns
+        first = max(self._position(start), 0) if start is not None else 0
+        key = json.dumps(asin).encode('utf-8')
+        value = None
+        keyframe = self._keyframe_before(first)
+        for position, line in enumerate(self._lines(keyframe, last), keyframe):
+            if key in line:
+                # Only snapshots that mention the ASIN are decoded
+                snapshot = json.loads(line)
+                state = {asin: value} if value else {}
+                self._apply(state, snapshot)
+                value = state.get(asin)
+            elif self.index[position][3]:
+                value = None  # Not in a keyframe: no longer tracked
+            elif position > first:
+                continue
+            if position < first or value is None:
+                continue
+            if columns['dates'] and (columns['rating'][-1], columns['reviews'][-1]) == (value['rating'], value['reviews']):
+                continue  # Listed again by a keyframe, unchanged
+            columns['dates'].append(self.index[position][0])
+            columns['rating'].append(value['rating'])
+            columns['reviews'].append(value['reviews'])
+        return columns
+
+    def top_movers(self, start, end=None, limit=10, by='reviews'):
+        """ASINs whose rating or review count moved most between two dates.
+
+        Returns [(asin, before, after, delta)], largest absolute delta first.
+        """
+        before = self.as_of(start)
+        after = self.as_of(end)
+        movers = []
+        for asin, value in after.items():
+            old = before.get(asin)
+            if not old or not _is_number(old[by]) or not _is_number(value[by]):
+                continue
+            delta = value[by] - old[by]
+            if delta:
+                movers.append((asin, old[by], value[by], round(delta, 2) if by == 'rating' else delta))
+        movers.sort(key=lambda m: (-abs(m[3]), m[0]))
+        return movers[:limit]
+
+    def last_changes(self):
+        """ASIN -> date of the snapshot where it last changed, for the ASINs of the latest snapshot.
+
+        One pass over the whole history, one snapshot decoded at a time.
+        """
+        state = {}
+        changed = {}
+        end = self.index[-1][1] + self.index[-1][2] if self.index else 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if f.tell() > end:
+                    break  # Not indexed yet (half-written)
+                snapshot = json.loads(line)
+                full = snapshot.get('full')
+                if full:
+                    for asin in state.keys() - set(snapshot['asins']):
+                        del state[asin]
+                        changed.pop(asin, None)
+                for asin in snapshot.get('removed', ()):
+                    state.pop(asin, None)
+                    changed.pop(asin, None)
+                for asin, rating, reviews in zip(snapshot['asins'], snapshot['rating'], snapshot['reviews']):
+                    previous = state.get(asin)
+                    if reviews is not None and not full and previous and _is_number(previous['reviews']):
+                        reviews += previous['reviews']
+                    value = _entry(rating, reviews)
+                    if value != previous:
+                        state[asin] = value
+                        changed[asin] = snapshot['date']
+        return changed
+
+    def append(self, date, data):
+        """Record data (ASIN -> {reviews, rating}) as the snapshot of date; return True if a keyframe.
+
+        A snapshot of the same date as the last one replaces it (run restarted the same day).
+        """
+        date = str(date)
+        if self.index and date < self.index[-1][0]:
+            raise ValueError(f"Snapshot du {date} antérieur au dernier ({self.index[-1][0]})")
+        if self.index and date == self.index[-1][0]:
+            self.index.pop()
+            self._write_index(rewrite=True)
+        previous = self.as_of() if self.index else {}
+        last = len(self.index) - 1
+        full = not self.index or last - self._keyframe_before(last) + 1 >= KEYFRAME_EVERY
+
+        snapshot = {'date': date, 'full': full, 'asins': [], 'rating': [], 'reviews': []}
+        for asin, value in data.items():
+            value = value or {}
+            rating, reviews = _js_number(value.get('rating')), _js_number(value.get('reviews'))
+            old = previous.get(asin)
+            if not full and old == _entry(rating, reviews):
+                continue
+            if not full and old is not None and _is_number(old['reviews']) and reviews is not None:
+                reviews -= old['reviews']
+            snapshot['asins'].append(asin)
+            snapshot['rating'].append(rating)
+            snapshot['reviews'].append(reviews)
+        if not full:
+            removed = [asin for asin in previous if asin not in data]
+            if removed:
+                snapshot['removed'] = removed
+
+        line = (json.dumps(snapshot, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+        offset = self.index[-1][1] + self.index[-1][2] if self.index else 0
+        with open(self.path, 'ab') as f:
+            f.truncate(offset)  # Drop a half-written snapshot left by a crash
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        entry = (date, offset, len(line), full)
+        self.index.append(entry)
+        self._write_index(entries=[entry])
+        return full
+
+    def materialize(self, json_path, date=None):
+        """Regenerate real-review-counts.json from the snapshot of date (latest by default).
+
+        Raises NoSnapshotError, leaving the JSON untouched, if there is no such snapshot.
+        """
+        data = self.as_of(date, strict=True)
+        write_json_atomic(json_path, data)
+        return data
+
+
+def data_date(path):
+    """Date of the content of path: its last commit if unmodified since, else its mtime.
+
+    The mtime alone is the checkout date on a fresh clone, not when the content changed.
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    try:
+        modified = subprocess.run(['git', 'status', '--porcelain', '--', name], cwd=directory,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+        committed = subprocess.run(['git', 'log', '-1', '--format=%cs', '--', name], cwd=directory,
+                                   capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        modified, committed = '', ''
+    if committed and not modified:
+        return committed
+    return datetime.fromtimestamp(os.path.getmtime(path)).date().isoformat()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Historique append-only des vraies données")
+    parser.add_argument('--history', default=None, help=f"Chemin de l'historique (défaut: data/{HISTORY_NAME})")
+    parser.add_argument('--real-data', default='data/real-review-counts.json', help="Vue matérialisée")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    cmd = commands.add_parser('import', help="Ajoute real-review-counts.json comme snapshot")
+    cmd.add_argument('--date', help="Date du snapshot (défaut: dernier commit du fichier, sinon sa date de modification)")
+    cmd = commands.add_parser('materialize', help="Régénère real-review-counts.json")
+    cmd.add_argument('--date', help="Snapshot à matérialiser (défaut: le dernier)")
+    cmd = commands.add_parser('as-of', help="Vraies données telles qu'elles étaient à une date")
+    cmd.add_argument('date')
+    cmd = commands.add_parser('range', help="Évolution d'un ASIN")
+    cmd.add_argument('asin')
+    cmd.add_argument('--from', dest='start')
+    cmd.add_argument('--to', dest='end')
+    cmd = commands.add_parser('movers', help="Plus fortes variations entre deux dates")
+    cmd.add_argument('--from', dest='start', required=True)
+    cmd.add_argument('--to', dest='end')
+    cmd.add_argument('--by', choices=('reviews', 'rating'), default='reviews')
+    cmd.add_argument('-n', '--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    history = ReviewHistory(args.history or history_path(args.real_data))
+
+    if args.command == 'import':
+        with open(args.real_data) as f:
+            data = json.load(f)
+        date = args.date or data_date(args.real_data)
+        history.append(date, data)
+        print(f"✅ Snapshot du {date} ajouté: {len(data)} ASINs ({len(history)} snapshots)")
+    elif args.command == 'materialize':
+        try:
+            data = history.materialize(args.real_data, args.date)
+        except NoSnapshotError as e:
+            sys.exit(f"❌ {e}: {args.real_data} non modifié")
+        print(f"✅ {args.real_data} régénéré: {len(data)} ASINs (snapshot {history.dates()[history._position(args.date)]})")
+    elif args.command == 'as-of':
+        try:
+            data = history.as_of(args.date, strict=True)
+        except NoSnapshotError as e:
+            sys.exit(f"❌ {e}")
+        print(json.dumps(data, indent=2, ensure_ascii=False))
+    elif args.command == 'range':
+        columns = history.range(args.asin, args.start, args.end)
+        for date, rating, reviews in zip(columns['dates'], columns['rating'], columns['reviews']):
+            print(f"{date}  {rating}⭐  {reviews:,} reviews" if reviews is not None else f"{date}  {rating}⭐  N/A")
+    elif args.command == 'movers':
+        for asin, before, after, delta in history.top_movers(args.start, args.end, args.limit, args.by):
+            print(f"{asin}  {before} → {after}  ({delta:+,})")
+
+
+if __name__ == '__main__':
+    main()
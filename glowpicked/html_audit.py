@@ -0,0 +1,207 @@
+"""
+Audit du HTML construit - dist/reviews/<slug>/index.html
+
+What search engines index is the built page, not the .astro source: the
+ItemList JSON-LD written by generateProductSchema() and the product cards.
+Each page is streamed through an incremental HTMLParser in fixed-size
+chunks; only the `application/ld+json` script bodies and the `data-asin`
+attributes are kept, no DOM is built.
+
+`extract_built_page()` returns the ItemList products in the same shape as
+the source audit (name, asin, rating, reviewCount, file) so they go through
+the same check_product() tolerances, plus the structural issues found on
+the page (cards missing from the schema and the reverse, unreadable JSON-LD,
+products without AggregateRating).
+
+The site renders `reviewCount` as conservativeRoundDown(real count)
+(src/utils/realProductData.js): built pages are checked against the real
+count rounded the same way, see conservative_round_down().
+"""
+
+import json
+import os
+import re
+from html.parser import HTMLParser
+from pathlib import Path
+
+from glowpicked.profiling import PROFILER
+
+CHUNK_SIZE = 64 * 1024
+
+# https://www.amazon.com/dp/<ASIN>/ref=nosim?tag=...
+ASIN_IN_URL = re.compile(r'/dp/([A-Z0-9]{10})(?:[/?]|$)')
+
+
+def conservative_round_down(count):
+    """conservativeRoundDown() of src/utils/realProductData.js - the reviewCount the site renders"""
+    if count < 1000:
+        step = 100
+    elif count < 10000:
+        step = 1000
+    elif count < 50000:
+        step = 5000
+    else:
+        step = 10000
+    return count // step * step
+
+
+class BuiltPageParser(HTMLParser):
+    """Collects JSON-LD script bodies and card data-asin values as the page is fed"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.json_ld = []
+        self.card_asins = []
+        self._script = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'script':
+            if any(name == 'type' and value == 'application/ld+json' for name, value in attrs):
+                self._script = []
+            return
+        for name, value in attrs:
+            if name == 'data-asin' and value:
+                self.card_asins.append(value)
+                break
+
+    def handle_data(self, data):
+        if self._script is not None:
+            self._script.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == 'script' and self._script is not None:
+            self.json_ld.append(''.join(self._script))
+            self._script = None
+
+
+def page_name(html_path):
+    """dist/reviews/cleansers/index.html -> cleansers/index.html"""
+    path = Path(html_path)
+    return f"{path.parent.name}/{path.name}"
+
+
+def find_built_pages(dist_dir):
+    """Built review pages (dist/reviews/*/index.html), sorted; the reviews listing is skipped"""
+    reviews_dir = Path(dist_dir) / 'reviews'
+    try:
+        entries = sorted(os.scandir(reviews_dir), key=lambda e: e.name)
+    except OSError:
+        return []
+    pages = []
+    for entry in entries:
+        if entry.is_dir():
+            page = Path(entry.path) / 'index.html'
+            if page.is_file():
+                pages.append(page)
+    return pages
+
+
+def _schema_nodes(data):
+    """Every JSON-LD node of a script body (plain object, array or @graph)"""
+    if isinstance(data, list):
+        for node in data:
+            yield from _schema_nodes(node)
+    elif isinstance(data, dict):
+        yield data
+        if isinstance(data.get('@graph'), list):
+            yield from _schema_nodes(data['@graph'])
+
+
+def _item_asin(item):
+    for key in ('sku', 'productID'):
+        if isinstance(item.get(key), str) and item[key]:
+            return item[key]
+    for url in (item.get('url'), (item.get('offers') or {}).get('url')):
+        match = ASIN_IN_URL.search(url) if isinstance(url, str) else None
+        if match:
+            return match.group(1)
+    return None
+
+
+def _issue(file_name, kind, asin=None, detail=''):
+    return {'file': file_name, 'asin': asin, 'kind': kind, 'detail': detail}
+
+
+def read_built_page(html_path, chunk_size=CHUNK_SIZE):
+    """Stream one built page through the parser; returns (json_ld_bodies, card_asins)"""
+    parser = BuiltPageParser()
+    with PROFILER.phase('parse_html', page_name(html_path)) as span:
+        with open(html_path, encoding='utf-8', errors='replace') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                span.add(len(chunk))
+                parser.feed(chunk)
+        parser.close()
+    return parser.json_ld, parser.card_asins
+
+
+def extract_built_page(html_path):
+    """Products of the page's ItemList JSON-LD and the structural issues of the page.
+
+    Returns {'products': [...], 'issues': [...]}; module-level so it can run
+    in a process pool.
+    """
+    file_name = page_name(html_path)
+    try:
+        bodies, card_asins = read_built_page(html_path)
+    except OSError as e:
+        return {'products': [], 'issues': [_issue(file_name, 'unreadable', detail=str(e))]}
+
+    with PROFILER.phase('json_ld', file_name, sum(map(len, bodies))):
+        products, issues = _check_schema(file_name, bodies, card_asins)
+    return {'products': products, 'issues': issues}
+
+
+def _check_schema(file_name, bodies, card_asins):
+    products = []
+    issues = []
+    item_lists = []
+    for body in bodies:
+        try:
+            data = json.loads(body)
+        except ValueError as e:
+            issues.append(_issue(file_name, 'invalid_json_ld', detail=str(e)))
+            continue
+        item_lists.extend(node for node in _schema_nodes(data) if node.get('@type') == 'ItemList')
+
+    if not item_lists:
+        issues.append(_issue(file_name, 'no_item_list'))
+
+    schema_asins = []
+    for item_list in item_lists:
+        elements = item_list.get('itemListElement') or []
+        declared = item_list.get('numberOfItems')
+        if isinstance(declared, int) and declared != len(elements):
+            issues.append(_issue(file_name, 'item_count', detail=f"numberOfItems {declared} ≠ {len(elements)}"))
+        for element in elements:
+            item = element.get('item', element) if isinstance(element, dict) else {}
+            asin = _item_asin(item)
+            name = str(item.get('name', ''))
+            if asin is None:
+                issues.append(_issue(file_name, 'no_asin', detail=name))
+                continue
+            schema_asins.append(asin)
+            rating = item.get('aggregateRating') or {}
+            try:
+                products.append({
+                    'name': name,
+                    'asin': asin,
+                    'rating': float(rating['ratingValue']),
+                    'reviewCount': int(rating['reviewCount']),
+                    'file': file_name,
+                })
+            except (KeyError, TypeError, ValueError):
+                issues.append(_issue(file_name, 'no_aggregate_rating', asin, name))
+
+    schema_set = set(schema_asins)
+    card_set = set(card_asins)
+    for asin in dict.fromkeys(card_asins):
+        if asin not in schema_set:
+            issues.append(_issue(file_name, 'card_not_in_schema', asin))
+    if item_lists:
+        for asin in dict.fromkeys(schema_asins):
+            if asin not in card_set:
+                issues.append(_issue(file_name, 'schema_not_in_cards', asin))
+    return products, issues
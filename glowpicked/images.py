@@ -0,0 +1,248 @@
+"""
+Images responsives - variantes WebP/AVIF redimensionnées, srcset et LQIP
+
+Every JPEG/PNG of site/public/images (except the social card, which must
+stay a full-size JPEG) is resized to the RESPONSIVE_WIDTHS narrower than
+itself plus its own width, and encoded in each format Pillow supports (AVIF
+needs Pillow >= 11.2 or pillow-avif-plugin, WebP is always tried) into
+site/public/images/r/:
+
+    /images/r/serums-320.1a2b3c4d.webp 320w, /images/r/serums-400.1a2b3c4d.webp 400w
+
+The name carries the first 8 hex digits of the image's hash, so variants can
+be cached forever. That hash covers the source bytes and the encoding
+settings: an image whose hash matches the metadata (and whose variants are
+all on disk) is skipped without being decoded; the others are encoded over a
+process pool (--jobs). Variants no longer referenced are removed.
+
+The metadata (site/src/data/responsive-images.json, imported by
+src/utils/responsiveImages.js) maps each original URL to its size, one
+srcset per format and a ~16 px WebP placeholder (LQIP) as a data URI, shown
+as the <img> background until the real image loads. Images missing from it
+are served as the original file, so the site builds without this stage.
+
+Pillow is optional: without it nothing is written and the metadata is left
+as is.
+
+Usage: python3 -m glowpicked.images [--images-dir site/public/images] [-j 0] [--force]
+"""
+
+import argparse
+import base64
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # optional: pages fall back to the original images
+    Image = None
+else:
+    try:
+        import pillow_avif  # noqa: F401 - registers AVIF on Pillow < 11.2
+    except ImportError:
+        pass
+
+RESPONSIVE_WIDTHS = (320, 480, 640, 960, 1280, 1920)
+SOURCE_SUFFIXES = ('.jpg', '.jpeg', '.png')
+EXCLUDED = {'og-default.jpg'}  # Open Graph card: crawlers want the full-size JPEG
+VARIANTS_DIR = 'r'
+URL_PREFIX = '/images'
+# Preferred first: <source> order in <picture> and the preload
+FORMATS = {
+    'avif': ('AVIF', {'quality': 50, 'speed': 6}),
+    'webp': ('WEBP', {'quality': 75, 'method': 6}),
+}
+LQIP_WIDTH = 16
+LQIP_QUALITY = 40
+METADATA_VERSION = 1
+
+
+def supported_formats():
+    """Formats of FORMATS Pillow can encode here (empty without Pillow)"""
+    if Image is None:
+        return []
+    Image.init()
+    return [fmt for fmt, (pil_format, _) in FORMATS.items() if pil_format in Image.SAVE]
+
+
+def settings_key(formats, widths):
+    """Encoding settings, part of every image hash (changing them re-encodes everything)"""
+    return json.dumps({'version': METADATA_VERSION, 'widths': list(widths), 'lqip': [LQIP_WIDTH, LQIP_QUALITY],
+                       'formats': {fmt: FORMATS[fmt][1] for fmt in formats}}, sort_keys=True)
+
+
+def image_hash(path, settings):
+    digest = hashlib.blake2b(settings.encode('utf-8'), digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def find_sources(images_dir):
+    with os.scandir(images_dir) as entries:
+        return sorted(Path(entry.path) for entry in entries
+                      if entry.is_file() and entry.name.lower().endswith(SOURCE_SUFFIXES)
+                      and entry.name not in EXCLUDED)
+
+
+def target_widths(width, widths=RESPONSIVE_WIDTHS):
+    """Widths narrower than the image, plus its own width (never upscaled)"""
+    return sorted({w for w in widths if w < width} | {width})
+
+
+def _save(image, path, pil_format, options):
+    tmp_path = path.with_name(f'.{path.name}.tmp')
+    image.save(tmp_path, pil_format, **options)
+    os.replace(tmp_path, path)
+
+
+def _lqip(image):
+    small = image.copy()
+    small.thumbnail((LQIP_WIDTH, LQIP_WIDTH))
+    buffer = io.BytesIO()
+    if 'WEBP' in Image.SAVE:
+        small.save(buffer, 'WEBP', quality=LQIP_QUALITY)
+        mime = 'image/webp'
+    else:
+        small.convert('RGB').save(buffer, 'JPEG', quality=LQIP_QUALITY)
+        mime = 'image/jpeg'
+    return f"data:{mime};base64,{base64.b64encode(buffer.getvalue()).decode('ascii')}"
+
+
+def build_image(job):
+    """Encode the variants of one image; returns its metadata entry (runs in a worker)"""
+    source, digest, out_dir, url_dir, formats, widths = job
+    source = Path(source)
+    out_dir = Path(out_dir)
+    with Image.open(source) as opened:
+        image = ImageOps.exif_transpose(opened)
+        has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+    width, height = image.size
+    srcset = {fmt: [] for fmt in formats}
+    files = []
+    for w in target_widths(width, widths):
+        resized = image if w == width else image.resize((w, max(1, round(height * w / width))), Image.LANCZOS)
+        for fmt in formats:
+            pil_format, options = FORMATS[fmt]
+            name = f'{source.stem}-{w}.{digest[:8]}.{fmt}'
+            _save(resized, out_dir / name, pil_format, options)
+            srcset[fmt].append(f'{url_dir}/{name} {w}w')
+            files.append(name)
+    return {
+        'hash': digest,
+        'width': width,
+        'height': height,
+        'lqip': _lqip(image),
+        'srcset': {fmt: ', '.join(entries) for fmt, entries in srcset.items()},
+        'files': files,
+    }
+
+
+def load_metadata(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data.get('images', {}) if data.get('version') == METADATA_VERSION else {}
+
+
+def _write_if_changed(path, text):
+    path = Path(path)
+    try:
+        if path.read_text(encoding='utf-8') == text:
+            return False
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'.{path.name}.tmp')
+    tmp_path.write_text(text, encoding='utf-8')
+    os.replace(tmp_path, path)
+    return True
+
+
+def build_images(images_dir, metadata_path, jobs=1, force=False, widths=RESPONSIVE_WIDTHS):
+    """Variants + metadata of every image of images_dir, re-encoding only changed ones.
+
+    Returns {'images', 'built': [urls], 'skipped', 'removed': [file names],
+    'formats', 'metadata_written'}, or None if Pillow is not installed.
+    """
+    if Image is None:
+        return None
+    formats = supported_formats()
+    images_dir = Path(images_dir)
+    out_dir = images_dir / VARIANTS_DIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+    url_dir = f'{URL_PREFIX}/{VARIANTS_DIR}'
+    settings = settings_key(formats, widths)
+    previous = load_metadata(metadata_path)
+
+    images = {}
+    todo = []  # (url, job)
+    for source in find_sources(images_dir):
+        url = f'{URL_PREFIX}/{source.name}'
+        digest = image_hash(source, settings)
+        entry = previous.get(url)
+        if (not force and entry and entry['hash'] == digest
+                and all((out_dir / name).exists() for name in entry['files'])):
+            images[url] = entry
+        else:
+            todo.append((url, (str(source), digest, str(out_dir), url_dir, formats, tuple(widths))))
+
+    if jobs > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(todo))) as executor:
+            built = list(executor.map(build_image, [job for _, job in todo]))
+    else:
+        built = [build_image(job) for _, job in todo]
+    for (url, _), entry in zip(todo, built):
+        images[url] = entry
+
+    keep = {name for entry in images.values() for name in entry['files']}
+    removed = []
+    for path in out_dir.iterdir():
+        if path.is_file() and path.name not in keep:
+            path.unlink()
+            removed.append(path.name)
+
+    text = json.dumps({'version': METADATA_VERSION, 'images': dict(sorted(images.items()))},
+                      indent=2, ensure_ascii=False) + '\n'
+    return {
+        'images': len(images),
+        'built': [url for url, _ in todo],
+        'skipped': len(images) - len(todo),
+        'removed': sorted(removed),
+        'formats': formats,
+        'metadata_written': _write_if_changed(metadata_path, text),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère les variantes responsives (WebP/AVIF, srcset, LQIP)")
+    parser.add_argument('--images-dir', default='site/public/images', help="Images d'origine (servies sous /images)")
+    parser.add_argument('--metadata', default='site/src/data/responsive-images.json',
+                        help="Métadonnées lues par les layouts")
+    parser.add_argument('--jobs', '-j', type=int, default=1, help="Processus d'encodage (0 = un par CPU)")
+    parser.add_argument('--force', action='store_true', help="Ré-encode même les images inchangées")
+    args = parser.parse_args()
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    result = build_images(args.images_dir, args.metadata, jobs, args.force)
+    if result is None:
+        print("⚠️  Pillow non installé (pip install Pillow): images non traitées, "
+              "les pages gardent les images d'origine")
+        return
+    print(f"🖼️  {result['images']} image(s), formats: {', '.join(result['formats']) or 'aucun'}")
+    print(f"✏️  Encodées: {', '.join(result['built']) or 'aucune'} | inchangées: {result['skipped']}")
+    if result['removed']:
+        print(f"🗑️  Variantes supprimées: {len(result['removed'])}")
+    print(f"📝 {args.metadata}: {'mis à jour' if result['metadata_written'] else 'inchangé'}")
+
+
+if __name__ == '__main__':
+    main()
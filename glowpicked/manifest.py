@@ -0,0 +1,89 @@
+"""
+Manifeste du générateur - hash des entrées et de la sortie de chaque page
+
+For every generated page the manifest records the hash of its inputs
+(template version, texts, base products, fallbacks) and of the bytes that
+were written. The generator hashes a page's inputs before rendering it: a
+page whose inputs hash is unchanged and whose file still holds those bytes
+is neither rendered nor written again, so its mtime (and the Astro/Netlify
+rebuild it would trigger) is left alone.
+
+Stored as JSON next to the real data and written atomically.
+"""
+
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 1
+
+
+def inputs_digest(*inputs):
+    """Stable hash of JSON-serializable inputs"""
+    payload = json.dumps(inputs, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def content_digest(data):
+    """Hash of a page's bytes"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class GeneratorManifest:
+    """slug -> {inputs, output, mtime_ns, size} of the last generated pages"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.pages = {}
+        self.dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get('version') == MANIFEST_VERSION:
+            self.pages = data.get('pages', {})
+
+    def is_fresh(self, slug, inputs, page_path):
+        """True if inputs are unchanged and the page still holds what was written"""
+        entry = self.pages.get(slug)
+        if not entry or entry['inputs'] != inputs:
+            return False
+        try:
+            st = os.stat(page_path)
+        except OSError:
+            return False
+        if st.st_mtime_ns == entry['mtime_ns'] and st.st_size == entry['size']:
+            return True
+        with open(page_path, 'rb') as f:
+            if content_digest(f.read()) != entry['output']:
+                return False  # Edited by hand since the last run
+        self.record(slug, inputs, page_path)
+        return True
+
+    def record(self, slug, inputs, page_path, data=None):
+        """Remember the inputs and output of a page (data: bytes just written, if known)"""
+        if data is None:
+            with open(page_path, 'rb') as f:
+                data = f.read()
+        st = os.stat(page_path)
+        self.pages[slug] = {
+            'inputs': inputs,
+            'output': content_digest(data),
+            'mtime_ns': st.st_mtime_ns,
+            'size': st.st_size,
+        }
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'pages': self.pages}, f, indent=2, sort_keys=True)
+            f.write('\n')
+        os.replace(tmp_path, self.path)
+        self.dirty = False
@@ -0,0 +1,161 @@
+"""
+Index inverse ASIN -> pages reviews (et page -> ASINs)
+
+Lets a data change be mapped to the review pages that show the product
+without extracting every .astro file. generate-all-dynamic-pages.py updates
+it for every page it writes; `rebuild()` scans the reviews directory once
+to bootstrap it.
+
+Backup and stale variants (`<slug>-OLD.astro`, `<slug>-v2.astro`) and
+index.astro are never indexed: they are not the page that gets built.
+
+Stored as JSON (page -> ASINs) next to the real data; the reverse mapping is
+built in memory on load, so every lookup is a dict access. Also read by
+scripts/lib/page-index.js (weekly verification).
+
+Usage: python3 -m glowpicked.page_index [--reviews-dir DIR] [-o PATH] [ASIN ...]
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+
+from glowpicked.extractor import extract_products_from_file
+
+INDEX_VERSION = 1
+INDEX_NAME = 'page-index.json'
+
+# Copies kept next to a page that must not be regenerated or rebuilt
+EXCLUDED_SUFFIXES = ('-OLD', '-v2')
+EXCLUDED_PAGES = {'index'}
+
+
+def index_path(json_path):
+    """data/real-review-counts.json -> data/page-index.json"""
+    return os.path.join(os.path.dirname(str(json_path)), INDEX_NAME)
+
+
+def page_slug(page_path):
+    """Slug of an indexable review page, None for index/backup/stale variants"""
+    path = Path(page_path)
+    if path.suffix != '.astro' or path.name.startswith('.'):
+        return None
+    slug = path.stem
+    if slug in EXCLUDED_PAGES or slug.endswith(EXCLUDED_SUFFIXES):
+        return None
+    return slug
+
+
+class PageIndex:
+    """page -> ASINs, persisted; ASIN -> pages in memory"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.pages = {}
+        self.asin_pages = {}
+        self.dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get('version') == INDEX_VERSION:
+            for slug, asins in data.get('pages', {}).items():
+                self._add(slug, asins)
+
+    def __len__(self):
+        return len(self.pages)
+
+    def _add(self, slug, asins):
+        asins = list(dict.fromkeys(asins))
+        self.pages[slug] = asins
+        for asin in asins:
+            self.asin_pages.setdefault(asin, set()).add(slug)
+
+    def remove_page(self, slug):
+        if slug not in self.pages:
+            return
+        for asin in self.pages.pop(slug):
+            pages = self.asin_pages.get(asin)
+            if pages is not None:
+                pages.discard(slug)
+                if not pages:
+                    del self.asin_pages[asin]
+        self.dirty = True
+
+    def set_page(self, slug, asins):
+        """Record the ASINs a page shows (replaces what was known for it)"""
+        if page_slug(f'{slug}.astro') is None:
+            return
+        asins = list(dict.fromkeys(asins))
+        if self.pages.get(slug) == asins:
+            return
+        self.remove_page(slug)
+        self._add(slug, asins)
+        self.dirty = True
+
+    def asins_for(self, slug):
+        return list(self.pages.get(slug, ()))
+
+    def pages_for(self, asin):
+        """Pages that show an ASIN (sorted)"""
+        return sorted(self.asin_pages.get(asin, ()))
+
+    def pages_for_many(self, asins):
+        """Pages that show any of the ASINs (sorted)"""
+        pages = set()
+        for asin in asins:
+            pages.update(self.asin_pages.get(asin, ()))
+        return sorted(pages)
+
+    def rebuild(self, reviews_dir):
+        """Re-index every page of the reviews directory (variants excluded); return the page count"""
+        for slug in list(self.pages):
+            self.remove_page(slug)
+        for page_path in sorted(Path(reviews_dir).glob('*.astro')):
+            slug = page_slug(page_path)
+            if slug is None:
+                continue
+            try:
+                products = extract_products_from_file(page_path)
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"❌ Erreur lecture {page_path}: {e}")
+                continue
+            self._add(slug, [p['asin'] for p in products])
+        self.dirty = True
+        return len(self.pages)
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'pages': self.pages}, f, indent=2, sort_keys=True)
+            f.write('\n')
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconstruit l'index ASIN -> pages, ou l'interroge")
+    parser.add_argument('asins', nargs='*', help="ASINs à chercher (sans ASIN: reconstruit l'index)")
+    parser.add_argument('--reviews-dir', default='site/src/pages/reviews', help="Dossier des pages .astro")
+    parser.add_argument('-o', '--output', default=os.path.join('data', INDEX_NAME), help="Chemin de l'index")
+    args = parser.parse_args()
+
+    index = PageIndex(args.output)
+    if args.asins:
+        for asin in args.asins:
+            print(f"{asin}: {', '.join(index.pages_for(asin)) or '(aucune page)'}")
+        return
+    count = index.rebuild(args.reviews_dir)
+    index.save()
+    print(f"✅ Index écrit: {args.output} ({count} pages, {len(index.asin_pages)} ASINs)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+"""
+Profilage par phase - temps mur, CPU et octets par phase et par page (--profile)
+
+The audit and the generator wrap each step in `PROFILER.phase(name, page)`.
+While profiling is off (the default) `phase()` returns one shared no-op
+context manager: the cost is a method call per phase.
+
+With `PROFILER.start()` every phase becomes a span (wall and CPU time in ns,
+bytes processed, page, pid). Spans recorded in process-pool workers are
+appended to one file per worker in a spool directory (the pool initializer
+`init_worker` switches the worker to it, whatever the start method), and
+merged when `report()` is called. `report()` prints a per-phase summary table
+and the slowest pages, and writes a Chrome trace (`chrome://tracing`,
+https://ui.perfetto.dev). With cProfile enabled, the main process is also
+profiled function by function: the hottest functions are printed and the
+stats are saved next to the trace (`<trace>.pstats`, for pstats/snakeviz).
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import shutil
+import sys
+import tempfile
+import time
+
+TOP_PAGES = 10
+TOP_FUNCTIONS = 15
+
+
+class _NullSpan:
+    """Phase while profiling is off"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add(self, nbytes):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('profiler', 'name', 'page', 'nbytes', 'start', 'cpu')
+
+    def __init__(self, profiler, name, page, nbytes):
+        self.profiler = profiler
+        self.name = name
+        self.page = page
+        self.nbytes = nbytes
+
+    def __enter__(self):
+        self.cpu = time.process_time_ns()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        self.profiler._record((self.name, self.page, self.start, end - self.start,
+                               time.process_time_ns() - self.cpu, self.nbytes, os.getpid()))
+        return False
+
+    def add(self, nbytes):
+        """Bytes processed, when only known inside the phase (file read...)"""
+        self.nbytes += nbytes
+
+
+class Profiler:
+    """Spans (name, page, start_ns, wall_ns, cpu_ns, bytes, pid) of the current run"""
+
+    def __init__(self):
+        self.enabled = False
+        self.spans = []
+        self.started = 0
+        self.spool_dir = None
+        self._spool = None
+        self._cprofile = None
+
+    def phase(self, name, page=None, nbytes=0):
+        """Context manager timing one phase; `page` ties it to a page for the per-page table"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, page, nbytes)
+
+    def _record(self, span):
+        if self._spool is not None:
+            self._spool.write(json.dumps(span) + '\n')
+        else:
+            self.spans.append(span)
+
+    def start(self, cprofile=False):
+        """Turn profiling on in the main process"""
+        self.enabled = True
+        self.spans = []
+        self.started = time.perf_counter_ns()
+        self.spool_dir = tempfile.mkdtemp(prefix='glowpicked-profile-')
+        if cprofile:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def worker_config(self):
+        """initargs for init_worker: the spool directory, None while profiling is off"""
+        return self.spool_dir if self.enabled else None
+
+    def _start_worker(self, spool_dir):
+        if self._cprofile is not None:
+            # Inherited through fork: the worker is not profiled function by function
+            self._cprofile.disable()
+            self._cprofile = None
+        self.spans = []
+        self.spool_dir = None
+        self.enabled = spool_dir is not None
+        if self.enabled:
+            self._spool = open(os.path.join(spool_dir, f'spans-{os.getpid()}.jsonl'), 'a',
+                               encoding='utf-8', buffering=1)
+
+    def _collect_workers(self):
+        if not self.spool_dir:
+            return
+        for name in sorted(os.listdir(self.spool_dir)):
+            with open(os.path.join(self.spool_dir, name), encoding='utf-8') as f:
+                for line in f:
+                    if line.endswith('\n'):
+                        self.spans.append(tuple(json.loads(line)))
+        shutil.rmtree(self.spool_dir, ignore_errors=True)
+        self.spool_dir = None
+
+    def stop(self):
+        """Turn profiling off and merge the worker spans; returns the total wall time (ns)"""
+        total = time.perf_counter_ns() - self.started
+        self.enabled = False
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        self._collect_workers()
+        self.spans.sort(key=lambda span: span[2])
+        return total
+
+    def phase_table(self):
+        """name -> [calls, wall_ns, cpu_ns, bytes], in order of first appearance"""
+        table = {}
+        for name, _, _, wall, cpu, nbytes, _ in self.spans:
+            row = table.setdefault(name, [0, 0, 0, 0])
+            row[0] += 1
+            row[1] += wall
+            row[2] += cpu
+            row[3] += nbytes
+        return table
+
+    def page_table(self):
+        """page -> [wall_ns, cpu_ns, bytes] over all its phases"""
+        table = {}
+        for _, page, _, wall, cpu, nbytes, _ in self.spans:
+            if page is None:
+                continue
+            row = table.setdefault(page, [0, 0, 0])
+            row[0] += wall
+            row[1] += cpu
+            row[2] += nbytes
+        return table
+
+    def summary_lines(self, total_ns):
+        lines = [
+            "⏱️  PROFIL PAR PHASE",
+            "-" * 80,
+            f"{'Phase':<18} {'Appels':>7} {'Mur (ms)':>10} {'CPU (ms)':>10} {'Octets':>12} {'Mo/s':>8} {'% mur':>6}",
+        ]
+        for name, (calls, wall, cpu, nbytes) in self.phase_table().items():
+            rate = f"{nbytes / 1e6 / (wall / 1e9):.1f}" if nbytes and wall else '-'
+            share = wall / total_ns * 100 if total_ns else 0
+            lines.append(f"{name[:18]:<18} {calls:>7,} {wall / 1e6:>10.1f} {cpu / 1e6:>10.1f} "
+                         f"{nbytes:>12,} {rate:>8} {share:>5.1f}%")
+        lines.append(f"{'total (mur)':<18} {'':>7} {total_ns / 1e6:>10.1f}")
+
+        pages = sorted(self.page_table().items(), key=lambda item: -item[1][0])[:TOP_PAGES]
+        if pages:
+            lines += ["", f"🐢 Pages les plus lentes (top {len(pages)})"]
+            for page, (wall, cpu, nbytes) in pages:
+                lines.append(f"   {str(page)[:40]:<40} {wall / 1e6:>9.2f}ms mur {cpu / 1e6:>9.2f}ms CPU {nbytes:>12,} o")
+        if len({span[6] for span in self.spans}) > 1:
+            lines.append("(phases des workers: temps cumulé de tous les processus, peut dépasser le total)")
+        return lines
+
+    def chrome_trace(self):
+        """Trace Event Format: one complete event ("X") per span, one track per process"""
+        main_pid = os.getpid()
+        events = []
+        for pid in sorted({span[6] for span in self.spans} | {main_pid}):
+            events.append({'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': pid,
+                           'args': {'name': 'main' if pid == main_pid else f'worker {pid}'}})
+        for name, page, start, wall, cpu, nbytes, pid in self.spans:
+            args = {'cpu_ms': round(cpu / 1e6, 3), 'bytes': nbytes}
+            if page is not None:
+                args['page'] = str(page)
+            events.append({'name': name, 'cat': 'glowpicked', 'ph': 'X', 'pid': pid, 'tid': pid,
+                           'ts': (start - self.started) / 1000, 'dur': wall / 1000, 'args': args})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def cprofile_lines(self, stats_path):
+        if self._cprofile is None:
+            return []
+        self._cprofile.dump_stats(stats_path)
+        buffer = io.StringIO()
+        pstats.Stats(self._cprofile, stream=buffer).sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+        self._cprofile = None
+        lines = [f"🔬 cProfile (processus principal, top {TOP_FUNCTIONS} cumulé) → {stats_path}"]
+        lines += [line for line in buffer.getvalue().splitlines() if line.strip()][-(TOP_FUNCTIONS + 1):]
+        return lines
+
+    def report(self, trace_path, out=None):
+        """Stop profiling, print the tables and write the Chrome trace (+ .pstats with cProfile)"""
+        out = out or sys.stdout
+        total = self.stop()
+        with open(trace_path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f)
+        print(file=out)
+        for line in self.summary_lines(total):
+            print(line, file=out)
+        for line in self.cprofile_lines(f"{trace_path}.pstats"):
+            print(line, file=out)
+        print(f"📈 Trace Chrome/Perfetto: {trace_path} ({len(self.spans):,} spans)", file=out)
+
+
+# Shared by the scripts and their pool workers
+PROFILER = Profiler()
+
+
+def init_worker(spool_dir):
+    """ProcessPoolExecutor initializer: record this worker's spans in the spool (or nothing)"""
+    PROFILER._start_worker(spool_dir)
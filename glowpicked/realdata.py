@@ -0,0 +1,231 @@
+"""
+Store compact des vraies données - sidecar binaire de real-review-counts.json
+
+real-review-counts.json stays the source of truth. `build_sidecar()` turns it
+into `real-review-counts.bin`: a 16-byte header followed by fixed-size
+records sorted by ASIN, which `RealDataStore` memory-maps and binary-searches
+(O(log n) per lookup, nothing parsed up front). src/utils/realDataStore.js
+reads the same file into a Buffer (no mmap in Node) during the Astro build.
+The weekly cron wrapper rebuilds it after each verification.
+
+Layout (little-endian):
+    header  magic b'GPRD', version u16, record size u16, count u32, reserved u32
+    record  asin 10s (NUL-padded), flags u8, pad u8, rating*100 u16, reviews u32
+
+`open_real_data()` uses the sidecar when it is at least as recent as the
+JSON and falls back to json.load otherwise, so a stale sidecar is never read.
+
+Values the layout cannot hold exactly (a rating with more than 2 decimals or
+outside 0-655.35, a review count that is not an integer in 0-2^32-1) raise
+SidecarValueError before anything is written: the sidecar is then not built
+and readers keep using the JSON.
+
+Usage: python3 -m glowpicked.realdata [real-review-counts.json] [-o OUT.bin]
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Mapping
+
+MAGIC = b'GPRD'
+VERSION = 1
+HEADER = struct.Struct('<4sHHII')
+RECORD = struct.Struct('<10sBxHI')
+ASIN_SIZE = 10
+
+# Record flags
+FLAG_NULL_ENTRY = 0x01      # "ASIN": null
+FLAG_NULL_RATING = 0x02     # "rating": null / missing
+FLAG_NULL_REVIEWS = 0x04    # "reviews": null / missing
+FLAG_INT_RATING = 0x08      # rating was written as an integer (4 vs 4.0)
+
+RATING_SCALE = 100
+MAX_RATING_UNITS = 0xFFFF
+MAX_REVIEWS = 0xFFFFFFFF
+
+
+class SidecarValueError(ValueError):
+    """A value of real-review-counts.json cannot be stored exactly in the sidecar"""
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _rating_units(asin, rating):
+    if not _is_number(rating):
+        raise SidecarValueError(f"{asin}: rating non numérique ({rating!r})")
+    units = round(rating * RATING_SCALE)
+    # rating * 100 is inexact in binary (4.35 -> 434.99999999999994): tolerate that, not a 3rd decimal
+    if abs(rating * RATING_SCALE - units) > 1e-6:
+        raise SidecarValueError(f"{asin}: rating {rating!r} a plus de 2 décimales")
+    if not 0 <= units <= MAX_RATING_UNITS:
+        raise SidecarValueError(f"{asin}: rating {rating!r} hors limites (0-{MAX_RATING_UNITS / RATING_SCALE})")
+    return units
+
+
+def _reviews_value(asin, reviews):
+    if not isinstance(reviews, int) or isinstance(reviews, bool):
+        raise SidecarValueError(f"{asin}: reviews {reviews!r} n'est pas un entier")
+    if not 0 <= reviews <= MAX_REVIEWS:
+        raise SidecarValueError(f"{asin}: reviews {reviews!r} hors limites (0-{MAX_REVIEWS})")
+    return reviews
+
+
+def sidecar_path(json_path):
+    """real-review-counts.json -> real-review-counts.bin"""
+    root, _ = os.path.splitext(str(json_path))
+    return root + '.bin'
+
+
+def _encode_record(asin, entry):
+    try:
+        key = asin.encode('ascii')
+    except UnicodeEncodeError:
+        raise SidecarValueError(f"ASIN non ASCII: {asin!r}") from None
+    if len(key) > ASIN_SIZE:
+        raise SidecarValueError(f"ASIN trop long pour le sidecar: {asin!r}")
+    flags = 0
+    rating = reviews = 0
+    if entry is None:
+        flags |= FLAG_NULL_ENTRY | FLAG_NULL_RATING | FLAG_NULL_REVIEWS
+    else:
+        if entry.get('rating') is None:
+            flags |= FLAG_NULL_RATING
+        else:
+            rating = _rating_units(asin, entry['rating'])
+            if isinstance(entry['rating'], int):
+                flags |= FLAG_INT_RATING
+        if entry.get('reviews') is None:
+            flags |= FLAG_NULL_REVIEWS
+        else:
+            reviews = _reviews_value(asin, entry['reviews'])
+    return RECORD.pack(key, flags, rating, reviews)
+
+
+def build_sidecar(json_path, output_path=None):
+    """Convert real-review-counts.json into the binary sidecar; return its path.
+
+    Every record is encoded (and validated) before the file is opened, so a
+    SidecarValueError leaves no partial sidecar behind.
+    """
+    output_path = output_path or sidecar_path(json_path)
+    with open(json_path) as f:
+        data = json.load(f)
+
+    asins = sorted(data)
+    records = b''.join(_encode_record(asin, data[asin]) for asin in asins)
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, len(asins), 0))
+        f.write(records)
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+class RealDataStore(Mapping):
+    """Read-only ASIN -> {'rating', 'reviews'} mapping over a memory-mapped sidecar"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        with open(self.path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, count, _ = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self._mm.close()
+            raise ValueError(f"Sidecar invalide ou d'une autre version: {self.path}")
+        self._count = count
+
+    def _key(self, i):
+        offset = HEADER.size + i * RECORD.size
+        return self._mm[offset:offset + ASIN_SIZE]
+
+    def _find(self, asin):
+        try:
+            key = asin.encode('ascii').ljust(ASIN_SIZE, b'\0')
+        except (AttributeError, UnicodeEncodeError):
+            return -1
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count and self._key(lo) == key:
+            return lo
+        return -1
+
+    def _value(self, i):
+        _, flags, rating, reviews = RECORD.unpack_from(self._mm, HEADER.size + i * RECORD.size)
+        if flags & FLAG_NULL_ENTRY:
+            return None
+        if flags & FLAG_NULL_RATING:
+            rating = None
+        elif flags & FLAG_INT_RATING:
+            rating //= 100
+        else:
+            rating /= 100
+        return {
+            'reviews': None if flags & FLAG_NULL_REVIEWS else reviews,
+            'rating': rating,
+        }
+
+    def __getitem__(self, asin):
+        i = self._find(asin)
+        if i < 0:
+            raise KeyError(asin)
+        return self._value(i)
+
+    def __contains__(self, asin):
+        return self._find(asin) >= 0
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self._key(i).rstrip(b'\0').decode('ascii')
+
+    def items(self):
+        for i in range(self._count):
+            yield self._key(i).rstrip(b'\0').decode('ascii'), self._value(i)
+
+    def close(self):
+        self._mm.close()
+
+
+def open_real_data(json_path):
+    """Real data as a mapping: the sidecar if it is fresh, else the parsed JSON"""
+    bin_path = sidecar_path(json_path)
+    try:
+        if os.stat(bin_path).st_mtime_ns >= os.stat(json_path).st_mtime_ns:
+            return RealDataStore(bin_path)
+    except (OSError, ValueError):
+        pass
+    with open(json_path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construit le sidecar binaire de real-review-counts.json")
+    parser.add_argument('json_path', nargs='?', default='data/real-review-counts.json')
+    parser.add_argument('-o', '--output', help="Chemin du sidecar (défaut: même nom en .bin)")
+    args = parser.parse_args()
+
+    try:
+        output = build_sidecar(args.json_path, args.output)
+    except SidecarValueError as e:
+        print(f"⚠️  Sidecar non écrit ({e}): l'audit, le générateur et le build liront le JSON")
+        sys.exit(1)
+    store = RealDataStore(output)
+    print(f"✅ Sidecar écrit: {output} ({len(store)} ASINs, {os.path.getsize(output):,} octets)")
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,16 @@
+"""
+Scripts à tirets de la racine - import comme modules (tests, benchmarks)
+"""
+
+import importlib.util
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def load_script(name, file_name):
+    """Import a hyphenated root script (audit-all-pages.py...) as a module"""
+    spec = importlib.util.spec_from_file_location(name, ROOT / file_name)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,245 @@
+"""
+Sitemap shardé - sitemap.xml (index) + sitemap-N.xml (≤ 50 000 URLs chacun)
+
+Entries are streamed from the static pages and the categories of
+verified-asins-all.json, in a stable order (static pages, then categories in
+config order), so adding pages only touches the last shard.
+
+`lastmod` is when the page's data last changed, never the build time:
+
+- review page: the later of the date the generator last wrote the page
+  (generator manifest) and the last change, in review-history.jsonl, of any
+  ASIN it shows (its real data is read at build time)
+- static page: the last commit of its source .astro file (its mtime if
+  edited since: on a CI checkout the mtime is the checkout time); the home
+  page and /reviews/ also take the latest review page date, since they list them
+
+Each shard is written to a temporary file while its hash is computed, then
+compared with the existing shard: an identical shard is left untouched
+(same mtime, no deploy diff). Only one URL is held at a time; the index
+(`sitemap.xml`, the URL robots.txt points to) is rewritten only if a shard's
+lastmod changed, and shards left over from a larger catalog are removed.
+
+Usage: python3 -m glowpicked.sitemap [--config PATH] [-o site/public] ...
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from glowpicked.history import ReviewHistory, data_date, history_path
+from glowpicked.manifest import GeneratorManifest
+
+SITE_URL = 'https://glowpicked.com'
+MAX_URLS = 50_000
+MAX_BYTES = 50 * 1024 * 1024  # Uncompressed size limit of the sitemaps protocol
+INDEX_NAME = 'sitemap.xml'
+SHARD_NAME = re.compile(r'^sitemap-(\d+)\.xml$')
+
+# (path, source page relative to src/pages, changefreq, priority, lists the review pages)
+STATIC_PAGES = [
+    ('/', 'index.astro', 'weekly', '1.0', True),
+    ('/reviews/', 'reviews/index.astro', 'weekly', '0.9', True),
+    ('/about/', 'about.astro', 'monthly', '0.5', False),
+    ('/affiliate-disclosure/', 'affiliate-disclosure.astro', 'yearly', '0.3', False),
+    ('/privacy-policy/', 'privacy-policy.astro', 'yearly', '0.3', False),
+    ('/terms/', 'terms.astro', 'yearly', '0.3', False),
+]
+REVIEW_CHANGEFREQ = 'monthly'
+REVIEW_PRIORITY = '0.8'
+
+URLSET_HEADER = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                 '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+URLSET_FOOTER = '</urlset>\n'
+INDEX_HEADER = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+INDEX_FOOTER = '</sitemapindex>\n'
+
+
+def _date(timestamp_ns):
+    return datetime.fromtimestamp(timestamp_ns / 1e9).date().isoformat()
+
+
+def _source_date(path):
+    """Last commit date of a page source (mtime if edited since), None if it does not exist"""
+    if not os.path.exists(path):
+        return None
+    return data_date(path)
+
+
+def url_line(loc, lastmod=None, changefreq=None, priority=None):
+    parts = [f'<loc>{escape(loc)}</loc>']
+    if lastmod:
+        parts.append(f'<lastmod>{lastmod}</lastmod>')
+    if changefreq:
+        parts.append(f'<changefreq>{changefreq}</changefreq>')
+    if priority:
+        parts.append(f'<priority>{priority}</priority>')
+    return f"  <url>{''.join(parts)}</url>\n"
+
+
+def review_entries(categories, reviews_dir, manifest, asin_dates, site_url=SITE_URL):
+    """(loc, lastmod, changefreq, priority) of each review page that exists, in config order"""
+    for slug, category in categories.items():
+        entry = manifest.pages.get(slug)
+        if entry:
+            dates = [_date(entry['mtime_ns'])]
+        else:
+            page_date = _source_date(Path(reviews_dir) / f'{slug}.astro')
+            if page_date is None:
+                continue  # Never generated: no page to list
+            dates = [page_date]
+        for tier in ('budget', 'luxury'):
+            for item in category.get(tier, []):
+                if item.get('asin') in asin_dates:
+                    dates.append(asin_dates[item['asin']])
+        yield f'{site_url}/reviews/{slug}/', max(dates), REVIEW_CHANGEFREQ, REVIEW_PRIORITY
+
+
+def static_entries(pages_dir, latest_review, site_url=SITE_URL):
+    for path, source, changefreq, priority, lists_reviews in STATIC_PAGES:
+        dates = [d for d in (_source_date(Path(pages_dir) / source), latest_review if lists_reviews else None) if d]
+        yield f'{site_url}{path}', max(dates) if dates else None, changefreq, priority
+
+
+def _file_digest(path):
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+class _StreamedFile:
+    """Temporary file written line by line, hashed on the fly, kept only if it differs from `path`"""
+
+    def __init__(self, path, header):
+        self.path = Path(path)
+        self.tmp_path = self.path.with_name(f'.{self.path.name}.tmp')
+        self.file = open(self.tmp_path, 'w', encoding='utf-8')
+        self.digest = hashlib.blake2b(digest_size=16)
+        self.bytes = 0
+        self.write(header)
+
+    def write(self, text):
+        data = text.encode('utf-8')
+        self.file.write(text)
+        self.digest.update(data)
+        self.bytes += len(data)
+
+    def commit(self, footer):
+        """Returns True if the file was (re)written"""
+        self.write(footer)
+        self.file.close()
+        if self.digest.hexdigest() == _file_digest(self.path):
+            os.unlink(self.tmp_path)
+            return False
+        os.replace(self.tmp_path, self.path)
+        return True
+
+
+def write_sitemaps(entries, out_dir, site_url=SITE_URL, max_urls=MAX_URLS, max_bytes=MAX_BYTES):
+    """Stream (loc, lastmod, changefreq, priority) entries into shards + index.
+
+    Returns {'urls', 'shards', 'written': [file names rewritten], 'removed': [...]}.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    footer_bytes = len(URLSET_FOOTER)
+    shards = []  # (name, lastmod)
+    written = []
+    shard = None
+    shard_urls = 0
+    shard_lastmod = None
+    urls = 0
+
+    def close_shard():
+        if shard.commit(URLSET_FOOTER):
+            written.append(shard.path.name)
+        shards.append((shard.path.name, shard_lastmod))
+
+    for loc, lastmod, changefreq, priority in entries:
+        line = url_line(loc, lastmod, changefreq, priority)
+        if shard is not None and (shard_urls >= max_urls or
+                                  shard.bytes + len(line.encode('utf-8')) + footer_bytes > max_bytes):
+            close_shard()
+            shard = None
+        if shard is None:
+            shard = _StreamedFile(out_dir / f'sitemap-{len(shards) + 1}.xml', URLSET_HEADER)
+            shard_urls = 0
+            shard_lastmod = None
+        shard.write(line)
+        shard_urls += 1
+        urls += 1
+        if lastmod and (shard_lastmod is None or lastmod > shard_lastmod):
+            shard_lastmod = lastmod
+    if shard is not None:
+        close_shard()
+
+    index = _StreamedFile(out_dir / INDEX_NAME, INDEX_HEADER)
+    for name, lastmod in shards:
+        lastmod_tag = f'<lastmod>{lastmod}</lastmod>' if lastmod else ''
+        index.write(f"  <sitemap><loc>{escape(f'{site_url}/{name}')}</loc>{lastmod_tag}</sitemap>\n")
+    if index.commit(INDEX_FOOTER):
+        written.append(INDEX_NAME)
+
+    removed = []
+    for path in out_dir.iterdir():
+        match = SHARD_NAME.match(path.name)
+        if match and int(match.group(1)) > len(shards):
+            path.unlink()
+            removed.append(path.name)
+    return {'urls': urls, 'shards': len(shards), 'written': written, 'removed': sorted(removed)}
+
+
+def build_sitemaps(config_path, manifest_path, real_data_path, pages_dir, out_dir, site_url=SITE_URL,
+                   max_urls=MAX_URLS):
+    """Sitemaps of the static pages and every generated review page; see write_sitemaps()"""
+    with open(config_path, encoding='utf-8') as f:
+        categories = json.load(f)['categories']
+    history_file = history_path(real_data_path)
+    asin_dates = ReviewHistory(history_file).last_changes() if os.path.exists(history_file) else {}
+    manifest = GeneratorManifest(manifest_path)
+    reviews_dir = Path(pages_dir) / 'reviews'
+
+    # Review page dates first (one pass), so the pages that list them can use the latest
+    latest_review = max((lastmod for _, lastmod, _, _ in
+                         review_entries(categories, reviews_dir, manifest, asin_dates, site_url)), default=None)
+
+    def entries():
+        yield from static_entries(pages_dir, latest_review, site_url)
+        yield from review_entries(categories, reviews_dir, manifest, asin_dates, site_url)
+
+    return write_sitemaps(entries(), out_dir, site_url, max_urls)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère le sitemap shardé (index + sitemap-N.xml)")
+    parser.add_argument('--config', default='data/verified-asins-all.json', help="Catalogue des catégories")
+    parser.add_argument('--manifest', default='data/.generator-manifest.json', help="Manifeste du générateur")
+    parser.add_argument('--real-data', default='data/real-review-counts.json',
+                        help="Vraies données (l'historique review-history.jsonl est lu à côté)")
+    parser.add_argument('--pages-dir', default='site/src/pages', help="Pages sources (dates des pages statiques)")
+    parser.add_argument('-o', '--output', default='site/public', help="Dossier de sortie")
+    parser.add_argument('--site-url', default=SITE_URL)
+    parser.add_argument('--max-urls', type=int, default=MAX_URLS, help="URLs max par shard")
+    args = parser.parse_args()
+
+    result = build_sitemaps(args.config, args.manifest, args.real_data, args.pages_dir, args.output,
+                            args.site_url, args.max_urls)
+    print(f"🗺️  {result['urls']} URLs en {result['shards']} shard(s) → {args.output}/{INDEX_NAME}")
+    print(f"✏️  Réécrits: {', '.join(result['written']) or 'aucun (inchangés)'}")
+    if result['removed']:
+        print(f"🗑️  Supprimés: {', '.join(result['removed'])}")
+
+
+if __name__ == '__main__':
+    main()
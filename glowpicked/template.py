@@ -0,0 +1,62 @@
+"""
+Moteur de templates précompilés - segments statiques + slots
+
+A template is split once, at import time, on its `{{slot}}` markers into
+static segments and slot names; `render()` only interleaves the per-page
+values with the static segments and joins them. Everything else (braces,
+backticks, `${...}` in Astro code) is left untouched, so no escaping is
+needed in the template source.
+"""
+
+import hashlib
+import json
+import re
+
+_SLOT_RE = re.compile(r'\{\{(\w+)\}\}')
+
+# One encoder for every value: json.dumps() with keyword arguments builds a new one per call
+_encode = json.JSONEncoder(ensure_ascii=False, check_circular=False).encode
+
+
+class PageTemplate:
+    """Template compiled into static segments and named slots"""
+
+    def __init__(self, source):
+        parts = _SLOT_RE.split(source)
+        # Changes whenever the template source does (generator manifest)
+        self.version = hashlib.blake2b(source.encode('utf-8'), digest_size=8).hexdigest()
+        self.statics = tuple(parts[0::2])
+        self.slots = tuple(parts[1::2])
+
+    def render(self, **values):
+        pieces = [self.statics[0]]
+        try:
+            for name, static in zip(self.slots, self.statics[1:]):
+                pieces.append(values[name])
+                pieces.append(static)
+        except KeyError as e:
+            raise KeyError(f"Slot manquant: {e.args[0]}") from None
+        return ''.join(pieces)
+
+
+def js_value(value):
+    """Compact JSON literal, valid as a JS expression"""
+    return _encode(value)
+
+
+def js_rows(items, depth=1):
+    """JS array with one compact object per line (readable diffs, no indent=4 pass)"""
+    if not items:
+        return '[]'
+    indent = '  ' * (depth + 1)
+    rows = f',\n{indent}'.join(js_value(item) for item in items)
+    return f'[\n{indent}{rows}\n{"  " * depth}]'
+
+
+def js_mapping(mapping, depth=0):
+    """JS object with one compact `"key": value` entry per line"""
+    if not mapping:
+        return '{}'
+    indent = '  ' * (depth + 1)
+    rows = f',\n{indent}'.join(f'{js_value(key)}: {js_value(value)}' for key, value in mapping.items())
+    return f'{{\n{indent}{rows}\n{"  " * depth}}}'
@@ -0,0 +1,171 @@
+"""
+Surveillance de fichiers pour --watch - inotify (Linux) ou polling, avec debounce
+
+`watch_batches(dirs)` yields sets of changed paths, one set per burst of
+changes: after the first event it waits until the directories have been
+quiet for `debounce` seconds (at most `max_delay`), so a burst of saves or a
+`git checkout` touching every page gives one batch.
+
+On Linux the directories are watched with inotify (through ctypes, no extra
+dependency); elsewhere (macOS...) or if inotify is unavailable, each
+directory is re-scanned every `poll_interval` seconds and (mtime, size) are
+compared, which costs one stat per file. Only the directories themselves are
+watched, not subdirectories. Temporary files of atomic writes (`.name.tmp`,
+`name.tmp`) are ignored; their rename shows up as a change of the target.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+DEBOUNCE = 0.1
+MAX_DELAY = 0.5
+POLL_INTERVAL = 0.25
+
+# <sys/inotify.h>
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+EVENT_HEADER = struct.Struct('iIII')
+
+
+def is_temporary(name):
+    return name.endswith(('.tmp', '~', '.swp', '.swx')) or name.startswith('.#')
+
+
+class PollingWatcher:
+    """Re-scan the directories and compare (mtime_ns, size) of every file"""
+
+    backend = 'polling'
+
+    def __init__(self, dirs, poll_interval=POLL_INTERVAL):
+        self.dirs = [Path(d) for d in dirs]
+        self.poll_interval = poll_interval
+        self.state = self._scan()
+
+    def _scan(self):
+        state = {}
+        for directory in self.dirs:
+            try:
+                entries = os.scandir(directory)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if is_temporary(entry.name):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    if not entry.is_dir():
+                        state[entry.path] = (st.st_mtime_ns, st.st_size)
+        return state
+
+    def read(self, timeout):
+        """Changed paths seen within timeout seconds (empty set if none)"""
+        deadline = time.monotonic() + timeout
+        while True:
+            state = self._scan()
+            changed = {path for path in state.keys() | self.state.keys()
+                       if state.get(path) != self.state.get(path)}
+            self.state = state
+            remaining = deadline - time.monotonic()
+            if changed or remaining <= 0:
+                return {Path(p) for p in changed}
+            time.sleep(min(self.poll_interval, remaining))
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """inotify on each directory (close-after-write, renames, deletions)"""
+
+    backend = 'inotify'
+
+    def __init__(self, dirs):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1')
+        self.dirs = {}
+        try:
+            for directory in dirs:
+                wd = libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), WATCH_MASK)
+                if wd < 0:
+                    raise OSError(ctypes.get_errno(), f'inotify_add_watch {directory}')
+                self.dirs[wd] = Path(directory)
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def read(self, timeout):
+        ready, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed = set()
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', 'replace')
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                # Events lost: report every file of the watched directories
+                for directory in self.dirs.values():
+                    changed.update(p for p in directory.iterdir() if p.is_file() and not is_temporary(p.name))
+                continue
+            if name and wd in self.dirs and not is_temporary(name):
+                changed.add(self.dirs[wd] / name)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def make_watcher(dirs, poll_interval=POLL_INTERVAL):
+    """inotify if available, polling otherwise; reported paths are absolute"""
+    dirs = [Path(d).resolve() for d in dirs if Path(d).is_dir()]
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(dirs)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(dirs, poll_interval)
+
+
+def watch_batches(dirs, debounce=DEBOUNCE, max_delay=MAX_DELAY, poll_interval=POLL_INTERVAL, watcher=None):
+    """Yield one set of changed paths per burst of changes (debounced and coalesced); runs until interrupted"""
+    watcher = watcher or make_watcher(dirs, poll_interval)
+    try:
+        while True:
+            batch = watcher.read(3600)
+            if not batch:
+                continue
+            deadline = time.monotonic() + max_delay
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                more = watcher.read(min(debounce, remaining))
+                if not more:
+                    break
+                batch |= more
+            yield batch
+    finally:
+        watcher.close()
@@ -1,71 +1,163 @@
 /**
  * GlowPicked Product Enhancer
- * 
+ *
  * Automatically fetches product images + live prices from PA-API
  * and injects them into product cards.
- * 
+ *
  * Gracefully degrades: if API not configured, cards stay as-is.
- * 
+ *
  * Usage: Add data-asin="B00TTD9BRC" to any product card element.
  * The script will inject an <img> and update price if available.
+ *
+ * - ASIN list embedded at build time (<script id="page-asins">, see
+ *   ReviewPageLayout.astro), falling back to the data-asin cards
+ * - one request per page view for the ASINs not cached yet
+ * - products cached per ASIN in localStorage (sessionStorage if unavailable)
+ *   for 1 hour, so navigating between review pages reuses them
+ * - all DOM writes in one requestAnimationFrame pass, through an ASIN -> cards
+ *   map built once; styles live in Layout.astro (no inline cssText)
  */
 (function() {
   'use strict';
 
-  const cards = document.querySelectorAll('[data-asin]');
-  if (cards.length === 0) return;
+  var API_URL = '/api/amazon-product';
+  var MAX_PER_REQUEST = 50;                // netlify/functions/amazon-product.ts limit
+  var CACHE_PREFIX = 'gp:product:';
+  var CACHE_TTL = 60 * 60 * 1000;          // same as the function's cache
+  var PLACEHOLDER_TTL = 5 * 60 * 1000;     // no image/price yet: ask again soon
+  var IMAGE_SIZE = 180;
 
-  const asins = Array.from(cards).map(c => c.getAttribute('data-asin')).filter(Boolean);
-  if (asins.length === 0) return;
+  // ASIN -> cards (an ASIN may appear in several cards)
+  var cardsByAsin = new Map();
+  document.querySelectorAll('[data-asin]').forEach(function(card) {
+    var asin = card.getAttribute('data-asin');
+    if (!asin) return;
+    if (!cardsByAsin.has(asin)) cardsByAsin.set(asin, []);
+    cardsByAsin.get(asin).push(card);
+  });
+  if (cardsByAsin.size === 0) return;
+
+  var asins = embeddedAsins().filter(function(asin) { return cardsByAsin.has(asin); });
+  if (asins.length === 0) asins = Array.from(cardsByAsin.keys());
+
+  var store = openStore();
+  var cached = [];
+  var missing = [];
+  asins.forEach(function(asin) {
+    var product = readCache(asin);
+    if (product) cached.push(product);
+    else missing.push(asin);
+  });
+
+  render(cached);
+  if (missing.length === 0) return;
 
-  // Batch fetch (max 10 per request)
-  const batches = [];
-  for (let i = 0; i < asins.length; i += 10) {
-    batches.push(asins.slice(i, i + 10));
+  var requests = [];
+  for (var i = 0; i < missing.length; i += MAX_PER_REQUEST) {
+    requests.push(fetchProducts(missing.slice(i, i + MAX_PER_REQUEST)));
   }
+  Promise.all(requests)
+    .then(function(results) { render([].concat.apply([], results)); })
+    .catch(function() { /* Silently degrade */ });
 
-  batches.forEach(function(batch) {
-    fetch('/api/amazon-product?asins=' + batch.join(','))
+  function embeddedAsins() {
+    var el = document.getElementById('page-asins');
+    if (!el) return [];
+    try {
+      var list = JSON.parse(el.textContent);
+      return Array.isArray(list) ? list : [];
+    } catch (e) {
+      return [];
+    }
+  }
+
+  function fetchProducts(batch) {
+    return fetch(API_URL + '?asins=' + batch.map(encodeURIComponent).join(','))
       .then(function(r) { return r.json(); })
       .then(function(data) {
-        if (!data.products) return;
-
-        data.products.forEach(function(product) {
-          if (!product.imageUrl) return;
-
-          const card = document.querySelector('[data-asin="' + product.asin + '"]');
-          if (!card) return;
-
-          // Inject product image
-          var imgContainer = card.querySelector('.product-image');
-          if (!imgContainer) {
-            imgContainer = document.createElement('div');
-            imgContainer.className = 'product-image';
-            imgContainer.style.cssText = 'text-align:center;margin-bottom:1rem;';
-            card.insertBefore(imgContainer, card.firstChild);
-          }
-
-          var img = document.createElement('img');
-          img.src = product.imageUrl;
-          img.alt = product.title || 'Product image';
-          img.loading = 'lazy';
-          img.style.cssText = 'max-height:180px;border-radius:8px;';
-          imgContainer.appendChild(img);
-
-          // Update price if available
-          if (product.price) {
-            var priceEl = card.querySelector('.product-price');
-            if (!priceEl) {
-              priceEl = document.createElement('div');
-              priceEl.className = 'product-price';
-              priceEl.style.cssText = 'font-size:1.3rem;font-weight:700;color:#e91e63;text-align:center;margin:0.5rem 0;';
-              var cta = card.querySelector('.cta-button');
-              if (cta) card.insertBefore(priceEl, cta);
-            }
-            priceEl.textContent = product.price;
-          }
+        var products = data.products || [];
+        // Not configured: placeholders only, nothing worth caching
+        if (!data.error) products.forEach(writeCache);
+        return products;
+      });
+  }
+
+  // localStorage, or sessionStorage when it is disabled/full (private mode)
+  function openStore() {
+    var candidates = ['localStorage', 'sessionStorage'];
+    for (var i = 0; i < candidates.length; i++) {
+      try {
+        var storage = window[candidates[i]];
+        storage.setItem(CACHE_PREFIX + 'probe', '1');
+        storage.removeItem(CACHE_PREFIX + 'probe');
+        return storage;
+      } catch (e) { /* try the next one */ }
+    }
+    return null;
+  }
+
+  function readCache(asin) {
+    if (!store) return null;
+    try {
+      var entry = JSON.parse(store.getItem(CACHE_PREFIX + asin));
+      if (entry && entry.expires > Date.now()) return entry.product;
+      if (entry) store.removeItem(CACHE_PREFIX + asin);
+    } catch (e) { /* corrupt entry: refetch */ }
+    return null;
+  }
+
+  function writeCache(product) {
+    if (!store || !product || !product.asin) return;
+    var ttl = product.imageUrl || product.price ? CACHE_TTL : PLACEHOLDER_TTL;
+    try {
+      store.setItem(CACHE_PREFIX + product.asin, JSON.stringify({ expires: Date.now() + ttl, product: product }));
+    } catch (e) { /* quota exceeded: skip caching */ }
+  }
+
+  function render(products) {
+    if (products.length === 0) return;
+    requestAnimationFrame(function() {
+      products.forEach(function(product) {
+        (cardsByAsin.get(product.asin) || []).forEach(function(card) {
+          enhanceCard(card, product);
         });
-      })
-      .catch(function() { /* Silently degrade */ });
-  });
+      });
+    });
+  }
+
+  function enhanceCard(card, product) {
+    if (!product.imageUrl || card.hasAttribute('data-enhanced')) return;
+    card.setAttribute('data-enhanced', '');
+
+    // Inject product image (fixed size: no layout shift when it loads)
+    var imgContainer = card.querySelector('.product-image');
+    if (!imgContainer) {
+      imgContainer = document.createElement('div');
+      imgContainer.className = 'product-image';
+      card.insertBefore(imgContainer, card.firstChild);
+    }
+
+    var img = document.createElement('img');
+    img.src = product.imageUrl;
+    img.alt = product.title || 'Product image';
+    img.loading = 'lazy';
+    img.decoding = 'async';
+    img.width = IMAGE_SIZE;
+    img.height = IMAGE_SIZE;
+    imgContainer.appendChild(img);
+
+    // Update price if available
+    if (product.price) {
+      var priceEl = card.querySelector('.product-price');
+      if (!priceEl) {
+        var cta = card.querySelector('.cta-button');
+        if (!cta) return;
+        priceEl = document.createElement('div');
+        priceEl.className = 'product-price';
+        var anchor = cta.closest('.cta-wrapper') || cta;
+        anchor.parentNode.insertBefore(priceEl, anchor);
+      }
+      priceEl.textContent = product.price;
+    }
+  }
 })();
@@ -0,0 +1,57 @@
+/**
+ * INDEX ASIN -> PAGES - Lecture de data/page-index.json (glowpicked/page_index.py)
+ *
+ * Tenu à jour par generate-all-dynamic-pages.py; les variantes -OLD / -v2 et
+ * index.astro n'y figurent jamais. Reconstruction:
+ *   python3 -m glowpicked.page_index --reviews-dir site/src/pages/reviews
+ */
+
+import fs from 'fs';
+import path from 'path';
+
+export const INDEX_NAME = 'page-index.json';
+const INDEX_VERSION = 1;
+
+/**
+ * data/real-review-counts.json -> data/page-index.json
+ */
+export function pageIndexPath(realDataFile) {
+  return path.join(path.dirname(realDataFile), INDEX_NAME);
+}
+
+/**
+ * @returns {Object|null} { pages: Map page -> ASINs, pagesFor(asin), pagesForMany(asins) },
+ *   null si l'index est absent ou d'une autre version
+ */
+export function loadPageIndex(file) {
+  let data;
+  try {
+    data = JSON.parse(fs.readFileSync(file, 'utf8'));
+  } catch (error) {
+    return null;
+  }
+  if (!data || data.version !== INDEX_VERSION) return null;
+
+  const pages = new Map(Object.entries(data.pages || {}));
+  const asinPages = new Map();
+  for (const [page, asins] of pages) {
+    for (const asin of asins) {
+      if (!asinPages.has(asin)) asinPages.set(asin, new Set());
+      asinPages.get(asin).add(page);
+    }
+  }
+
+  return {
+    pages,
+    pagesFor(asin) {
+      return [...(asinPages.get(asin) || [])].sort();
+    },
+    pagesForMany(asins) {
+      const found = new Set();
+      for (const asin of asins) {
+        for (const page of asinPages.get(asin) || []) found.add(page);
+      }
+      return [...found].sort();
+    }
+  };
+}
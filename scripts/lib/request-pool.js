@@ -0,0 +1,327 @@
+/**
+ * POOL DE REQUÊTES - Briques async pour la vérification hebdomadaire
+ *
+ * - createAgents(): agents http/https keep-alive (connexions réutilisées)
+ * - TokenBucket: limite de débit globale (requêtes/seconde + burst)
+ * - HostLimiter: nombre max de requêtes simultanées par host
+ * - httpGet(): GET non bloquant (gzip/deflate/br, timeout)
+ * - createHttpClient(): les trois réunis, redirections comprises
+ * - withRetries(): retries avec backoff exponentiel "full jitter"
+ * - runPool(): N workers async qui consomment une liste
+ * - Checkpoint: journal JSONL append-only pour reprendre un run interrompu
+ */
+
+import fs from 'fs';
+import http from 'http';
+import https from 'https';
+import path from 'path';
+import zlib from 'zlib';
+
+/**
+ * Pause execution for specified milliseconds
+ */
+export function sleep(ms) {
+  return new Promise(resolve => setTimeout(resolve, ms));
+}
+
+/**
+ * Agents keep-alive partagés par toutes les requêtes d'un run
+ * @param {Object} options - { maxSockets: connexions max par host }
+ * @returns {Object} { 'http:': Agent, 'https:': Agent }
+ */
+export function createAgents({ maxSockets = 4 } = {}) {
+  const options = { keepAlive: true, maxSockets, maxFreeSockets: maxSockets };
+  return {
+    'http:': new http.Agent(options),
+    'https:': new https.Agent(options)
+  };
+}
+
+/**
+ * Ferme les sockets keep-alive (sinon le process reste ouvert)
+ */
+export function destroyAgents(agents) {
+  Object.values(agents).forEach(agent => agent.destroy());
+}
+
+/**
+ * Limite de débit: `rate` jetons par seconde, jusqu'à `burst` d'avance.
+ * Les appels à take() sont servis dans l'ordre d'arrivée.
+ */
+export class TokenBucket {
+  constructor({ rate, burst = 1 }) {
+    this.rate = rate;
+    this.capacity = Math.max(1, burst);
+    this.tokens = this.capacity;
+    this.last = performance.now();
+    this.queue = Promise.resolve();
+  }
+
+  _refill() {
+    const now = performance.now();
+    this.tokens = Math.min(this.capacity, this.tokens + (now - this.last) / 1000 * this.rate);
+    this.last = now;
+  }
+
+  async _take() {
+    this._refill();
+    if (this.tokens < 1) {
+      await sleep((1 - this.tokens) / this.rate * 1000);
+      this._refill();
+    }
+    this.tokens -= 1;
+  }
+
+  /**
+   * Attend qu'un jeton soit disponible (rate <= 0 ou Infinity: pas de limite)
+   */
+  take() {
+    if (!(this.rate > 0) || this.rate === Infinity) return Promise.resolve();
+    const next = this.queue.then(() => this._take());
+    this.queue = next;
+    return next;
+  }
+}
+
+/**
+ * Sémaphore par host: au plus `maxPerHost` requêtes en vol vers un même host
+ */
+export class HostLimiter {
+  constructor(maxPerHost) {
+    this.maxPerHost = maxPerHost;
+    this.active = new Map();
+    this.waiting = new Map();
+  }
+
+  /**
+   * @param {string} host
+   * @returns {Promise<Function>} release() à appeler quand la requête est finie
+   */
+  async acquire(host) {
+    const active = this.active.get(host) || 0;
+    if (active < this.maxPerHost) {
+      this.active.set(host, active + 1);
+    } else {
+      // The slot is handed over by release(), the active count stays the same
+      await new Promise(resolve => {
+        if (!this.waiting.has(host)) this.waiting.set(host, []);
+        this.waiting.get(host).push(resolve);
+      });
+    }
+    let released = false;
+    return () => {
+      if (released) return;
+      released = true;
+      this._release(host);
+    };
+  }
+
+  _release(host) {
+    const queue = this.waiting.get(host);
+    if (queue && queue.length) {
+      queue.shift()();
+    } else {
+      this.active.set(host, this.active.get(host) - 1);
+    }
+  }
+}
+
+/**
+ * Erreur avec statut HTTP et délai Retry-After éventuel
+ */
+export class HttpError extends Error {
+  constructor(message, { status = null, retryable = true, retryAfterMs = 0 } = {}) {
+    super(message);
+    this.status = status;
+    this.retryable = retryable;
+    this.retryAfterMs = retryAfterMs;
+  }
+}
+
+function decodeBody(res) {
+  switch (res.headers['content-encoding']) {
+    case 'gzip': return res.pipe(zlib.createGunzip());
+    case 'deflate': return res.pipe(zlib.createInflate());
+    case 'br': return res.pipe(zlib.createBrotliDecompress());
+    default: return res;
+  }
+}
+
+/**
+ * Délai Retry-After en ms (secondes ou date HTTP), 0 si absent
+ */
+export function retryAfterMs(header) {
+  if (!header) return 0;
+  const seconds = Number(header);
+  if (Number.isFinite(seconds)) return Math.max(0, seconds * 1000);
+  const date = Date.parse(header);
+  return Number.isNaN(date) ? 0 : Math.max(0, date - Date.now());
+}
+
+/**
+ * GET non bloquant sur les agents keep-alive (un seul aller-retour: une
+ * redirection est renvoyée telle quelle, createHttpClient() la suit)
+ * @param {string} url
+ * @param {Object} options - { agents, headers, timeout }
+ * @returns {Promise<Object>} { status, headers, body, url }
+ */
+export function httpGet(url, { agents = {}, headers = {}, timeout = 10000 } = {}) {
+  return new Promise((resolve, reject) => {
+    const target = new URL(url);
+    const client = target.protocol === 'http:' ? http : https;
+    const req = client.get(target, { agent: agents[target.protocol], headers, timeout }, res => {
+      const { statusCode, headers: resHeaders } = res;
+      const chunks = [];
+      const body = decodeBody(res);
+      body.on('data', chunk => chunks.push(chunk));
+      body.on('end', () => resolve({
+        status: statusCode,
+        headers: resHeaders,
+        body: Buffer.concat(chunks).toString('utf8'),
+        url: target.href
+      }));
+      body.on('error', reject);
+    });
+    req.on('timeout', () => req.destroy(new HttpError(`Timeout after ${timeout}ms`)));
+    req.on('error', reject);
+  });
+}
+
+function redirectTarget(response) {
+  const { status, headers } = response;
+  return status >= 300 && status < 400 && headers.location ? new URL(headers.location, response.url).href : null;
+}
+
+/**
+ * Client HTTP d'un run: keep-alive + token bucket + limite par host.
+ * Chaque redirection est une requête comme les autres: jeton + place sur son host.
+ * @param {Object} options - { rate, burst, maxPerHost, timeout, maxRedirects }
+ * @returns {Object} { get(url, headers), close() }
+ */
+export function createHttpClient({ rate = 1, burst = 1, maxPerHost = 4, timeout = 10000, maxRedirects = 5 } = {}) {
+  const agents = createAgents({ maxSockets: maxPerHost });
+  const bucket = new TokenBucket({ rate, burst });
+  const hosts = new HostLimiter(maxPerHost);
+
+  async function getOnce(url, headers) {
+    const release = await hosts.acquire(new URL(url).host);
+    try {
+      await bucket.take();
+      return await httpGet(url, { agents, headers, timeout });
+    } finally {
+      release();
+    }
+  }
+
+  return {
+    async get(url, headers = {}) {
+      let response = await getOnce(url, headers);
+      for (let hops = 0; hops < maxRedirects; hops++) {
+        const next = redirectTarget(response);
+        if (!next) break;
+        response = await getOnce(next, headers);
+      }
+      return response;
+    },
+    close() {
+      destroyAgents(agents);
+    }
+  };
+}
+
+/**
+ * Retente fn(attempt) avec un backoff exponentiel à jitter complet:
+ * délai aléatoire dans [0, min(maxDelay, baseDelay * 2^(attempt-1))],
+ * jamais moins que le Retry-After renvoyé par le serveur.
+ * @param {Function} fn - async (attempt) => résultat; lève pour réessayer
+ * @param {Object} options - { retries, baseDelay, maxDelay, onRetry }
+ */
+export async function withRetries(fn, { retries = 3, baseDelay = 1000, maxDelay = 30000, onRetry = null } = {}) {
+  for (let attempt = 1; ; attempt++) {
+    try {
+      return await fn(attempt);
+    } catch (error) {
+      if (attempt >= retries || error.retryable === false) throw error;
+      const ceiling = Math.min(maxDelay, baseDelay * 2 ** (attempt - 1));
+      const delay = Math.max(Math.random() * ceiling, error.retryAfterMs || 0);
+      if (onRetry) onRetry(error, attempt, delay);
+      await sleep(delay);
+    }
+  }
+}
+
+/**
+ * Traite items avec `concurrency` workers async; l'ordre de fin n'est pas garanti
+ * @param {Array} items
+ * @param {Function} worker - async (item, index) => void
+ * @param {number} concurrency
+ */
+export async function runPool(items, worker, concurrency) {
+  let next = 0;
+  const runners = Array.from({ length: Math.max(1, Math.min(concurrency, items.length)) }, async () => {
+    while (next < items.length) {
+      const index = next++;
+      await worker(items[index], index);
+    }
+  });
+  await Promise.all(runners);
+}
+
+/**
+ * Journal de progression: une ligne JSON par ASIN terminé.
+ * La première ligne identifie le run (clé = liste d'ASINs); un journal
+ * d'un autre run est ignoré. Une dernière ligne tronquée (crash) est ignorée.
+ */
+export class Checkpoint {
+  constructor(file, key) {
+    this.file = file;
+    this.key = key;
+  }
+
+  /**
+   * @returns {Map} asin -> données déjà obtenues (les échecs seront retentés)
+   */
+  load() {
+    const done = new Map();
+    if (!fs.existsSync(this.file)) return done;
+    const content = fs.readFileSync(this.file, 'utf8');
+    const lines = content.split('\n');
+    let header = null;
+    try {
+      header = JSON.parse(lines[0]);
+    } catch (error) {
+      return done;
+    }
+    if (!header || header.key !== this.key) return done;
+    for (const line of lines.slice(1)) {
+      if (!line) continue;
+      try {
+        const { asin, data } = JSON.parse(line);
+        if (data) done.set(asin, data);
+      } catch (error) {
+        // Truncated last line of an interrupted run
+      }
+    }
+    // Terminate that truncated line, or the next record() would be glued to it
+    if (content && !content.endsWith('\n')) fs.appendFileSync(this.file, '\n');
+    return done;
+  }
+
+  /**
+   * Commence un journal (nouveau run) ou continue celui qui existe (reprise)
+   */
+  open(resume) {
+    fs.mkdirSync(path.dirname(this.file), { recursive: true });
+    if (!resume || this.load().size === 0) {
+      fs.writeFileSync(this.file, JSON.stringify({ key: this.key, startedAt: new Date().toISOString() }) + '\n');
+    }
+  }
+
+  record(asin, data) {
+    fs.appendFileSync(this.file, JSON.stringify({ asin, data }) + '\n');
+  }
+
+  clear() {
+    fs.rmSync(this.file, { force: true });
+  }
+}
@@ -0,0 +1,234 @@
+/**
+ * HISTORIQUE DES VRAIES DONNÉES - Snapshots append-only (format de glowpicked/history.py)
+ *
+ * - review-history.jsonl: une ligne par snapshot, en colonnes (asins, rating, reviews)
+ * - snapshot "full" (keyframe) toutes les KEYFRAME_EVERY lignes, sinon seulement
+ *   les ASINs modifiés, review counts en delta du précédent
+ * - review-history.idx: "date offset length full" par snapshot, pour relire
+ *   à partir du dernier keyframe sans parcourir tout l'historique
+ * - real-review-counts.json (publié) ne reçoit que les changements significatifs;
+ *   materialize() le régénère depuis un snapshot
+ *
+ * Requêtes (plage, as-of, top movers): python3 -m glowpicked.history
+ */
+
+import { execFileSync } from 'child_process';
+import fs from 'fs';
+import path from 'path';
+
+export const KEYFRAME_EVERY = 8;
+export const HISTORY_NAME = 'review-history.jsonl';
+
+/**
+ * data/real-review-counts.json -> data/review-history.jsonl
+ */
+export function historyPath(realDataFile) {
+  return path.join(path.dirname(realDataFile), HISTORY_NAME);
+}
+
+/**
+ * Date des données d'un fichier: son dernier commit s'il n'a pas été modifié depuis,
+ * sinon sa date de modification (sur un clone frais, le mtime = date du checkout)
+ */
+export function dataDate(file) {
+  const git = args => execFileSync('git', args, { cwd: path.dirname(path.resolve(file)), encoding: 'utf8', stdio: ['ignore', 'pipe', 'ignore'] }).trim();
+  let committed = '';
+  let modified = '';
+  try {
+    modified = git(['status', '--porcelain', '--', path.basename(file)]);
+    committed = git(['log', '-1', '--format=%cs', '--', path.basename(file)]);
+  } catch {
+    // pas un dépôt git (ou git absent): mtime
+  }
+  if (committed && !modified) return committed;
+  return fs.statSync(file).mtime.toISOString().split('T')[0];
+}
+
+function isNumber(value) {
+  return typeof value === 'number' && Number.isFinite(value);
+}
+
+function entry(rating, reviews) {
+  return { reviews, rating };
+}
+
+function sameEntry(a, b) {
+  return a && b && a.rating === b.rating && a.reviews === b.reviews;
+}
+
+export class ReviewHistory {
+  constructor(file) {
+    this.file = file;
+    this.indexFile = file.replace(/\.[^.\/]+$/, '') + '.idx';
+    this.index = [];  // { date, offset, length, full }
+    this._loadIndex();
+  }
+
+  get length() {
+    return this.index.length;
+  }
+
+  _loadIndex() {
+    try {
+      for (const line of fs.readFileSync(this.indexFile, 'ascii').split('\n')) {
+        const parts = line.split(' ');
+        if (parts.length === 4) {
+          this.index.push({ date: parts[0], offset: Number(parts[1]), length: Number(parts[2]), full: parts[3] === '1' });
+        }
+      }
+    } catch (error) {
+      this.index = [];
+    }
+    this._catchUp();
+  }
+
+  _end() {
+    const last = this.index.at(-1);
+    return last ? last.offset + last.length : 0;
+  }
+
+  // Index complete snapshots written after the last index line (crash between the two writes)
+  _catchUp() {
+    let end = this._end();
+    const size = fs.existsSync(this.file) ? fs.statSync(this.file).size : 0;
+    if (end > size) {
+      this.index = [];
+      end = 0;
+    }
+    if (end === size) return;
+    const tail = fs.readFileSync(this.file).subarray(end);
+    let offset = end;
+    let start = 0;
+    for (let nl = tail.indexOf(10); nl !== -1; nl = tail.indexOf(10, start)) {
+      const line = tail.subarray(start, nl + 1);
+      let snapshot;
+      try {
+        snapshot = JSON.parse(line.toString('utf8'));
+      } catch (error) {
+        break;
+      }
+      this.index.push({ date: snapshot.date, offset, length: line.length, full: Boolean(snapshot.full) });
+      offset += line.length;
+      start = nl + 1;
+    }
+    this._writeIndex(this.index, 'w');
+  }
+
+  _writeIndex(entries, flag = 'a') {
+    const lines = entries.map(e => `${e.date} ${e.offset} ${e.length} ${e.full ? 1 : 0}\n`).join('');
+    fs.writeFileSync(this.indexFile, lines, { flag });
+  }
+
+  _keyframeBefore(position) {
+    while (position > 0 && !this.index[position].full) position--;
+    return position;
+  }
+
+  static apply(state, snapshot) {
+    if (snapshot.full) state.clear();
+    for (const asin of snapshot.removed || []) state.delete(asin);
+    snapshot.asins.forEach((asin, i) => {
+      let reviews = snapshot.reviews[i];
+      const previous = state.get(asin);
+      if (reviews !== null && !snapshot.full && previous && isNumber(previous.reviews)) {
+        reviews += previous.reviews;
+      }
+      state.set(asin, entry(snapshot.rating[i], reviews));
+    });
+  }
+
+  /**
+   * Vraies données au dernier snapshot <= date (ISO; undefined = le dernier)
+   * @returns {Map} asin -> { reviews, rating }, dans l'ordre du fichier JSON
+   */
+  asOf(date) {
+    const state = new Map();
+    let position = this.index.length - 1;
+    if (date !== undefined) {
+      while (position >= 0 && this.index[position].date > date) position--;
+    }
+    if (position < 0) return state;
+
+    const first = this.index[this._keyframeBefore(position)];
+    const last = this.index[position];
+    const fd = fs.openSync(this.file, 'r');
+    try {
+      const buffer = Buffer.alloc(last.offset + last.length - first.offset);
+      fs.readSync(fd, buffer, 0, buffer.length, first.offset);
+      for (const line of buffer.toString('utf8').split('\n')) {
+        if (line) ReviewHistory.apply(state, JSON.parse(line));
+      }
+    } finally {
+      fs.closeSync(fd);
+    }
+    return state;
+  }
+
+  /**
+   * Ajoute le snapshot de `date` (données complètes: asin -> { reviews, rating }),
+   * ou remplace le dernier s'il est de la même date
+   * @returns {boolean} true si écrit comme keyframe
+   */
+  append(date, data) {
+    let last = this.index.at(-1);
+    if (last && date < last.date) {
+      throw new Error(`Snapshot du ${date} antérieur au dernier (${last.date})`);
+    }
+    if (last && date === last.date) {
+      // Run relancé le même jour (après un crash): remplace le snapshot du jour
+      this.index.pop();
+      this._writeIndex(this.index, 'w');
+      last = this.index.at(-1);
+    }
+    const previous = last ? this.asOf() : new Map();
+    const full = !last || this.index.length - this._keyframeBefore(this.index.length - 1) >= KEYFRAME_EVERY;
+
+    const snapshot = { date, full, asins: [], rating: [], reviews: [] };
+    for (const [asin, value] of Object.entries(data)) {
+      const rating = value?.rating ?? null;
+      let reviews = value?.reviews ?? null;
+      const old = previous.get(asin);
+      if (!full && sameEntry(old, entry(rating, reviews))) continue;
+      if (!full && old && isNumber(old.reviews) && reviews !== null) reviews -= old.reviews;
+      snapshot.asins.push(asin);
+      snapshot.rating.push(rating);
+      snapshot.reviews.push(reviews);
+    }
+    if (!full) {
+      const removed = [...previous.keys()].filter(asin => !(asin in data));
+      if (removed.length > 0) snapshot.removed = removed;
+    }
+
+    const line = Buffer.from(JSON.stringify(snapshot) + '\n', 'utf8');
+    const offset = this._end();
+    fs.mkdirSync(path.dirname(this.file), { recursive: true });
+    const fd = fs.openSync(this.file, 'a');
+    try {
+      fs.ftruncateSync(fd, offset);  // snapshot à moitié écrit par un crash
+      fs.writeSync(fd, line);
+      fs.fsyncSync(fd);
+    } finally {
+      fs.closeSync(fd);
+    }
+    const added = { date, offset, length: line.length, full };
+    this.index.push(added);
+    this._writeIndex([added]);
+    return full;
+  }
+
+  /**
+   * Régénère real-review-counts.json depuis le dernier snapshot (ou celui de `date`)
+   * @returns {boolean} false si le fichier était déjà à jour (pas réécrit)
+   * @throws si aucun snapshot à cette date (le fichier n'est pas touché)
+   */
+  materialize(realDataFile, date) {
+    const position = date === undefined ? this.index.length - 1 : this.index.findLastIndex(e => e.date <= date);
+    if (position < 0) throw new Error(`Aucun snapshot au ${date ?? 'dernier run'} (${this.file}): ${realDataFile} non modifié`);
+    const content = JSON.stringify(Object.fromEntries(this.asOf(date)), null, 2);
+    if (fs.existsSync(realDataFile) && fs.readFileSync(realDataFile, 'utf8') === content) return false;
+    const tmp = `${realDataFile}.tmp`;
+    fs.writeFileSync(tmp, content);
+    fs.renameSync(tmp, realDataFile);
+    return true;
+  }
+}
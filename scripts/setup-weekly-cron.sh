@@ -25,17 +25,26 @@ cd "$PROJECT_DIR"
 echo "=== Weekly Verification Started: \$(date) ===" >> "$CRON_LOG"
 
 # Run verification with timeout (max 30 minutes)
-timeout 1800 node "$SCRIPT_DIR/weekly-data-verification.js" >> "$CRON_LOG" 2>&1
+timeout 1800 node "$SCRIPT_DIR/weekly-data-verification.js" --regenerate >> "$CRON_LOG" 2>&1
 EXIT_CODE=\$?
 
 # Log result
 if [ \$EXIT_CODE -eq 0 ]; then
     echo "✅ Weekly verification completed successfully" >> "$CRON_LOG"
+
+    # Sidecar binaire des vraies données, périmé dès que le JSON change (sinon lecture du JSON)
+    python3 -m glowpicked.realdata data/real-review-counts.json >> "$CRON_LOG" 2>&1
+
+    # Sitemap shardé: lastmod = dernier changement des données de chaque page
+    python3 -m glowpicked.sitemap >> "$CRON_LOG" 2>&1
+
+    # Variantes responsives des images (seules les images modifiées sont ré-encodées)
+    python3 -m glowpicked.images -j 0 >> "$CRON_LOG" 2>&1
     
     # If changes were detected, auto-commit and push (optional)
     if [ -f "$PROJECT_DIR/data/weekly-verification-report.md" ]; then
         cd "$PROJECT_DIR"
-        git add data/real-review-counts.json data/weekly-verification-report.md
+        git add data/real-review-counts.json data/review-history.jsonl data/weekly-verification-report.md site/src/pages/reviews site/public/sitemap*.xml site/public/images site/src/data/responsive-images.json
         git commit -m "📊 Weekly data verification - \$(date +%Y-%m-%d)
 
 Auto-updated product ratings and review counts from Amazon.
@@ -0,0 +1,224 @@
+#!/usr/bin/env node
+/**
+ * 🧪 TEST HORS-LIGNE - Vérification hebdomadaire contre un serveur HTTP local
+ *
+ * Lance un faux "Amazon" sur 127.0.0.1 (pages produit, 503 passagers, 404,
+ * Retry-After, redirections) et vérifie: résultats, débit du token bucket,
+ * limite par host, réutilisation des connexions keep-alive, retries, reprise
+ * sur checkpoint (ligne tronquée comprise), redirections soumises au débit et
+ * snapshots de l'historique (toutes les valeurs relevées; real-review-counts.json
+ * ne reçoit que les changements significatifs, run relancé le même jour remplacé).
+ *
+ * Usage: node scripts/test-verification-stub.js
+ */
+
+import assert from 'assert';
+import crypto from 'crypto';
+import fs from 'fs';
+import http from 'http';
+import os from 'os';
+import path from 'path';
+import zlib from 'zlib';
+import { runWeeklyVerification } from './weekly-data-verification.js';
+import { Checkpoint, createHttpClient } from './lib/request-pool.js';
+import { ReviewHistory, historyPath } from './lib/review-history.js';
+
+const ASINS = Array.from({ length: 12 }, (_, i) => `B0TEST${String(i).padStart(4, '0')}`);
+const MISSING_ASIN = ASINS[11];        // 404: jamais retenté
+const FLAKY_ASIN = ASINS[3];           // 503 une fois, puis OK
+const THROTTLED_ASIN = ASINS[5];       // 429 + Retry-After une fois, puis OK
+const RATE = 20;                       // req/s
+const PER_HOST = 3;
+const HOP_RATE = 4;                    // req/s du client de la chaîne de redirections
+
+function productPage(asin) {
+  const i = ASINS.indexOf(asin);
+  return `<html><script>{"averageStarRating":{"displayString":"x","value":4.${i % 10}}}</script>` +
+    `<span>"totalReviewCount":${(10000 + i * 1000).toLocaleString('en-US')}</span></html>`;
+}
+
+function startStub() {
+  const stats = { requests: [], inFlight: 0, maxInFlight: 0, sockets: 0, seen: new Map(), hops: [] };
+  const server = http.createServer((req, res) => {
+    // /hop/N: chaîne de N redirections, hors statistiques du run
+    const hop = req.url.match(/^\/hop\/(\d+)$/);
+    if (hop) {
+      stats.hops.push(performance.now());
+      const left = Number(hop[1]);
+      if (left > 0) res.writeHead(302, { Location: `/hop/${left - 1}` }).end();
+      else res.writeHead(200).end('arrived');
+      return;
+    }
+    const asin = req.url.split('/').pop();
+    const count = (stats.seen.get(asin) || 0) + 1;
+    stats.seen.set(asin, count);
+    stats.requests.push(performance.now());
+    stats.inFlight++;
+    stats.maxInFlight = Math.max(stats.maxInFlight, stats.inFlight);
+
+    setTimeout(() => {
+      stats.inFlight--;
+      if (asin === MISSING_ASIN) {
+        res.writeHead(404).end('Not found');
+      } else if (asin === FLAKY_ASIN && count === 1) {
+        res.writeHead(503).end('Busy');
+      } else if (asin === THROTTLED_ASIN && count === 1) {
+        res.writeHead(429, { 'Retry-After': '0.2' }).end('Slow down');
+      } else {
+        res.writeHead(200, { 'Content-Type': 'text/html', 'Content-Encoding': 'gzip' });
+        res.end(zlib.gzipSync(productPage(asin)));
+      }
+    }, 150);
+  });
+  server.on('connection', () => stats.sockets++);
+  return new Promise(resolve => server.listen(0, '127.0.0.1', () => resolve({ server, stats })));
+}
+
+console.log('🧪 TEST VÉRIFICATION HEBDOMADAIRE - SERVEUR STUB');
+console.log('=================================================');
+
+const tmp = fs.mkdtempSync(path.join(os.tmpdir(), 'glowpicked-verif-'));
+const files = {
+  asinsFile: path.join(tmp, 'verified-asins-all.json'),
+  realDataFile: path.join(tmp, 'real-review-counts.json'),
+  reportFile: path.join(tmp, 'report.md'),
+  checkpointFile: path.join(tmp, 'checkpoint.jsonl')
+};
+fs.writeFileSync(files.asinsFile, JSON.stringify({
+  categories: {
+    stub: { budget: ASINS.slice(0, 6).map(asin => ({ asin })), luxury: ASINS.slice(6).map(asin => ({ asin })) }
+  }
+}));
+// ASINS[0] inchangé, ASINS[1] à -1% (10 890 -> 11 000): historique seulement
+fs.writeFileSync(files.realDataFile, JSON.stringify({
+  [ASINS[0]]: { rating: 4.0, reviews: 10000 },
+  [ASINS[1]]: { rating: 4.1, reviews: 10890 }
+}));
+fs.utimesSync(files.realDataFile, new Date('2026-01-05'), new Date('2026-01-05'));  // hors git: date du snapshot initial
+// Index ASIN -> pages: seule "stub-a" montre un produit qui change (ASINS[0] est inchangé)
+fs.writeFileSync(path.join(tmp, 'page-index.json'), JSON.stringify({
+  version: 1,
+  pages: { 'stub-a': [ASINS[0], ASINS[2]], 'stub-b': [ASINS[0], 'B0UNRELATED'] }
+}));
+
+const { server, stats } = await startStub();
+const baseUrl = `http://127.0.0.1:${server.address().port}`;
+const options = {
+  ...files,
+  baseUrl,
+  concurrency: 6,
+  rate: RATE,
+  burst: 1,
+  maxPerHost: PER_HOST,
+  retries: 3,
+  retryBaseDelay: 50
+};
+
+// Silence the per-ASIN logs of the runs
+const log = console.log;
+const quiet = fn => async (...args) => {
+  console.log = () => {};
+  try {
+    return await fn(...args);
+  } finally {
+    console.log = log;
+  }
+};
+
+try {
+  // 1. Reprise: un checkpoint "interrompu" avec 4 ASINs déjà faits
+  console.log('\n1️⃣ REPRISE DEPUIS CHECKPOINT:');
+  const key = crypto.createHash('sha1').update([...ASINS].sort().join(',')).digest('hex');
+  const checkpoint = new Checkpoint(files.checkpointFile, key);
+  checkpoint.open(false);
+  ASINS.slice(6, 10).forEach(asin => checkpoint.record(asin, { rating: 4.9, reviews: 99999 }));
+  fs.appendFileSync(files.checkpointFile, '{"asin": "B0TRUNC');  // ligne coupée par le crash
+
+  const result = await quiet(runWeeklyVerification)(options);
+  for (const asin of ASINS.slice(6, 10)) {
+    assert.ok(!stats.seen.has(asin), `${asin} ne devait pas être redemandé`);
+  }
+  console.log(`✅ 4 ASINs repris du checkpoint, ${stats.seen.size} demandés au serveur`);
+
+  // 2. Résultats
+  console.log('\n2️⃣ RÉSULTATS:');
+  const realData = JSON.parse(fs.readFileSync(files.realDataFile, 'utf8'));
+  assert.deepStrictEqual(realData[ASINS[1]], { rating: 4.1, reviews: 10890 }, 'changement mineur non publié');
+  assert.deepStrictEqual(realData[ASINS[2]], { rating: 4.2, reviews: 12000 });
+  assert.deepStrictEqual(realData[FLAKY_ASIN], { rating: 4.3, reviews: 13000 });
+  assert.deepStrictEqual(realData[ASINS[7]], { rating: 4.9, reviews: 99999 });
+  assert.ok(!(MISSING_ASIN in realData));
+  assert.strictEqual(result.errors, 1);
+  assert.strictEqual(stats.seen.get(MISSING_ASIN), 1, '404 ne doit pas être retenté');
+  assert.strictEqual(stats.seen.get(FLAKY_ASIN), 2, '503 doit être retenté une fois');
+  assert.strictEqual(stats.seen.get(THROTTLED_ASIN), 2, '429 doit être retenté une fois');
+  assert.ok(!fs.existsSync(files.checkpointFile), 'checkpoint supprimé après un run complet');
+  console.log(`✅ ${result.checked} vérifiés, ${result.updated} mis à jour, ${result.errors} erreur (404)`);
+
+  // Historique: le JSON initial comme keyframe, puis le snapshot du run en deltas
+  const history = new ReviewHistory(historyPath(files.realDataFile));
+  assert.strictEqual(history.length, 2);
+  assert.deepStrictEqual(history.index.map(e => e.date), ['2026-01-05', new Date().toISOString().split('T')[0]]);
+  assert.deepStrictEqual(history.index.map(e => e.full), [true, false]);
+  assert.deepStrictEqual(Object.fromEntries(history.asOf()), { ...realData, [ASINS[1]]: { reviews: 11000, rating: 4.1 } });
+  assert.deepStrictEqual(Object.fromEntries(history.asOf('2000-01-01')), {});
+  const lines = fs.readFileSync(historyPath(files.realDataFile), 'utf8').trim().split('\n').map(JSON.parse);
+  assert.ok(!lines[1].asins.includes(ASINS[0]), 'ASIN inchangé absent du snapshot');
+  assert.strictEqual(lines[1].asins.length, 10);
+  console.log(`✅ Historique: ${history.length} snapshots, changement mineur gardé hors de real-review-counts.json`);
+
+  assert.deepStrictEqual(result.affectedPages, ['stub-a']);
+  assert.match(fs.readFileSync(files.reportFile, 'utf8'), /## Pages Affected\n- stub-a \(B0TEST0002\)/);
+  console.log(`✅ Pages affectées (index ASIN -> pages): ${result.affectedPages.join(', ')}`);
+
+  // 3. Débit et concurrence
+  console.log('\n3️⃣ DÉBIT, CONCURRENCE, KEEP-ALIVE:');
+  const elapsed = (stats.requests.at(-1) - stats.requests[0]) / 1000;
+  const observedRate = (stats.requests.length - 1) / elapsed;
+  assert.ok(observedRate <= RATE * 1.1, `débit ${observedRate.toFixed(1)} req/s > ${RATE}`);
+  assert.ok(stats.maxInFlight <= PER_HOST, `${stats.maxInFlight} requêtes simultanées > ${PER_HOST}`);
+  assert.ok(stats.maxInFlight > 1, 'les requêtes doivent se chevaucher');
+  assert.ok(stats.sockets <= PER_HOST, `${stats.sockets} connexions pour ${stats.requests.length} requêtes`);
+  console.log(`✅ ${stats.requests.length} requêtes à ${observedRate.toFixed(1)} req/s (max ${RATE})`);
+  console.log(`✅ ${stats.maxInFlight} en vol max (limite ${PER_HOST}), ${stats.sockets} connexions TCP réutilisées`);
+
+  // 4. Checkpoint tronqué et redirections
+  console.log('\n4️⃣ CHECKPOINT TRONQUÉ, REDIRECTIONS:');
+  const crashed = new Checkpoint(path.join(tmp, 'crashed.jsonl'), 'crash');
+  crashed.open(false);
+  crashed.record(ASINS[0], { rating: 4.0, reviews: 1 });
+  fs.appendFileSync(crashed.file, '{"asin": "B0TRUNC');
+  assert.strictEqual(crashed.load().size, 1);
+  crashed.record(ASINS[1], { rating: 4.1, reviews: 2 });
+  assert.deepStrictEqual([...crashed.load().keys()], [ASINS[0], ASINS[1]], 'record après une ligne tronquée');
+  console.log('✅ Ligne tronquée terminée au chargement, enregistrements suivants intacts');
+
+  const client = createHttpClient({ rate: HOP_RATE, burst: 1, maxPerHost: 1 });
+  try {
+    const response = await client.get(`${baseUrl}/hop/3`);
+    assert.strictEqual(response.body, 'arrived');
+    assert.strictEqual(response.url, `${baseUrl}/hop/0`);
+  } finally {
+    client.close();
+  }
+  assert.strictEqual(stats.hops.length, 4);
+  const minGap = Math.min(...stats.hops.slice(1).map((t, i) => t - stats.hops[i]));
+  assert.ok(minGap >= 1000 / HOP_RATE * 0.9, `redirection hors token bucket (écart ${minGap.toFixed(0)} ms)`);
+  console.log(`✅ 3 redirections suivies, chacune soumise au débit (écart min ${minGap.toFixed(0)} ms)`);
+
+  // 5. Run relancé le même jour: le snapshot du jour est remplacé, pas dupliqué
+  console.log('\n5️⃣ RUN RELANCÉ LE MÊME JOUR:');
+  await quiet(runWeeklyVerification)({ ...options, resume: false });
+  const rerun = new ReviewHistory(historyPath(files.realDataFile));
+  assert.deepStrictEqual(rerun.index.map(e => e.full), [true, false]);
+  assert.strictEqual(fs.readFileSync(historyPath(files.realDataFile), 'utf8').trim().split('\n').length, 2);
+  // ASINS[7] venait du checkpoint (4.9/99999), cette fois relevé sur le serveur
+  assert.deepStrictEqual(rerun.asOf().get(ASINS[7]), { reviews: 17000, rating: 4.7 });
+  assert.deepStrictEqual(rerun.asOf('2026-01-05').get(ASINS[1]), { reviews: 10890, rating: 4.1 });
+  console.log(`✅ ${rerun.length} snapshots après deux runs le même jour`);
+
+  console.log('\n🎉 TOUS LES TESTS PASSENT');
+} finally {
+  server.close();
+  fs.rmSync(tmp, { recursive: true, force: true });
+}
@@ -5,25 +5,64 @@
  * Script automatique pour maintenir la transparence et la vérité:
  * - Vérifie ratings et review counts sur Amazon chaque semaine
  * - Détecte les changements significatifs (±5% reviews, ±0.1 rating)  
- * - Met à jour automatiquement real-review-counts.json
+ * - Ajoute un snapshot (toutes les valeurs relevées) à l'historique
+ *   (data/review-history.jsonl); real-review-counts.json ne reçoit que les
+ *   changements significatifs
  * - Génère rapport des changements pour commit
+ * - Liste les pages qui montrent les produits modifiés (index ASIN -> pages) et,
+ *   avec --regenerate, ne régénère que celles-ci
  * 
- * Usage: node weekly-data-verification.js
+ * Usage: node weekly-data-verification.js [--concurrency 4] [--rate 1] [--per-host 2] [--fresh] [--regenerate]
  * Cron: 0 9 * * 1 (chaque lundi 9h)
+ *
+ * Requêtes async sur connexions keep-alive, limitées par un token bucket
+ * et par host; retries avec jitter; un run interrompu reprend là où il
+ * s'était arrêté (checkpoint JSONL dans data/).
  */
 
+import crypto from 'crypto';
+import { spawnSync } from 'child_process';
 import fs from 'fs';
 import path from 'path';
-import { execSync } from 'child_process';
+import { parseArgs } from 'util';
+import {
+  Checkpoint,
+  HttpError,
+  createHttpClient,
+  retryAfterMs,
+  runPool,
+  withRetries
+} from './lib/request-pool.js';
+import { ReviewHistory, dataDate, historyPath } from './lib/review-history.js';
+import { loadPageIndex, pageIndexPath } from './lib/page-index.js';
 
 const BASE_DIR = '/Users/alfred/.openclaw/workspace/projects/glowpicked';
 const ASINS_FILE = path.join(BASE_DIR, 'data/verified-asins-all.json');
 const REAL_DATA_FILE = path.join(BASE_DIR, 'data/real-review-counts.json');
 const REPORT_FILE = path.join(BASE_DIR, 'data/weekly-verification-report.md');
+const CHECKPOINT_FILE = path.join(BASE_DIR, 'data/.weekly-verification.checkpoint.jsonl');
+const GENERATOR = path.join(BASE_DIR, 'generate-all-dynamic-pages.py');
 
-// Configuration pour éviter rate limiting
-const DELAY_BETWEEN_REQUESTS = 2000; // 2 secondes entre requêtes
-const MAX_RETRIES = 3;
+// Configuration pour éviter rate limiting: débit global + connexions par host
+const DEFAULTS = {
+  baseUrl: 'https://www.amazon.com',
+  asinsFile: ASINS_FILE,
+  realDataFile: REAL_DATA_FILE,
+  historyFile: null,     // défaut: review-history.jsonl à côté de realDataFile
+  reportFile: REPORT_FILE,
+  checkpointFile: CHECKPOINT_FILE,
+  pageIndexFile: null,   // défaut: page-index.json à côté de realDataFile
+  regenerate: false,     // régénère les pages affectées (generate-all-dynamic-pages.py)
+  generator: GENERATOR,
+  concurrency: 4,        // workers async
+  rate: 1,               // requêtes/seconde (token bucket)
+  burst: 2,
+  maxPerHost: 2,         // requêtes simultanées par host (connexions keep-alive)
+  timeout: 10000,
+  retries: 3,
+  retryBaseDelay: 2000,  // backoff exponentiel avec jitter
+  resume: true
+};
 const USER_AGENTS = [
   'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
   'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Safari/605.1.15',
@@ -31,103 +70,108 @@ const USER_AGENTS = [
 ];
 
 /**
- * Pause execution for specified milliseconds
+ * Get random user agent to avoid detection
  */
-function sleep(ms) {
-  return new Promise(resolve => setTimeout(resolve, ms));
+function getRandomUserAgent() {
+  return USER_AGENTS[Math.floor(Math.random() * USER_AGENTS.length)];
 }
 
 /**
- * Get random user agent to avoid detection
+ * Extract rating + review count from an Amazon product page
+ * @param {string} html
+ * @returns {Object|null} {rating, reviews} or null if incomplete
  */
-function getRandomUserAgent() {
-  return USER_AGENTS[Math.floor(Math.random() * USER_AGENTS.length)];
+function parseProductPage(html) {
+  // Extract rating (multiple possible selectors)
+  let rating = null;
+  const ratingPatterns = [
+    /"averageStarRating":[^}]*"value":([0-9.]+)/,
+    /data-hook="average-star-rating"[^>]*>\s*<span[^>]*>([0-9.]+)/,
+    /<span[^>]*data-hook="rating-out-of-text"[^>]*>([0-9.]+)/,
+    /averageStarRating.*?([0-9.]+)\s*out\s*of\s*5/i
+  ];
+  
+  for (const pattern of ratingPatterns) {
+    const match = html.match(pattern);
+    if (match && match[1]) {
+      rating = parseFloat(match[1]);
+      break;
+    }
+  }
+  
+  // Extract review count (multiple possible selectors)
+  let reviewCount = null;
+  const reviewPatterns = [
+    /"totalReviewCount":([0-9,]+)/,
+    /data-hook="total-review-count"[^>]*>([0-9,]+)/,
+    /<span[^>]*data-hook="total-review-count"[^>]*>([0-9,]+)/,
+    /([0-9,]+)\s*global\s*ratings?/i,
+    /([0-9,]+)\s*customer\s*reviews?/i
+  ];
+  
+  for (const pattern of reviewPatterns) {
+    const match = html.match(pattern);
+    if (match && match[1]) {
+      reviewCount = parseInt(match[1].replace(/,/g, ''));
+      break;
+    }
+  }
+  
+  // Validation
+  if (rating && rating >= 1 && rating <= 5 && reviewCount && reviewCount > 0) {
+    return { rating, reviews: reviewCount };
+  }
+  return null;
 }
 
 /**
  * Scrape Amazon product data (rating + review count)
+ * Network errors, 429/5xx and incomplete pages are retried with jitter.
  * @param {string} asin - Amazon ASIN
+ * @param {Object} client - createHttpClient() du run
+ * @param {Object} config - baseUrl, retries, retryBaseDelay
  * @returns {Object|null} {rating: number, reviews: number} or null if failed
  */
-async function scrapeAmazonData(asin) {
-  const url = `https://www.amazon.com/dp/${asin}`;
+async function scrapeAmazonData(asin, client, config = DEFAULTS) {
+  const url = `${config.baseUrl}/dp/${asin}`;
   
-  for (let attempt = 1; attempt <= MAX_RETRIES; attempt++) {
-    try {
-      console.log(`🔍 Checking ${asin} (attempt ${attempt}/${MAX_RETRIES})...`);
-      
-      // Use curl with random user agent and headers
-      const userAgent = getRandomUserAgent();
-      const curlCommand = `curl -s -L \\
-        -H "User-Agent: ${userAgent}" \\
-        -H "Accept: text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8" \\
-        -H "Accept-Language: en-US,en;q=0.5" \\
-        -H "Accept-Encoding: gzip, deflate" \\
-        -H "Connection: keep-alive" \\
-        -H "Cache-Control: no-cache" \\
-        "${url}"`;
+  try {
+    const data = await withRetries(async attempt => {
+      console.log(`🔍 Checking ${asin} (attempt ${attempt}/${config.retries})...`);
+      const res = await client.get(url, {
+        'User-Agent': getRandomUserAgent(),
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+        'Accept-Encoding': 'gzip, deflate, br',
+        'Cache-Control': 'no-cache'
+      });
       
-      const html = execSync(curlCommand, { encoding: 'utf8', timeout: 10000 });
-      
-      // Extract rating (multiple possible selectors)
-      let rating = null;
-      const ratingPatterns = [
-        /"averageStarRating":[^}]*"value":([0-9.]+)/,
-        /data-hook="average-star-rating"[^>]*>\\s*<span[^>]*>([0-9.]+)/,
-        /<span[^>]*data-hook="rating-out-of-text"[^>]*>([0-9.]+)/,
-        /averageStarRating.*?([0-9.]+)\\s*out\\s*of\\s*5/i
-      ];
-      
-      for (const pattern of ratingPatterns) {
-        const match = html.match(pattern);
-        if (match && match[1]) {
-          rating = parseFloat(match[1]);
-          break;
-        }
-      }
-      
-      // Extract review count (multiple possible selectors)
-      let reviewCount = null;
-      const reviewPatterns = [
-        /"totalReviewCount":([0-9,]+)/,
-        /data-hook="total-review-count"[^>]*>([0-9,]+)/,
-        /<span[^>]*data-hook="total-review-count"[^>]*>([0-9,]+)/,
-        /([0-9,]+)\\s*global\\s*ratings?/i,
-        /([0-9,]+)\\s*customer\\s*reviews?/i
-      ];
-      
-      for (const pattern of reviewPatterns) {
-        const match = html.match(pattern);
-        if (match && match[1]) {
-          reviewCount = parseInt(match[1].replace(/,/g, ''));
-          break;
-        }
+      if (res.status === 429 || res.status >= 500) {
+        throw new HttpError(`HTTP ${res.status}`, {
+          status: res.status,
+          retryAfterMs: retryAfterMs(res.headers['retry-after'])
+        });
       }
-      
-      // Validation
-      if (rating && rating >= 1 && rating <= 5 && reviewCount && reviewCount > 0) {
-        console.log(`✅ ${asin}: ${rating}⭐ (${reviewCount.toLocaleString()} reviews)`);
-        return { rating, reviews: reviewCount };
-      } else {
-        console.log(`⚠️  ${asin}: Incomplete data (rating: ${rating}, reviews: ${reviewCount})`);
-        if (attempt < MAX_RETRIES) {
-          await sleep(DELAY_BETWEEN_REQUESTS * attempt); // Exponential backoff
-          continue;
-        }
-        return null;
+      if (res.status !== 200) {
+        throw new HttpError(`HTTP ${res.status}`, { status: res.status, retryable: false });
       }
       
-    } catch (error) {
-      console.log(`❌ ${asin} attempt ${attempt} failed:`, error.message);
-      if (attempt < MAX_RETRIES) {
-        await sleep(DELAY_BETWEEN_REQUESTS * attempt);
-        continue;
-      }
-      return null;
-    }
+      const parsed = parseProductPage(res.body);
+      if (!parsed) throw new HttpError('Incomplete data (rating/reviews not found)');
+      return parsed;
+    }, {
+      retries: config.retries,
+      baseDelay: config.retryBaseDelay,
+      onRetry: (error, attempt, delay) =>
+        console.log(`⚠️  ${asin} attempt ${attempt} failed: ${error.message} (retry in ${Math.round(delay)}ms)`)
+    });
+    
+    console.log(`✅ ${asin}: ${data.rating}⭐ (${data.reviews.toLocaleString()} reviews)`);
+    return data;
+  } catch (error) {
+    console.log(`❌ ${asin} failed:`, error.message);
+    return null;
   }
-  
-  return null;
 }
 
 /**
@@ -143,17 +187,45 @@ function detectSignificantChanges(oldData, newData) {
   return reviewsDiff > 0.05 || ratingDiff > 0.1;
 }
 
+/**
+ * Clé d'un run pour le checkpoint: même liste d'ASINs = même run
+ */
+function runKey(asins) {
+  return crypto.createHash('sha1').update([...asins].sort().join(',')).digest('hex');
+}
+
+/**
+ * Write a file through a temp file + rename (never half-written)
+ */
+function writeFileAtomic(file, content) {
+  const tmp = `${file}.tmp`;
+  fs.writeFileSync(tmp, content);
+  fs.renameSync(tmp, file);
+}
+
 /**
  * Main verification function
+ * @param {Object} options - overrides of DEFAULTS (baseUrl, files, concurrency, rate...)
  */
-async function runWeeklyVerification() {
+async function runWeeklyVerification(options = {}) {
+  const config = { ...DEFAULTS, ...options };
   console.log('🚀 GLOWPICKED - Weekly Data Verification Starting...');
   console.log('='.repeat(60));
   
-  // Load current data
-  const asinsData = JSON.parse(fs.readFileSync(ASINS_FILE, 'utf8'));
-  const currentData = fs.existsSync(REAL_DATA_FILE) ? 
-    JSON.parse(fs.readFileSync(REAL_DATA_FILE, 'utf8')) : {};
+  // Load current data: the history keeps every observed value,
+  // the published JSON only the significant changes
+  const asinsData = JSON.parse(fs.readFileSync(config.asinsFile, 'utf8'));
+  const history = new ReviewHistory(config.historyFile || historyPath(config.realDataFile));
+  if (history.length === 0 && fs.existsSync(config.realDataFile)) {
+    // First run with a history: the current JSON becomes its first snapshot,
+    // dated when it was last committed (verified), not when it was checked out
+    const since = dataDate(config.realDataFile);
+    history.append(since, JSON.parse(fs.readFileSync(config.realDataFile, 'utf8')));
+    console.log(`🗂️  History started from ${config.realDataFile} (${since})`);
+  }
+  const observedData = Object.fromEntries(history.asOf());
+  const currentData = fs.existsSync(config.realDataFile) ?
+    JSON.parse(fs.readFileSync(config.realDataFile, 'utf8')) : observedData;
   
   // Extract all ASINs
   const allAsins = new Set();
@@ -167,22 +239,53 @@ async function runWeeklyVerification() {
     });
   });
   
-  console.log(`📊 Checking ${allAsins.size} products for data updates...\\n`);
+  // Reprise: les ASINs déjà vérifiés par un run interrompu ne sont pas redemandés
+  const checkpoint = new Checkpoint(config.checkpointFile, runKey(allAsins));
+  const results = config.resume ? checkpoint.load() : new Map();
+  checkpoint.open(config.resume);
+  const pending = [...allAsins].filter(asin => !results.has(asin));
+  
+  console.log(`📊 Checking ${allAsins.size} products for data updates...`);
+  if (results.size > 0) {
+    console.log(`♻️  Resuming: ${results.size} already checked, ${pending.length} remaining`);
+  }
+  console.log(`⚙️  ${config.concurrency} workers, ${config.rate} req/s, ${config.maxPerHost} per host\n`);
   
+  const client = createHttpClient({
+    rate: config.rate,
+    burst: config.burst,
+    maxPerHost: config.maxPerHost,
+    timeout: config.timeout
+  });
+  let fetched = 0;
+  try {
+    await runPool(pending, async asin => {
+      const data = await scrapeAmazonData(asin, client, config);
+      checkpoint.record(asin, data);
+      if (data) results.set(asin, data);
+      fetched++;
+      console.log(`[${results.size}/${allAsins.size}] ${asin} done (${fetched}/${pending.length} this run)`);
+    }, config.concurrency);
+  } finally {
+    client.close();
+  }
+  
+  const snapshot = { ...observedData };
   const updatedData = { ...currentData };
   const changes = [];
+  const changedAsins = [];
   const errors = [];
   let checkedCount = 0;
   let updatedCount = 0;
   
-  // Process each ASIN
+  // Compare in config order so the report is stable whatever the completion order
   for (const asin of allAsins) {
     checkedCount++;
-    console.log(`[${checkedCount}/${allAsins.size}] Processing ${asin}...`);
-    
-    const newData = await scrapeAmazonData(asin);
+    const newData = results.get(asin);
     
     if (newData) {
+      // The history keeps every observed value, the JSON and the report only significant changes
+      snapshot[asin] = newData;
       const oldData = currentData[asin];
       const hasSignificantChange = detectSignificantChanges(oldData, newData);
       
@@ -196,23 +299,30 @@ async function runWeeklyVerification() {
           `${newData.rating}⭐(${newData.reviews})`;
         
         changes.push(`${changeType}: ${asin} - ${changeDetail}`);
+        changedAsins.push(asin);
         console.log(`🔄 ${asin}: ${changeDetail}`);
-      } else {
-        console.log(`✓ ${asin}: No significant change`);
       }
     } else {
       errors.push(`❌ Failed to fetch data for ${asin}`);
-      console.log(`❌ ${asin}: Failed to fetch data`);
-    }
-    
-    // Rate limiting
-    if (checkedCount < allAsins.size) {
-      await sleep(DELAY_BETWEEN_REQUESTS);
     }
   }
   
+  // Pages that show a changed product: the only ones to regenerate and rebuild
+  const pageIndexFile = config.pageIndexFile || pageIndexPath(config.realDataFile);
+  const pageIndex = loadPageIndex(pageIndexFile);
+  const affectedPages = pageIndex ? pageIndex.pagesForMany(changedAsins) : [];
+  let pagesSection = '- No page affected';
+  if (!pageIndex && changedAsins.length > 0) {
+    pagesSection = `- ⚠️ ${pageIndexFile} missing: run generate-all-dynamic-pages.py to build it`;
+  } else if (affectedPages.length > 0) {
+    pagesSection = affectedPages.map(page => `- ${page} (${pageIndex.pages.get(page).filter(a => changedAsins.includes(a)).join(', ')})`).join('\n');
+  }
+
   // Generate report
   const timestamp = new Date().toISOString().split('T')[0];
+  // A run restarted the same day (crash after this point) replaces that day's snapshot
+  const replacesToday = history.index.at(-1)?.date === timestamp;
+  const wasKeyframe = history.append(timestamp, snapshot);
   const report = `# Weekly Data Verification Report - ${timestamp}
 
 ## Summary
@@ -221,39 +331,51 @@ async function runWeeklyVerification() {
 - **Errors:** ${errors.length}
 
 ## Changes Detected
-${changes.length > 0 ? changes.map(c => `- ${c}`).join('\\n') : '- No significant changes detected'}
+${changes.length > 0 ? changes.map(c => `- ${c}`).join('\n') : '- No significant changes detected'}
+
+## Pages Affected
+${pagesSection}
 
 ## Errors
-${errors.length > 0 ? errors.map(e => `- ${e}`).join('\\n') : '- No errors'}
+${errors.length > 0 ? errors.map(e => `- ${e}`).join('\n') : '- No errors'}
 
 ## Next Steps
 ${changes.length > 0 ? 
-  '- [ ] Review changes above\\n- [ ] Rebuild and deploy GlowPicked site\\n- [ ] Monitor for any rating/review anomalies' : 
-  '- [x] All data verified and up-to-date\\n- [x] No action required'}
+  '- [ ] Review changes above\n- [ ] Rebuild and deploy GlowPicked site\n- [ ] Monitor for any rating/review anomalies' : 
+  '- [x] All data verified and up-to-date\n- [x] No action required'}
   
 ---
 *Generated by weekly-data-verification.js on ${new Date().toISOString()}*
 `;
   
-  // Save updated data if changes were made
+  // Save updated data if significant changes were made (small drifts stay in the history only)
+  console.log(`\n🗂️  Snapshot ${timestamp} ${replacesToday ? 'replaced in' : 'appended to'} ${history.file}${wasKeyframe ? ' (keyframe)' : ''}`);
   if (updatedCount > 0) {
-    fs.writeFileSync(REAL_DATA_FILE, JSON.stringify(updatedData, null, 2));
-    console.log(`\\n✅ Updated ${REAL_DATA_FILE} with ${updatedCount} changes`);
+    writeFileAtomic(config.realDataFile, JSON.stringify(updatedData, null, 2));
+    console.log(`✅ Updated ${config.realDataFile} with ${updatedCount} changes`);
   }
   
+  if (config.regenerate && affectedPages.length > 0) {
+    regeneratePages(config, changedAsins, pageIndexFile);
+  }
+
   // Save report
-  fs.writeFileSync(REPORT_FILE, report);
-  console.log(`📋 Report saved to ${REPORT_FILE}`);
+  writeFileAtomic(config.reportFile, report);
+  console.log(`📋 Report saved to ${config.reportFile}`);
+  
+  // Run complet: le prochain repartira de zéro
+  checkpoint.clear();
   
   // Print summary
-  console.log('\\n' + '='.repeat(60));
+  console.log('\n' + '='.repeat(60));
   console.log('🎯 VERIFICATION COMPLETE');
   console.log(`✅ Checked: ${checkedCount}/${allAsins.size} products`);
   console.log(`🔄 Updated: ${updatedCount} products`);
   console.log(`❌ Errors: ${errors.length} products`);
+  console.log(`📄 Pages affected: ${affectedPages.length}${affectedPages.length ? ` (${affectedPages.join(', ')})` : ''}`);
   
   if (changes.length > 0) {
-    console.log('\\n📝 CHANGES DETECTED - Manual Review Recommended:');
+    console.log('\n📝 CHANGES DETECTED - Manual Review Recommended:');
     changes.forEach(change => console.log(`   ${change}`));
   }
   
@@ -261,26 +383,76 @@ ${changes.length > 0 ?
     checked: checkedCount,
     updated: updatedCount,
     errors: errors.length,
-    changes: changes.length
+    changes: changes.length,
+    affectedPages
   };
 }
 
+/**
+ * Régénère uniquement les pages qui montrent les ASINs modifiés, fallbacks
+ * synchronisés avec les nouvelles vraies données
+ */
+function regeneratePages(config, asins, pageIndexFile) {
+  console.log(`\n🏭 Regenerating affected pages...`);
+  const result = spawnSync('python3', [
+    config.generator,
+    '--asins', asins.join(','),
+    '--sync-fallbacks',
+    '--config', config.asinsFile,
+    '--real-data', config.realDataFile,
+    '--page-index', pageIndexFile
+  ], { cwd: path.dirname(config.generator), stdio: 'inherit' });
+  if (result.status !== 0) {
+    console.log(`⚠️  Page regeneration failed (${result.error ? result.error.message : `exit ${result.status}`})`);
+  }
+}
+
+/**
+ * Options CLI: --concurrency, --rate, --burst, --per-host, --retries,
+ * --timeout, --base-url, --fresh (ignore le checkpoint)
+ */
+function parseCliOptions(argv) {
+  const { values } = parseArgs({
+    args: argv,
+    options: {
+      concurrency: { type: 'string' },
+      rate: { type: 'string' },
+      burst: { type: 'string' },
+      'per-host': { type: 'string' },
+      retries: { type: 'string' },
+      timeout: { type: 'string' },
+      'base-url': { type: 'string' },
+      fresh: { type: 'boolean' },
+      regenerate: { type: 'boolean' }
+    }
+  });
+  const options = {};
+  const numbers = { concurrency: 'concurrency', rate: 'rate', burst: 'burst', 'per-host': 'maxPerHost', retries: 'retries', timeout: 'timeout' };
+  for (const [flag, key] of Object.entries(numbers)) {
+    if (values[flag] !== undefined) options[key] = Number(values[flag]);
+  }
+  if (values['base-url']) options.baseUrl = values['base-url'].replace(/\/$/, '');
+  if (values.fresh) options.resume = false;
+  if (values.regenerate) options.regenerate = true;
+  return options;
+}
+
 // Run if called directly
 if (import.meta.url === `file://${process.argv[1]}`) {
-  runWeeklyVerification()
+  runWeeklyVerification(parseCliOptions(process.argv.slice(2)))
     .then(result => {
       if (result.errors > 0) {
-        console.log('\\n⚠️  Some errors occurred during verification');
+        console.log('\n⚠️  Some errors occurred during verification');
         process.exit(1);
       } else {
-        console.log('\\n🎉 Weekly verification completed successfully!');
+        console.log('\n🎉 Weekly verification completed successfully!');
         process.exit(0);
       }
     })
     .catch(error => {
-      console.error('\\n💥 Fatal error during verification:', error);
+      console.error('\n💥 Fatal error during verification:', error);
       process.exit(1);
     });
 }
 
-export { runWeeklyVerification };
\ No newline at end of file
+export { runWeeklyVerification, scrapeAmazonData, parseProductPage };
\ No newline at end of file
@@ -5,23 +5,114 @@
  * Images are served from Amazon's CDN (images-na.ssl-images-amazon.com) = legal.
  * Prices are always live = no TOS violation.
  * 
- * Caches responses for 1 hour to respect rate limits.
+ * Caches each ASIN for 1 hour (LRU, 5000 ASINs max) to respect rate limits:
+ * responses are assembled from cached items and only missing ASINs go to
+ * PA-API, in one call. Expired items are served stale (up to 24h) while a
+ * background refresh runs; concurrent misses for an ASIN share one fetch.
+ * 
+ * Counters: /api/amazon-product?stats=1 (hits, misses, p50/p95 latency), with
+ * "Authorization: Bearer $STATS_TOKEN"; without STATS_TOKEN only under netlify dev
  * 
  * Setup: Add these env vars in Netlify dashboard:
  * - AMAZON_ACCESS_KEY
  * - AMAZON_SECRET_KEY
  * - AMAZON_ASSOCIATE_TAG (optional, defaults to glowpicked0c-20)
+ * - STATS_TOKEN (optional, enables ?stats=1 in production)
  */
 
 import type { Context } from "@netlify/functions";
+import { createHash, timingSafeEqual } from 'node:crypto';
+import { CacheMetrics, ProductCache } from '../../src/utils/product-cache.js';
+
+interface ProductSummary {
+  asin: string;
+  title: string;
+  imageUrl: string;
+  price: string;
+  url: string;
+  available: boolean;
+}
 
-// In-memory cache (persists across warm invocations)
-const cache = new Map<string, { data: any; expires: number }>();
-const CACHE_TTL = 60 * 60 * 1000; // 1 hour
+// Per-ASIN cache (persists across warm invocations)
+const CACHE_TTL = 60 * 60 * 1000;           // 1 hour fresh
+const STALE_TTL = 24 * 60 * 60 * 1000;      // then served stale while refreshing
+const PLACEHOLDER_TTL = 5 * 60 * 1000;      // PA-API error placeholders: retry soon
+const MAX_ASINS = 50;                        // per request; PA-API batches of 10 are made upstream
+const cache = new ProductCache<ProductSummary | null>({ maxEntries: 5000, ttl: CACHE_TTL, staleTtl: STALE_TTL });
+const metrics = new CacheMetrics();
+
+const JSON_HEADERS = {
+  'Content-Type': 'application/json',
+  'Cache-Control': 'public, max-age=3600, stale-while-revalidate=86400',
+  'Access-Control-Allow-Origin': '*',
+};
+
+/**
+ * One PA-API call for all the given ASINs; ASINs it does not return are
+ * cached as null (not found) so they are not requested again every time.
+ */
+async function fetchFromPaapi(asins: string[]): Promise<Map<string, ProductSummary | null>> {
+  // Dynamic import to keep cold starts fast when API isn't configured
+  const { getProductsByASINs } = await import('../../src/utils/amazon-paapi.js');
+  metrics.counters.upstreamCalls++;
+  metrics.counters.upstreamItems += asins.length;
+  const products = await getProductsByASINs(asins);
+
+  const found = new Map<string, ProductSummary | null>(asins.map(asin => [asin, null]));
+  for (const p of products) {
+    found.set(p.asin, {
+      asin: p.asin,
+      title: p.title,
+      imageUrl: p.imageUrl,
+      price: p.price,
+      url: p.url,
+      available: p.available,
+    });
+  }
+  return found;
+}
+
+// Placeholders (PA-API error for the batch) and unknown ASINs expire quickly
+function ttlFor(product: ProductSummary | null | undefined): number {
+  return product && product.title ? CACHE_TTL : PLACEHOLDER_TTL;
+}
+
+function refreshInBackground(asins: string[], context: Context) {
+  metrics.counters.refreshes++;
+  const refresh = Promise.all(cache.fetch(asins, fetchFromPaapi, ttlFor).values())
+    .catch(err => {
+      metrics.counters.errors++;
+      console.error('[amazon-product] Background refresh failed:', err);
+    });
+  // Keep the invocation alive until the refresh is done when the runtime allows it
+  (context as any)?.waitUntil?.(refresh);
+}
+
+/**
+ * Counters are internal: bearer STATS_TOKEN, or netlify dev when no token is set
+ */
+function canReadStats(req: Request): boolean {
+  const token = process.env.STATS_TOKEN;
+  if (!token) return process.env.NETLIFY_DEV === 'true';
+  const given = req.headers.get('authorization')?.replace(/^Bearer\s+/i, '') ?? '';
+  const digest = (value: string) => createHash('sha256').update(value).digest();
+  return timingSafeEqual(digest(given), digest(token));
+}
 
 export default async (req: Request, context: Context) => {
   const url = new URL(req.url);
-  const asins = url.searchParams.get('asins')?.split(',').slice(0, 10) || [];
+  if (url.searchParams.has('stats')) {
+    if (!canReadStats(req)) {
+      return new Response(JSON.stringify({ error: 'Not found' }), {
+        status: 404,
+        headers: { 'Content-Type': 'application/json', 'Cache-Control': 'no-store' },
+      });
+    }
+    return new Response(JSON.stringify(metrics.snapshot({ cacheSize: cache.size })), {
+      headers: { 'Content-Type': 'application/json', 'Cache-Control': 'no-store' },
+    });
+  }
+  const asins = [...new Set(url.searchParams.get('asins')?.split(',').map(a => a.trim()).filter(Boolean))].slice(0, MAX_ASINS);
   
   if (asins.length === 0) {
     return new Response(JSON.stringify({ error: 'Missing ?asins= parameter' }), {
@@ -54,53 +145,74 @@ export default async (req: Request, context: Context) => {
     });
   }
 
-  // Check cache
-  const cacheKey = asins.sort().join(',');
-  const cached = cache.get(cacheKey);
-  if (cached && cached.expires > Date.now()) {
-    return new Response(JSON.stringify(cached.data), {
-      headers: { 
-        'Content-Type': 'application/json',
-        'Cache-Control': 'public, max-age=3600',
-        'Access-Control-Allow-Origin': '*',
-        'X-Cache': 'HIT',
-      },
-    });
+  const started = performance.now();
+  metrics.counters.requests++;
+
+  // Assemble from cache: fresh and stale items are served as is
+  const items = new Map<string, ProductSummary | null>();
+  const stale: string[] = [];
+  const waiting = new Map<string, Promise<ProductSummary | null | undefined>>();
+  const missing: string[] = [];
+  let servedStale = false;
+
+  for (const asin of asins) {
+    const hit = cache.get(asin);
+    if (hit) {
+      items.set(asin, hit.value);
+      if (hit.state === 'fresh') {
+        metrics.counters.hits++;
+      } else {
+        metrics.counters.stale++;
+        servedStale = true;
+        if (!cache.pending(asin)) stale.push(asin);
+      }
+      continue;
+    }
+    metrics.counters.misses++;
+    const pending = cache.pending(asin);
+    if (pending) {
+      metrics.counters.coalesced++;
+      waiting.set(asin, pending);
+    } else {
+      missing.push(asin);
+    }
   }
 
+  if (stale.length > 0) refreshInBackground(stale, context);
+
   try {
-    // Dynamic import to keep cold starts fast when API isn't configured
-    const { getProductsByASINs } = await import('../../src/utils/amazon-paapi.js');
-    const products = await getProductsByASINs(asins);
-    
-    const responseData = {
-      products: products.map(p => ({
-        asin: p.asin,
-        title: p.title,
-        imageUrl: p.imageUrl,
-        price: p.price,
-        url: p.url,
-        available: p.available,
-      })),
-    };
-
-    // Cache it
-    cache.set(cacheKey, { data: responseData, expires: Date.now() + CACHE_TTL });
-
-    return new Response(JSON.stringify(responseData), {
-      headers: { 
-        'Content-Type': 'application/json',
-        'Cache-Control': 'public, max-age=3600',
-        'Access-Control-Allow-Origin': '*',
-        'X-Cache': 'MISS',
-      },
-    });
+    // Only the ASINs nobody is fetching yet go upstream, in a single call
+    if (missing.length > 0) {
+      for (const [asin, promise] of cache.fetch(missing, fetchFromPaapi, ttlFor)) {
+        waiting.set(asin, promise);
+      }
+    }
+    // Promise.all so that a failed batch never leaves a rejection unhandled
+    const values = await Promise.all(waiting.values());
+    [...waiting.keys()].forEach((asin, i) => items.set(asin, values[i] ?? null));
   } catch (err: any) {
+    metrics.counters.errors++;
     return new Response(JSON.stringify({ error: err.message }), {
       status: 500,
       headers: { 'Content-Type': 'application/json' },
     });
   }
+
+  const responseData = {
+    products: asins.map(asin => items.get(asin)).filter(Boolean),
+  };
+  const elapsed = performance.now() - started;
+  metrics.recordLatency(elapsed);
+
+  let xCache = servedStale ? 'STALE' : 'HIT';
+  if (waiting.size > 0) xCache = waiting.size < asins.length ? 'PARTIAL' : 'MISS';
+  return new Response(JSON.stringify(responseData), {
+    headers: { 
+      ...JSON_HEADERS,
+      'X-Cache': xCache,
+      'Server-Timing': `cache;dur=${elapsed.toFixed(1)}`,
+    },
+  });
 };
 
 export const config = {
@@ -0,0 +1,158 @@
+/**
+ * Per-ASIN product cache - LRU + TTL + stale-while-revalidate
+ *
+ * Used by netlify/functions/amazon-product.ts (lives across warm invocations).
+ * - Bounded LRU: at most `maxEntries` ASINs, least recently used evicted first
+ * - Fresh for `ttl`, then served stale for up to `staleTtl` while refreshing
+ * - Concurrent misses for the same ASIN share one in-flight promise
+ * - Counters (hits / stale / misses / coalesced / upstream calls) + latency percentiles
+ */
+
+export type CacheState = 'fresh' | 'stale';
+
+interface Entry<T> {
+  value: T;
+  freshUntil: number;
+  staleUntil: number;
+}
+
+export interface ProductCacheOptions {
+  maxEntries?: number;
+  ttl?: number;       // ms an entry is fresh
+  staleTtl?: number;  // ms an expired entry may still be served while refreshing
+  now?: () => number;
+}
+
+export class ProductCache<T> {
+  private entries = new Map<string, Entry<T>>();
+  private inflight = new Map<string, Promise<T | undefined>>();
+  readonly maxEntries: number;
+  readonly ttl: number;
+  readonly staleTtl: number;
+  private now: () => number;
+
+  constructor({ maxEntries = 5000, ttl = 60 * 60 * 1000, staleTtl = 24 * 60 * 60 * 1000, now = Date.now }: ProductCacheOptions = {}) {
+    this.maxEntries = maxEntries;
+    this.ttl = ttl;
+    this.staleTtl = staleTtl;
+    this.now = now;
+  }
+
+  get size(): number {
+    return this.entries.size;
+  }
+
+  /**
+   * Lookup without fetching; refreshes the LRU position on hit
+   */
+  get(asin: string): { value: T; state: CacheState } | undefined {
+    const entry = this.entries.get(asin);
+    if (!entry) return undefined;
+    const now = this.now();
+    if (now >= entry.staleUntil) {
+      this.entries.delete(asin);
+      return undefined;
+    }
+    // Map keeps insertion order: re-insert = most recently used
+    this.entries.delete(asin);
+    this.entries.set(asin, entry);
+    return { value: entry.value, state: now < entry.freshUntil ? 'fresh' : 'stale' };
+  }
+
+  set(asin: string, value: T, ttl: number = this.ttl): void {
+    const now = this.now();
+    this.entries.delete(asin);
+    this.entries.set(asin, { value, freshUntil: now + ttl, staleUntil: now + ttl + this.staleTtl });
+    while (this.entries.size > this.maxEntries) {
+      this.entries.delete(this.entries.keys().next().value as string);
+    }
+  }
+
+  /**
+   * In-flight fetch for an ASIN, if one is running
+   */
+  pending(asin: string): Promise<T | undefined> | undefined {
+    return this.inflight.get(asin);
+  }
+
+  /**
+   * Fetch several ASINs in one upstream call, registering each as in flight
+   * so that concurrent requests for the same ASINs wait on it instead.
+   * @param fetchMany - resolves to a Map asin -> value (missing = not found)
+   * @param ttlFor - TTL of a fetched value (e.g. shorter for placeholders)
+   */
+  fetch(asins: string[], fetchMany: (asins: string[]) => Promise<Map<string, T>>,
+        ttlFor: (value: T | undefined) => number = () => this.ttl): Map<string, Promise<T | undefined>> {
+    const batch = fetchMany(asins).then(found => {
+      for (const asin of asins) {
+        const value = found.get(asin);
+        if (value !== undefined) this.set(asin, value, ttlFor(value));
+      }
+      return found;
+    }).finally(() => {
+      for (const asin of asins) this.inflight.delete(asin);
+    });
+
+    const promises = new Map<string, Promise<T | undefined>>();
+    for (const asin of asins) {
+      const promise = batch.then(found => found.get(asin));
+      this.inflight.set(asin, promise);
+      promises.set(asin, promise);
+    }
+    return promises;
+  }
+}
+
+/**
+ * Hit/miss counters and a rolling window of request latencies
+ */
+export class CacheMetrics {
+  counters = {
+    requests: 0,
+    hits: 0,
+    stale: 0,
+    misses: 0,
+    coalesced: 0,
+    upstreamCalls: 0,
+    upstreamItems: 0,
+    refreshes: 0,
+    errors: 0,
+  };
+  private latencies: number[] = [];
+  private next = 0;
+  private window: number;
+
+  constructor(window = 1000) {
+    this.window = window;
+  }
+
+  recordLatency(ms: number): void {
+    if (this.latencies.length < this.window) {
+      this.latencies.push(ms);
+    } else {
+      this.latencies[this.next] = ms;
+      this.next = (this.next + 1) % this.window;
+    }
+  }
+
+  percentile(p: number): number | null {
+    if (this.latencies.length === 0) return null;
+    const sorted = [...this.latencies].sort((a, b) => a - b);
+    return sorted[Math.min(sorted.length - 1, Math.ceil(p / 100 * sorted.length) - 1)];
+  }
+
+  snapshot(extra: Record<string, unknown> = {}) {
+    const lookups = this.counters.hits + this.counters.stale + this.counters.misses;
+    return {
+      ...this.counters,
+      hitRate: lookups ? (this.counters.hits + this.counters.stale) / lookups : null,
+      latencyMs: {
+        samples: this.latencies.length,
+        p50: this.percentile(50),
+        p95: this.percentile(95),
+        p99: this.percentile(99),
+      },
+      ...extra,
+    };
+  }
+}
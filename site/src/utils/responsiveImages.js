@@ -0,0 +1,39 @@
+/**
+ * IMAGES RESPONSIVES - Métadonnées des variantes WebP/AVIF
+ * Construit par: python3 -m glowpicked.images (hash du contenu, images inchangées ignorées)
+ *
+ * Par URL d'origine (/images/serums.jpg): width, height, un srcset par format
+ * (avif, webp) et un placeholder LQIP en data URI. Une image absente des
+ * métadonnées est servie telle quelle.
+ */
+
+import metadata from '../data/responsive-images.json';
+
+// Préférés en premier (ordre des <source> et du preload)
+export const FORMATS = ['avif', 'webp'];
+
+/**
+ * Variantes d'une image, ou null si l'étape images n'a pas tourné pour elle
+ */
+export function getResponsiveImage(src) {
+  return metadata.images?.[src] || null;
+}
+
+/**
+ * [{ type, srcset }] dans l'ordre de préférence, formats encodés seulement
+ */
+export function imageSources(image) {
+  if (!image) return [];
+  return FORMATS
+    .filter(format => image.srcset?.[format])
+    .map(format => ({ type: `image/${format}`, srcset: image.srcset[format] }));
+}
+
+/**
+ * Attributs du <link rel="preload"> d'une image LCP (format préféré), ou null
+ */
+export function preloadAttributes(src, sizes) {
+  const [source] = imageSources(getResponsiveImage(src));
+  if (!source) return null;
+  return { type: source.type, imagesrcset: source.srcset, imagesizes: sizes };
+}
@@ -15,13 +15,38 @@
  * Usage:
  * const products = await getProductsByASINs(['B00TTD9BRC', 'B00NR1YQHM']);
  * // Returns: [{ asin, title, imageUrl, price, rating, url }]
+ * 
+ * getProductsByASINs() goes through a shared PaapiClient (one per credential):
+ * - SigV4 signing key derived once per day/region instead of 4 HMACs per call
+ * - keep-alive agent: batches reuse the same TLS connections
+ * - concurrent callers within `batchWindowMs` are merged into shared
+ *   GetItems batches (10 ASINs max), ASINs already in flight are not re-sent
+ * - throttling aware: 429/503 are retried with jittered backoff and slow the
+ *   request pace down; it recovers gradually after successful calls
+ * 
+ * Test against a mock endpoint: node --experimental-strip-types test-paapi-client.js
  */
 
 import crypto from 'crypto';
+import http from 'http';
+import https from 'https';
 
 const HOST = 'webservices.amazon.com';
 const REGION = process.env.AMAZON_REGION || 'us-east-1';
 const SERVICE = 'ProductAdvertisingAPI';
+const PATH = '/paapi5/getitems';
+const TARGET = 'com.amazon.paapi5.v1.ProductAdvertisingAPIv1.GetItems';
+const MAX_BATCH = 10;  // PA-API allows max 10 ASINs per request
+
+const RESOURCES = [
+  'Images.Primary.Large',
+  'Images.Primary.Medium',
+  'ItemInfo.Title',
+  'Offers.Listings.Price',
+  'Offers.Listings.Availability.Type',
+  'CustomerReviews.Count',
+  'CustomerReviews.StarRating',
+];
 
 interface PaapiProduct {
   asin: string;
@@ -36,6 +61,25 @@ interface PaapiProduct {
   available: boolean;
 }
 
+interface PaapiClientOptions {
+  accessKey: string;
+  secretKey: string;
+  tag?: string;
+  region?: string;
+  endpoint?: string;        // default https://webservices.amazon.com (mock: http://127.0.0.1:port)
+  batchWindowMs?: number;   // how long to wait for other callers before sending
+  rate?: number;            // requests/second allowed for this credential
+  maxRetries?: number;      // retries of a throttled batch
+  retryBaseMs?: number;
+  maxSockets?: number;
+  timeoutMs?: number;
+}
+
+interface Deferred {
+  resolve: (product: PaapiProduct | null) => void;
+  reject: (error: Error) => void;
+}
+
 // AWS Signature V4 signing
 function hmacSha256(key: Buffer | string, data: string): Buffer {
   return crypto.createHmac('sha256', key).update(data, 'utf8').digest();
@@ -52,155 +96,302 @@ function getSignatureKey(key: string, dateStamp: string, region: string, service
   return hmacSha256(kService, 'aws4_request');
 }
 
-function signRequest(payload: string, accessKey: string, secretKey: string): Record<string, string> {
-  const now = new Date();
-  const amzDate = now.toISOString().replace(/[:-]|\.\d{3}/g, '');
-  const dateStamp = amzDate.substring(0, 8);
-  
-  const canonicalUri = '/paapi5/getitems';
-  const canonicalQuerystring = '';
-  const contentType = 'application/json; charset=UTF-8';
-  const target = 'com.amazon.paapi5.v1.ProductAdvertisingAPIv1.GetItems';
-  
-  const headers: Record<string, string> = {
-    'content-encoding': 'amz-1.0',
-    'content-type': contentType,
-    'host': HOST,
-    'x-amz-date': amzDate,
-    'x-amz-target': target,
+function sleep(ms: number): Promise<void> {
+  return new Promise(resolve => setTimeout(resolve, ms));
+}
+
+function affiliateUrl(asin: string, tag: string): string {
+  return `https://www.amazon.com/dp/${asin}/ref=nosim?tag=${tag}`;
+}
+
+// Placeholder when PA-API is not configured or a batch failed
+function placeholder(asin: string, tag: string): PaapiProduct {
+  return {
+    asin, title: '', imageUrl: '', imageLargeUrl: '', price: '',
+    currency: 'USD', rating: null, totalReviews: null,
+    url: affiliateUrl(asin, tag),
+    available: false,
   };
-  
-  const signedHeaders = Object.keys(headers).sort().join(';');
-  const canonicalHeaders = Object.keys(headers).sort()
-    .map(k => `${k}:${headers[k]}\n`).join('');
-  
-  const payloadHash = sha256(payload);
-  const canonicalRequest = [
-    'POST', canonicalUri, canonicalQuerystring,
-    canonicalHeaders, signedHeaders, payloadHash
-  ].join('\n');
-  
-  const credentialScope = `${dateStamp}/${REGION}/${SERVICE}/aws4_request`;
-  const stringToSign = [
-    'AWS4-HMAC-SHA256', amzDate, credentialScope, sha256(canonicalRequest)
-  ].join('\n');
-  
-  const signingKey = getSignatureKey(secretKey, dateStamp, REGION, SERVICE);
-  const signature = hmacSha256(signingKey, stringToSign).toString('hex');
-  
-  const authorization = `AWS4-HMAC-SHA256 Credential=${accessKey}/${credentialScope}, SignedHeaders=${signedHeaders}, Signature=${signature}`;
-  
+}
+
+function toProduct(item: any, tag: string): PaapiProduct {
+  const listing = item.Offers?.Listings?.[0];
   return {
-    ...headers,
-    'Authorization': authorization,
+    asin: item.ASIN,
+    title: item.ItemInfo?.Title?.DisplayValue || '',
+    imageUrl: item.Images?.Primary?.Medium?.URL || '',
+    imageLargeUrl: item.Images?.Primary?.Large?.URL || '',
+    price: listing?.Price?.DisplayAmount || '',
+    currency: listing?.Price?.Currency || 'USD',
+    rating: item.CustomerReviews?.StarRating?.Value ?? null,
+    totalReviews: item.CustomerReviews?.Count ?? null,
+    url: affiliateUrl(item.ASIN, tag),
+    available: listing?.Availability?.Type === 'Now',
   };
 }
 
+class ThrottledError extends Error {
+  status: number;
+  constructor(status: number, message: string) {
+    super(message);
+    this.status = status;
+  }
+}
+
 /**
- * Fetch product data from Amazon PA-API 5.0
- * Batches in groups of 10 (API limit)
+ * PA-API GetItems client for one credential
  */
-export async function getProductsByASINs(asins: string[]): Promise<PaapiProduct[]> {
-  const accessKey = process.env.AMAZON_ACCESS_KEY;
-  const secretKey = process.env.AMAZON_SECRET_KEY;
-  const tag = process.env.AMAZON_ASSOCIATE_TAG || 'glowpicked0c-20';
-  
-  if (!accessKey || !secretKey) {
-    console.warn('[PA-API] Missing credentials. Set AMAZON_ACCESS_KEY and AMAZON_SECRET_KEY.');
-    return asins.map(asin => ({
-      asin,
-      title: '',
-      imageUrl: '',
-      imageLargeUrl: '',
-      price: '',
-      currency: 'USD',
-      rating: null,
-      totalReviews: null,
-      url: `https://www.amazon.com/dp/${asin}/ref=nosim?tag=${tag}`,
-      available: false,
-    }));
+export class PaapiClient {
+  readonly tag: string;
+  readonly region: string;
+  readonly stats = {
+    requests: 0,        // HTTP calls sent
+    items: 0,           // ASINs sent upstream
+    coalesced: 0,       // ASIN requests served by a batch already pending/in flight
+    throttled: 0,       // 429/503 responses
+    keyDerivations: 0,  // SigV4 signing keys derived
+  };
+
+  private accessKey: string;
+  private secretKey: string;
+  private endpoint: URL;
+  private batchWindowMs: number;
+  private minIntervalMs: number;
+  private intervalMs: number;
+  private maxRetries: number;
+  private retryBaseMs: number;
+  private timeoutMs: number;
+  private agent: http.Agent;
+  private signingKey: { scope: string; key: Buffer } | null = null;
+  private queued = new Map<string, Deferred[]>();
+  private inflight = new Map<string, Promise<PaapiProduct | null>>();
+  private timer: ReturnType<typeof setTimeout> | null = null;
+  private nextSlot = 0;
+
+  constructor(options: PaapiClientOptions) {
+    this.accessKey = options.accessKey;
+    this.secretKey = options.secretKey;
+    this.tag = options.tag || 'glowpicked0c-20';
+    this.region = options.region || REGION;
+    this.endpoint = new URL(options.endpoint || `https://${HOST}`);
+    this.batchWindowMs = options.batchWindowMs ?? 20;
+    this.minIntervalMs = 1000 / (options.rate ?? 1);
+    this.intervalMs = this.minIntervalMs;
+    this.maxRetries = options.maxRetries ?? 3;
+    this.retryBaseMs = options.retryBaseMs ?? 1000;
+    this.timeoutMs = options.timeoutMs ?? 10000;
+    const Agent = this.endpoint.protocol === 'http:' ? http.Agent : https.Agent;
+    this.agent = new Agent({ keepAlive: true, maxSockets: options.maxSockets ?? 4 });
   }
-  
-  const results: PaapiProduct[] = [];
-  
-  // PA-API allows max 10 ASINs per request
-  for (let i = 0; i < asins.length; i += 10) {
-    const batch = asins.slice(i, i + 10);
-    
+
+  /**
+   * Products for the given ASINs, in order; null when PA-API did not return one
+   */
+  getItems(asins: string[]): Promise<(PaapiProduct | null)[]> {
+    return Promise.all(asins.map(asin => this.getItem(asin)));
+  }
+
+  getItem(asin: string): Promise<PaapiProduct | null> {
+    const inflight = this.inflight.get(asin);
+    if (inflight) {
+      this.stats.coalesced++;
+      return inflight;
+    }
+    const promise = new Promise<PaapiProduct | null>((resolve, reject) => {
+      const waiting = this.queued.get(asin);
+      if (waiting) {
+        this.stats.coalesced++;
+        waiting.push({ resolve, reject });
+      } else {
+        this.queued.set(asin, [{ resolve, reject }]);
+      }
+    });
+    if (!this.timer) this.timer = setTimeout(() => this.flush(), this.batchWindowMs);
+    return promise;
+  }
+
+  /**
+   * Close pooled connections (tests, scripts)
+   */
+  close(): void {
+    this.agent.destroy();
+  }
+
+  private flush(): void {
+    this.timer = null;
+    const queued = this.queued;
+    this.queued = new Map();
+    const asins = [...queued.keys()];
+    for (let i = 0; i < asins.length; i += MAX_BATCH) {
+      const batch = asins.slice(i, i + MAX_BATCH);
+      const done = this.sendBatch(batch);
+      for (const asin of batch) {
+        const promise = done.then(found => found.get(asin) ?? null);
+        this.inflight.set(asin, promise);
+        promise.then(
+          product => queued.get(asin)!.forEach(d => d.resolve(product)),
+          error => queued.get(asin)!.forEach(d => d.reject(error)),
+        ).finally(() => this.inflight.delete(asin));
+      }
+    }
+  }
+
+  // Pace requests: one slot every intervalMs for this credential
+  private async waitForSlot(): Promise<void> {
+    const now = Date.now();
+    const slot = Math.max(now, this.nextSlot);
+    this.nextSlot = slot + this.intervalMs;
+    if (slot > now) await sleep(slot - now);
+  }
+
+  private async sendBatch(batch: string[]): Promise<Map<string, PaapiProduct>> {
+    const found = new Map<string, PaapiProduct>();
     const payload = JSON.stringify({
       ItemIds: batch,
-      Resources: [
-        'Images.Primary.Large',
-        'Images.Primary.Medium',
-        'ItemInfo.Title',
-        'Offers.Listings.Price',
-        'Offers.Listings.Availability.Type',
-        'CustomerReviews.Count',
-        'CustomerReviews.StarRating',
-      ],
-      PartnerTag: tag,
+      Resources: RESOURCES,
+      PartnerTag: this.tag,
       PartnerType: 'Associates',
       Marketplace: 'www.amazon.com',
     });
+
+    for (let attempt = 0; ; attempt++) {
+      await this.waitForSlot();
+      try {
+        this.stats.requests++;
+        this.stats.items += batch.length;
+        const { status, body } = await this.post(payload);
+
+        if (status === 429 || status === 503) {
+          throw new ThrottledError(status, body);
+        }
+        // Recover the configured pace gradually after a throttle
+        this.intervalMs = Math.max(this.minIntervalMs, this.intervalMs * 0.8);
+
+        if (status < 200 || status >= 300) {
+          console.error(`[PA-API] Error ${status}: ${body}`);
+          batch.forEach(asin => found.set(asin, placeholder(asin, this.tag)));
+          return found;
+        }
+        const data = JSON.parse(body);
+        for (const item of data.ItemsResult?.Items || []) {
+          found.set(item.ASIN, toProduct(item, this.tag));
+        }
+        return found;
+      } catch (err: any) {
+        if (err instanceof ThrottledError) {
+          this.stats.throttled++;
+          // Slow down every batch of this credential, not just this one
+          this.intervalMs = Math.min(this.intervalMs * 2, 30000);
+          if (attempt < this.maxRetries) {
+            await sleep(Math.random() * this.retryBaseMs * 2 ** attempt);
+            continue;
+          }
+          console.error(`[PA-API] Throttled ${attempt + 1} times, giving up on batch`);
+        } else {
+          console.error(`[PA-API] Fetch error:`, err);
+        }
+        batch.forEach(asin => found.set(asin, placeholder(asin, this.tag)));
+        return found;
+      }
+    }
+  }
+
+  // Derived signing key, cached for the day (it only depends on date/region/service)
+  private getSigningKey(dateStamp: string): Buffer {
+    const scope = `${dateStamp}/${this.region}/${SERVICE}`;
+    if (this.signingKey?.scope !== scope) {
+      this.signingKey = { scope, key: getSignatureKey(this.secretKey, dateStamp, this.region, SERVICE) };
+      this.stats.keyDerivations++;
+    }
+    return this.signingKey.key;
+  }
+
+  signRequest(payload: string, now: Date = new Date()): Record<string, string> {
+    const amzDate = now.toISOString().replace(/[:-]|\.\d{3}/g, '');
+    const dateStamp = amzDate.substring(0, 8);
+    
+    const headers: Record<string, string> = {
+      'content-encoding': 'amz-1.0',
+      'content-type': 'application/json; charset=UTF-8',
+      'host': this.endpoint.host,
+      'x-amz-date': amzDate,
+      'x-amz-target': TARGET,
+    };
+    
+    const signedHeaders = Object.keys(headers).sort().join(';');
+    const canonicalHeaders = Object.keys(headers).sort()
+      .map(k => `${k}:${headers[k]}\n`).join('');
     
-    const headers = signRequest(payload, accessKey, secretKey);
+    const canonicalRequest = [
+      'POST', PATH, '',
+      canonicalHeaders, signedHeaders, sha256(payload)
+    ].join('\n');
     
-    try {
-      const response = await fetch(`https://${HOST}/paapi5/getitems`, {
+    const credentialScope = `${dateStamp}/${this.region}/${SERVICE}/aws4_request`;
+    const stringToSign = [
+      'AWS4-HMAC-SHA256', amzDate, credentialScope, sha256(canonicalRequest)
+    ].join('\n');
+    
+    const signature = hmacSha256(this.getSigningKey(dateStamp), stringToSign).toString('hex');
+    
+    return {
+      ...headers,
+      'Authorization': `AWS4-HMAC-SHA256 Credential=${this.accessKey}/${credentialScope}, SignedHeaders=${signedHeaders}, Signature=${signature}`,
+    };
+  }
+
+  private post(payload: string): Promise<{ status: number; body: string }> {
+    const client = this.endpoint.protocol === 'http:' ? http : https;
+    const headers = this.signRequest(payload);
+    return new Promise((resolve, reject) => {
+      const req = client.request(new URL(PATH, this.endpoint), {
         method: 'POST',
-        headers,
-        body: payload,
+        agent: this.agent,
+        headers: { ...headers, 'content-length': String(Buffer.byteLength(payload)) },
+        timeout: this.timeoutMs,
+      }, res => {
+        const chunks: Buffer[] = [];
+        res.on('data', chunk => chunks.push(chunk));
+        res.on('end', () => resolve({ status: res.statusCode || 0, body: Buffer.concat(chunks).toString('utf8') }));
+        res.on('error', reject);
       });
-      
-      if (!response.ok) {
-        const errorText = await response.text();
-        console.error(`[PA-API] Error ${response.status}: ${errorText}`);
-        // Return placeholder for this batch
-        batch.forEach(asin => results.push({
-          asin, title: '', imageUrl: '', imageLargeUrl: '', price: '',
-          currency: 'USD', rating: null, totalReviews: null,
-          url: `https://www.amazon.com/dp/${asin}/ref=nosim?tag=${tag}`,
-          available: false,
-        }));
-        continue;
-      }
-      
-      const data = await response.json();
-      
-      if (data.ItemsResult?.Items) {
-        for (const item of data.ItemsResult.Items) {
-          const listing = item.Offers?.Listings?.[0];
-          results.push({
-            asin: item.ASIN,
-            title: item.ItemInfo?.Title?.DisplayValue || '',
-            imageUrl: item.Images?.Primary?.Medium?.URL || '',
-            imageLargeUrl: item.Images?.Primary?.Large?.URL || '',
-            price: listing?.Price?.DisplayAmount || '',
-            currency: listing?.Price?.Currency || 'USD',
-            rating: item.CustomerReviews?.StarRating?.Value ?? null,
-            totalReviews: item.CustomerReviews?.Count ?? null,
-            url: `https://www.amazon.com/dp/${item.ASIN}/ref=nosim?tag=${tag}`,
-            available: listing?.Availability?.Type === 'Now',
-          });
-        }
-      }
-      
-      // Respect rate limits (1 req/sec for new accounts)
-      if (i + 10 < asins.length) {
-        await new Promise(r => setTimeout(r, 1100));
-      }
-    } catch (err) {
-      console.error(`[PA-API] Fetch error:`, err);
-      batch.forEach(asin => results.push({
-        asin, title: '', imageUrl: '', imageLargeUrl: '', price: '',
-        currency: 'USD', rating: null, totalReviews: null,
-        url: `https://www.amazon.com/dp/${asin}/ref=nosim?tag=${tag}`,
-        available: false,
-      }));
-    }
+      req.on('timeout', () => req.destroy(new Error(`PA-API timeout after ${this.timeoutMs}ms`)));
+      req.on('error', reject);
+      req.end(payload);
+    });
+  }
+}
+
+// One client per credential, shared by every caller of this module (warm invocations too)
+let defaultClient: PaapiClient | null = null;
+let defaultClientKey = '';
+
+function getDefaultClient(accessKey: string, secretKey: string, tag: string): PaapiClient {
+  const key = sha256(`${accessKey}:${secretKey}:${tag}`);
+  if (!defaultClient || defaultClientKey !== key) {
+    defaultClient?.close();
+    defaultClient = new PaapiClient({ accessKey, secretKey, tag });
+    defaultClientKey = key;
+  }
+  return defaultClient;
+}
+
+/**
+ * Fetch product data from Amazon PA-API 5.0
+ * Concurrent calls are merged into shared batches of 10 (API limit)
+ */
+export async function getProductsByASINs(asins: string[]): Promise<PaapiProduct[]> {
+  const accessKey = process.env.AMAZON_ACCESS_KEY;
+  const secretKey = process.env.AMAZON_SECRET_KEY;
+  const tag = process.env.AMAZON_ASSOCIATE_TAG || 'glowpicked0c-20';
+  
+  if (!accessKey || !secretKey) {
+    console.warn('[PA-API] Missing credentials. Set AMAZON_ACCESS_KEY and AMAZON_SECRET_KEY.');
+    return asins.map(asin => placeholder(asin, tag));
   }
   
-  return results;
+  const products = await getDefaultClient(accessKey, secretKey, tag).getItems(asins);
+  return products.filter((p): p is PaapiProduct => p !== null);
 }
 
 /**
@@ -211,4 +402,4 @@ export async function getProduct(asin: string): Promise<PaapiProduct> {
   return product;
 }
 
-export type { PaapiProduct };
+export type { PaapiClientOptions, PaapiProduct };
@@ -0,0 +1,148 @@
+/**
+ * STORE COMPACT - Lecture du sidecar binaire real-review-counts.bin
+ * Construit par: python3 -m glowpicked.realdata data/real-review-counts.json
+ * Format partagé avec glowpicked/realdata.py (audit + générateur)
+ *
+ * Enregistrements triés par ASIN, taille fixe: le fichier est lu en entier
+ * dans un Buffer (pas de mmap en Node, 18 octets par ASIN), puis recherche
+ * binaire O(log n) dans ce Buffer, sans JSON.parse ni objet par produit.
+ */
+
+import fs from 'fs';
+
+const MAGIC = 'GPRD';
+const VERSION = 1;
+const HEADER_SIZE = 16;
+const RECORD_SIZE = 18;
+const ASIN_SIZE = 10;
+
+const FLAG_NULL_ENTRY = 0x01;
+const FLAG_NULL_RATING = 0x02;
+const FLAG_NULL_REVIEWS = 0x04;
+const FLAG_INT_RATING = 0x08;
+
+/**
+ * Chemin du sidecar pour un fichier JSON (real-review-counts.json -> .bin)
+ * @param {string} jsonPath - Chemin vers real-review-counts.json
+ * @returns {string} Chemin du sidecar binaire
+ */
+export function sidecarPath(jsonPath) {
+  return jsonPath.replace(/\.json$/, '') + '.bin';
+}
+
+/**
+ * Vue lecture seule ASIN -> {rating, reviews} sur le sidecar
+ */
+export class RealDataStore {
+  /**
+   * @param {Buffer} buffer - Contenu du sidecar
+   */
+  constructor(buffer) {
+    if (buffer.length < HEADER_SIZE ||
+        buffer.toString('latin1', 0, 4) !== MAGIC ||
+        buffer.readUInt16LE(4) !== VERSION ||
+        buffer.readUInt16LE(6) !== RECORD_SIZE) {
+      throw new Error('Sidecar invalide ou d\'une autre version');
+    }
+    this.buffer = buffer;
+    this.size = buffer.readUInt32LE(8);
+  }
+
+  _offset(i) {
+    return HEADER_SIZE + i * RECORD_SIZE;
+  }
+
+  _find(asin) {
+    if (typeof asin !== 'string' || asin.length > ASIN_SIZE) return -1;
+    const key = Buffer.alloc(ASIN_SIZE);
+    key.write(asin, 'latin1');
+
+    let lo = 0;
+    let hi = this.size;
+    while (lo < hi) {
+      const mid = (lo + hi) >>> 1;
+      const offset = this._offset(mid);
+      // buffer.compare(target, ...) > 0 when the record sorts after the key
+      if (this.buffer.compare(key, 0, ASIN_SIZE, offset, offset + ASIN_SIZE) < 0) {
+        lo = mid + 1;
+      } else {
+        hi = mid;
+      }
+    }
+    if (lo < this.size) {
+      const offset = this._offset(lo);
+      if (this.buffer.compare(key, 0, ASIN_SIZE, offset, offset + ASIN_SIZE) === 0) return lo;
+    }
+    return -1;
+  }
+
+  _asin(i) {
+    const offset = this._offset(i);
+    return this.buffer.toString('latin1', offset, offset + ASIN_SIZE).replace(/\0+$/, '');
+  }
+
+  _value(i) {
+    const offset = this._offset(i) + ASIN_SIZE;
+    const flags = this.buffer.readUInt8(offset);
+    if (flags & FLAG_NULL_ENTRY) return null;
+
+    const rawRating = this.buffer.readUInt16LE(offset + 2);
+    const reviews = this.buffer.readUInt32LE(offset + 4);
+    let rating = null;
+    if (!(flags & FLAG_NULL_RATING)) {
+      rating = flags & FLAG_INT_RATING ? Math.floor(rawRating / 100) : rawRating / 100;
+    }
+    return {
+      reviews: flags & FLAG_NULL_REVIEWS ? null : reviews,
+      rating
+    };
+  }
+
+  /**
+   * @param {string} asin
+   * @returns {Object|null|undefined} {rating, reviews}, null si l'entrée est null, undefined si absent
+   */
+  get(asin) {
+    const i = this._find(asin);
+    return i < 0 ? undefined : this._value(i);
+  }
+
+  has(asin) {
+    return this._find(asin) >= 0;
+  }
+
+  *keys() {
+    for (let i = 0; i < this.size; i++) yield this._asin(i);
+  }
+
+  *values() {
+    for (let i = 0; i < this.size; i++) yield this._value(i);
+  }
+
+  *entries() {
+    for (let i = 0; i < this.size; i++) yield [this._asin(i), this._value(i)];
+  }
+}
+
+/**
+ * Ouvre le sidecar s'il existe et est au moins aussi récent que le JSON
+ * @param {string} jsonPath - Chemin vers real-review-counts.json
+ * @returns {RealDataStore|null} Store, ou null si le JSON doit être utilisé
+ */
+export function openRealDataStore(jsonPath) {
+  const binPath = sidecarPath(jsonPath);
+  try {
+    const binStat = fs.statSync(binPath);
+    const jsonStat = fs.existsSync(jsonPath) ? fs.statSync(jsonPath) : null;
+    if (jsonStat && binStat.mtimeMs < jsonStat.mtimeMs) return null;
+    return new RealDataStore(fs.readFileSync(binPath));
+  } catch (error) {
+    return null;
+  }
+}
+
+export default {
+  sidecarPath,
+  openRealDataStore,
+  RealDataStore
+};
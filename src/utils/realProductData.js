@@ -6,6 +6,8 @@
 
 import fs from 'fs';
 import path from 'path';
+import { performance } from 'perf_hooks';
+import { openRealDataStore, sidecarPath, RealDataStore } from './realDataStore.js';
 
 // Chemin vers nos vraies données
 const REAL_DATA_PATH = path.join(process.cwd(), 'data', 'real-review-counts.json');
@@ -33,6 +35,70 @@ export function loadRealProductData() {
   }
 }
 
+// Cache module: une seule lecture + un seul calcul de stats par build,
+// invalidé dès que le JSON ou le sidecar change (mtime/taille)
+let realDataCache = null;
+const buildMetrics = { calls: 0, loads: 0, loadMs: 0, statsMs: 0 };
+
+function dataVersionKey() {
+  return [REAL_DATA_PATH, sidecarPath(REAL_DATA_PATH)].map(file => {
+    try {
+      const stat = fs.statSync(file);
+      return `${stat.mtimeMs}:${stat.size}`;
+    } catch (error) {
+      return '-';
+    }
+  }).join('|');
+}
+
+function getRealDataCache() {
+  buildMetrics.calls++;
+
+  const key = dataVersionKey();
+  if (realDataCache && realDataCache.key === key) return realDataCache;
+
+  const start = performance.now();
+  const store = openRealDataStore(REAL_DATA_PATH);
+  if (store) {
+    console.log(`✅ Sidecar données réelles: ${store.size} produits`);
+  }
+  realDataCache = { key, data: store || loadRealProductData(), stats: null };
+  buildMetrics.loadMs += performance.now() - start;
+  buildMetrics.loads++;
+  return realDataCache;
+}
+
+/**
+ * Source de vraies données pour le build: sidecar binaire si à jour, sinon JSON.
+ * Mémoïsée au niveau du module: relue seulement si le fichier a changé.
+ * @returns {RealDataStore|Object} Store compact ou données réelles par ASIN
+ */
+export function loadRealDataSource() {
+  return getRealDataCache().data;
+}
+
+/**
+ * Compteurs du cache pour le build en cours
+ * @returns {Object} {calls, loads, loadMs, statsMs}
+ */
+export function getRealDataMetrics() {
+  return { ...buildMetrics };
+}
+
+/**
+ * Lit l'entrée d'un ASIN, que la source soit un store ou un objet JSON
+ * @param {RealDataStore|Object} realData - Source de vraies données
+ * @param {string} asin - ASIN recherché
+ * @returns {Object|null|undefined} {rating, reviews}
+ */
+export function getRealEntry(realData, asin) {
+  return realData instanceof RealDataStore ? realData.get(asin) : realData[asin];
+}
+
+function realValues(realData) {
+  return realData instanceof RealDataStore ? realData.values() : Object.values(realData);
+}
+
 /**
  * Arrondit conservateur à la baisse pour éviter impression de gonflement
  * @param {number} count - Nombre de reviews
@@ -65,7 +131,7 @@ export function enrichProductWithRealData(product, realData, fallback = {}) {
   const { asin, name } = product;
   
   // Récupère vraies données pour cet ASIN
-  const real = realData[asin];
+  const real = getRealEntry(realData, asin);
   
   if (!real || real === null) {
     console.warn(`⚠️  Pas de données réelles pour ${asin} (${name})`);
@@ -108,7 +174,7 @@ export function enrichProductWithRealData(product, realData, fallback = {}) {
  * @returns {Array} Produits enrichis avec vraies données
  */
 export function processProductsList(products, fallbacks = {}) {
-  const realData = loadRealProductData();
+  const realData = loadRealDataSource();
   
   return products.map(product => {
     const fallback = fallbacks[product.asin] || {};
@@ -118,24 +184,33 @@ export function processProductsList(products, fallbacks = {}) {
 
 /**
  * Génère les stats globales pour affichage (ex: hero section)
+ * Calculées une fois par version des données, pas à chaque page
  * @returns {Object} Stats globales {totalReviews, totalProducts, avgRating, verifiedCount}
  */
 export function generateGlobalStats() {
-  const realData = loadRealProductData();
-  
+  const cache = getRealDataCache();
+  if (!cache.stats) {
+    const start = performance.now();
+    cache.stats = computeGlobalStats(cache.data);
+    buildMetrics.statsMs += performance.now() - start;
+  }
+  return { ...cache.stats };
+}
+
+function computeGlobalStats(realData) {
   let totalReviews = 0;
   let totalRating = 0;
   let validProducts = 0;
   let verifiedCount = 0;
   
-  Object.values(realData).forEach(item => {
+  for (const item of realValues(realData)) {
     if (item && item.reviews !== null && item.rating !== null) {
       totalReviews += item.reviews;
       totalRating += item.rating;
       validProducts++;
       if (item.reviews > 0) verifiedCount++;
     }
-  });
+  }
   
   return {
     totalReviews: totalReviews,
@@ -217,6 +292,9 @@ export function generateProductSchema(products, listName) {
 // Export par défaut pour facilité d'usage
 export default {
   loadRealProductData,
+  loadRealDataSource,
+  getRealDataMetrics,
+  getRealEntry,
   enrichProductWithRealData,
   processProductsList,
   generateGlobalStats,
@@ -0,0 +1,131 @@
+#!/usr/bin/env node
+/**
+ * 🧪 TEST CLIENT PA-API - Coalescence, clé de signature, throttling
+ *
+ * Faux endpoint GetItems sur 127.0.0.1: un 429 au premier appel, puis les
+ * produits demandés (sauf un ASIN inconnu). Vérifie que des appels simultanés
+ * qui se chevauchent partagent les mêmes lots de 10, que la clé SigV4 n'est
+ * dérivée qu'une fois et que les connexions keep-alive sont réutilisées.
+ *
+ * Usage: npm run test:paapi (Node >= 22.6: importe directement le .ts,
+ *        soit node --experimental-strip-types test-paapi-client.js)
+ */
+
+import assert from 'assert';
+import http from 'http';
+import { PaapiClient } from './src/utils/amazon-paapi.ts';
+
+const UNKNOWN_ASIN = 'B0UNKNOWN0';
+const ASINS = Array.from({ length: 25 }, (_, i) => `B0PAAPI${String(i).padStart(3, '0')}`);
+
+function startMock() {
+  const stats = { requests: 0, sockets: 0, batches: [] };
+  const server = http.createServer((req, res) => {
+    const chunks = [];
+    req.on('data', chunk => chunks.push(chunk));
+    req.on('end', () => {
+      stats.requests++;
+      assert.strictEqual(req.url, '/paapi5/getitems');
+      assert.match(req.headers.authorization, /^AWS4-HMAC-SHA256 Credential=AKTEST\//);
+
+      if (stats.requests === 1) {
+        res.writeHead(429).end('{"Errors":[{"Code":"TooManyRequests"}]}');
+        return;
+      }
+      const { ItemIds } = JSON.parse(Buffer.concat(chunks).toString('utf8'));
+      stats.batches.push(ItemIds);
+      const items = ItemIds.filter(asin => asin !== UNKNOWN_ASIN).map(asin => ({
+        ASIN: asin,
+        ItemInfo: { Title: { DisplayValue: `Produit ${asin}` } },
+        Offers: { Listings: [{ Price: { DisplayAmount: '$19.99', Currency: 'USD' }, Availability: { Type: 'Now' } }] },
+        CustomerReviews: { Count: 1234, StarRating: { Value: 4.5 } },
+      }));
+      setTimeout(() => {
+        res.writeHead(200, { 'Content-Type': 'application/json' });
+        res.end(JSON.stringify({ ItemsResult: { Items: items } }));
+      }, 60);
+    });
+  });
+  server.on('connection', () => stats.sockets++);
+  return new Promise(resolve => server.listen(0, '127.0.0.1', () => resolve({ server, stats })));
+}
+
+console.log('🧪 TEST CLIENT PA-API - ENDPOINT MOCK');
+console.log('======================================');
+
+const { server, stats } = await startMock();
+const client = new PaapiClient({
+  accessKey: 'AKTEST',
+  secretKey: 'secret',
+  endpoint: `http://127.0.0.1:${server.address().port}`,
+  batchWindowMs: 20,
+  rate: 50,
+  retryBaseMs: 10,
+  maxSockets: 2,
+});
+
+const errors = console.error;
+console.error = () => {};
+
+try {
+  // 1. Pages rendues en parallèle qui demandent des ASINs qui se recoupent
+  console.log('\n1️⃣ APPELS SIMULTANÉS QUI SE RECOUPENT:');
+  const callers = [
+    ASINS.slice(0, 10),
+    ASINS.slice(5, 15),
+    ASINS.slice(10, 25).concat(UNKNOWN_ASIN),
+    ASINS.slice(0, 3),
+  ];
+  const results = await Promise.all(callers.map(asins => client.getItems(asins)));
+
+  const unique = new Set(callers.flat());
+  const expectedBatches = Math.ceil(unique.size / 10);
+  assert.strictEqual(stats.batches.length, expectedBatches, `${stats.batches.length} lots pour ${unique.size} ASINs`);
+  assert.strictEqual(stats.batches.flat().length, unique.size, 'chaque ASIN envoyé une seule fois');
+  assert.ok(stats.batches.every(batch => batch.length <= 10));
+  assert.strictEqual(client.stats.coalesced, callers.flat().length - unique.size);
+  console.log(`✅ ${callers.flat().length} demandes → ${unique.size} ASINs uniques → ${expectedBatches} lots GetItems`);
+
+  results.forEach((products, i) => {
+    assert.strictEqual(products.length, callers[i].length);
+    products.forEach((product, j) => {
+      const asin = callers[i][j];
+      if (asin === UNKNOWN_ASIN) {
+        assert.strictEqual(product, null);
+      } else {
+        assert.strictEqual(product.asin, asin);
+        assert.strictEqual(product.rating, 4.5);
+        assert.ok(product.url.endsWith('tag=glowpicked0c-20'));
+      }
+    });
+  });
+  console.log('✅ Chaque appelant reçoit ses produits dans son ordre (null pour l\'ASIN inconnu)');
+
+  // 2. Throttling
+  console.log('\n2️⃣ THROTTLING (429):');
+  assert.strictEqual(client.stats.throttled, 1);
+  assert.strictEqual(stats.requests, expectedBatches + 1, 'le lot throttlé est renvoyé une fois');
+  console.log(`✅ 1 réponse 429 retentée, ${stats.requests} requêtes HTTP au total`);
+
+  // 3. Requête en vol: pas de second envoi
+  console.log('\n3️⃣ ASIN DÉJÀ EN VOL:');
+  const before = stats.requests;
+  const first = client.getItem('B0INFLIGHT');
+  await new Promise(resolve => setTimeout(resolve, 25));  // lot parti, réponse pas encore reçue
+  const [a, b] = await Promise.all([first, client.getItem('B0INFLIGHT')]);
+  assert.strictEqual(stats.requests, before + 1);
+  assert.strictEqual(a, b);
+  console.log('✅ Le second appel attend la requête en cours');
+
+  // 4. Clé de signature et connexions
+  console.log('\n4️⃣ CLÉ SIGV4 ET KEEP-ALIVE:');
+  assert.strictEqual(client.stats.keyDerivations, 1, 'clé dérivée une seule fois par jour/région');
+  assert.ok(stats.sockets <= 2, `${stats.sockets} connexions pour ${stats.requests} requêtes`);
+  console.log(`✅ 1 dérivation de clé pour ${stats.requests} signatures, ${stats.sockets} connexions TCP`);
+
+  console.log('\n🎉 TOUS LES TESTS PASSENT');
+} finally {
+  console.error = errors;
+  client.close();
+  server.close();
+}
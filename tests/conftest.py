@@ -0,0 +1,23 @@
+"""
+Fixtures partagées - import de glowpicked/ et des scripts à tirets de la racine
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from glowpicked.scripts import load_script  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def audit():
+    return load_script('audit', 'audit-all-pages.py')
+
+
+@pytest.fixture(scope='session')
+def generator():
+    return load_script('generator', 'generate-all-dynamic-pages.py')
@@ -0,0 +1,131 @@
+"""
+Cache incrémental de l'audit - invalidation des pages et des vérifications
+"""
+
+import io
+import json
+import os
+import pickle
+
+import pytest
+
+from glowpicked import audit_cache
+from glowpicked.audit_cache import AuditCache
+
+PAGE = '---\nconst products = [{name: "A", asin: "B000000001", rating: 4.5, reviewCount: 100}];\n---\n'
+PRODUCTS = [{'name': 'A', 'asin': 'B000000001', 'rating': 4.5, 'reviewCount': 100}]
+
+
+def _warm_cache(tmp_path):
+    page = tmp_path / 'serums.astro'
+    page.write_text(PAGE)
+    cache_path = tmp_path / 'cache.pickle'
+    cache = AuditCache(cache_path)
+    assert cache.cached_products(page) is None
+    cache.store_products(page, PRODUCTS)
+    cache.save()
+    return page, cache_path
+
+
+def _set_mtime(path, mtime_ns):
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_unchanged_page_is_a_stat_hit(tmp_path):
+    page, cache_path = _warm_cache(tmp_path)
+    cache = AuditCache(cache_path)
+    assert cache.cached_products(page) == PRODUCTS
+    assert cache.stats['hits'] == 1
+
+
+def test_touched_page_with_same_content_is_rehashed(tmp_path):
+    page, cache_path = _warm_cache(tmp_path)
+    _set_mtime(page, os.stat(page).st_mtime_ns + 5_000_000_000)
+    cache = AuditCache(cache_path)
+    assert cache.cached_products(page) == PRODUCTS
+    assert cache.stats['rehashed'] == 1
+
+
+def test_content_change_same_size_and_mtime_is_reparsed(tmp_path):
+    page, cache_path = _warm_cache(tmp_path)
+    st = os.stat(page)
+    page.write_text(PAGE.replace('4.5', '4.9'))  # same size
+    _set_mtime(page, st.st_mtime_ns + 1)
+    cache = AuditCache(cache_path)
+    assert cache.cached_products(page) is None
+
+
+def test_size_change_is_reparsed(tmp_path):
+    page, cache_path = _warm_cache(tmp_path)
+    st = os.stat(page)
+    page.write_text(PAGE + '\n')
+    _set_mtime(page, st.st_mtime_ns)  # same mtime, different size
+    assert AuditCache(cache_path).cached_products(page) is None
+
+
+def test_sync_real_data_drops_only_changed_asins(tmp_path):
+    cache = AuditCache(tmp_path / 'cache.pickle')
+    calls = []
+
+    def check(product, real_data):
+        calls.append(product['asin'])
+        return real_data[product['asin']]['rating'], None, False, False
+
+    a = {'asin': 'B000000001', 'rating': 4.5, 'reviewCount': 100}
+    b = {'asin': 'B000000002', 'rating': 4.0, 'reviewCount': 200}
+    real = {'B000000001': {'rating': 4.5, 'reviews': 100}, 'B000000002': {'rating': 4.0, 'reviews': 200}}
+    assert cache.sync_real_data(real) == {'B000000001', 'B000000002'}
+    cache.check(a, real, check)
+    cache.check(b, real, check)
+    cache.save()
+
+    cache = AuditCache(tmp_path / 'cache.pickle')
+    real['B000000002'] = {'rating': 3.5, 'reviews': 200}
+    assert cache.sync_real_data(real) == {'B000000002'}
+    assert cache.check(a, real, check)[0] == 4.5
+    assert cache.check(b, real, check)[0] == 3.5
+    assert calls == ['B000000001', 'B000000002', 'B000000002']
+
+
+def test_cache_of_another_extractor_version_is_discarded(tmp_path, monkeypatch):
+    page, cache_path = _warm_cache(tmp_path)
+    with open(cache_path, 'rb') as f:
+        assert pickle.load(f)['extractor'] == audit_cache.EXTRACTOR_VERSION
+    monkeypatch.setattr(audit_cache, 'EXTRACTOR_VERSION', audit_cache.EXTRACTOR_VERSION + 1)
+    cache = AuditCache(cache_path)
+    assert cache.pages == {}
+    assert cache.cached_products(page) is None
+
+
+@pytest.mark.parametrize('payload', [
+    b'',
+    b'not a pickle',
+    pickle.dumps({'version': audit_cache.CACHE_VERSION})[:-5],   # truncated
+    b'cglowpicked_removed_module\nThing\n.',                    # ImportError
+    b'cglowpicked.audit_cache\nRemovedClass\n.',                 # AttributeError
+    pickle.dumps({'version': audit_cache.CACHE_VERSION, 'extractor': audit_cache.EXTRACTOR_VERSION}),
+])
+def test_corrupt_or_stale_cache_starts_empty(tmp_path, payload):
+    page = tmp_path / 'serums.astro'
+    page.write_text(PAGE)
+    cache_path = tmp_path / 'cache.pickle'
+    cache_path.write_bytes(payload)
+    cache = AuditCache(cache_path)
+    assert (cache.pages, cache.real, cache.checks) == ({}, {}, {})
+    assert cache.cached_products(page) is None
+
+
+def test_unreadable_page_does_not_stop_the_cached_audit(tmp_path, audit):
+    reviews = tmp_path / 'reviews'
+    reviews.mkdir()
+    (reviews / 'serums.astro').write_text(PAGE)
+    (reviews / 'broken.astro').mkdir()  # stat() works, open() fails
+    real_path = tmp_path / 'real-review-counts.json'
+    real_path.write_text(json.dumps({'B000000001': {'rating': 4.5, 'reviews': 100}}))
+    cache_path = tmp_path / 'cache.pickle'
+
+    for _ in range(2):  # cold, then warm
+        summary = audit.audit_all_pages(reviews, real_path, cache_path=cache_path, output_format='jsonl',
+                                        out=io.StringIO())
+        assert (summary['pages'], summary['products'], summary['errors']) == (2, 1, 0)
+    assert set(AuditCache(cache_path).pages) == {str(reviews / 'serums.astro')}
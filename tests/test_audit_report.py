@@ -0,0 +1,69 @@
+"""
+Sorties de l'audit - lignes issue et summary du CSV (audit --built)
+"""
+
+import csv
+import io
+import json
+
+from glowpicked.audit_report import CSV_FIELDS, JsonlReporter
+
+ITEM_LIST = {
+    '@context': 'https://schema.org',
+    '@type': 'ItemList',
+    'numberOfItems': 1,
+    'itemListElement': [{
+        '@type': 'ListItem',
+        'position': 1,
+        'item': {
+            '@type': 'Product',
+            'name': 'Serum A',
+            'sku': 'B000000001',
+            'aggregateRating': {'@type': 'AggregateRating', 'ratingValue': 4.5, 'reviewCount': 1000},
+        },
+    }],
+}
+PAGE = (
+    '<html><head><script type="application/ld+json">' + json.dumps(ITEM_LIST) + '</script></head><body>'
+    '<div class="product-card" data-asin="B000000001"></div>'
+    '<div class="product-card" data-asin="B000000009"></div>'
+    '</body></html>'
+)
+
+
+def _built_dist(tmp_path):
+    page_dir = tmp_path / 'dist' / 'reviews' / 'serums'
+    page_dir.mkdir(parents=True)
+    (page_dir / 'index.html').write_text(PAGE)
+    real_path = tmp_path / 'real-review-counts.json'
+    real_path.write_text(json.dumps({'B000000001': {'rating': 4.5, 'reviews': 1000}}))
+    return tmp_path / 'dist', real_path
+
+
+def test_built_csv_issue_and_summary_rows_round_trip(tmp_path, audit):
+    dist, real_path = _built_dist(tmp_path)
+    out = io.StringIO()
+    summary = audit.audit_built_pages(dist, real_path, output_format='csv', out=out)
+    rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+    assert list(rows[0].keys()) == CSV_FIELDS
+
+    issues = [row for row in rows if row['type'] == 'issue']
+    assert len(issues) == summary['issues'] == 1
+    assert issues[0]['kind'] == 'card_not_in_schema'
+    assert issues[0]['asin'] == 'B000000009'
+    assert issues[0]['name'] == '' and issues[0]['status'] == ''
+
+    product, = [row for row in rows if row['type'] == 'product']
+    assert (product['asin'], product['status'], product['kind']) == ('B000000001', 'ok', '')
+
+    summary_row, = [row for row in rows if row['type'] == 'summary']
+    assert (summary_row['pages'], summary_row['products'], summary_row['errors'], summary_row['issues']) == (
+        '1', '1', '0', '1')
+
+
+def test_jsonl_issue_record_uses_kind_and_detail():
+    out = io.StringIO()
+    JsonlReporter(out).issue({'file': 'serums/index.html', 'asin': None, 'kind': 'no_item_list', 'detail': ''})
+    assert json.loads(out.getvalue()) == {'type': 'issue', 'file': 'serums/index.html', 'asin': None,
+                                          'kind': 'no_item_list', 'detail': ''}
+
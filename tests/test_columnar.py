@@ -0,0 +1,84 @@
+"""
+Audit en colonnes - mêmes résultats que check_product() produit par produit
+"""
+
+import random
+from array import array
+from itertools import repeat
+
+import pytest
+
+from glowpicked import columnar
+from glowpicked.columnar import ProductColumns, RealColumns
+
+REAL = {
+    'B000000001': {'rating': 4.5, 'reviews': 20000},
+    'B000000002': {'rating': 4, 'reviews': 500},
+    'B000000003': {'rating': None, 'reviews': 1000},
+    'B000000004': {'rating': 4.2},
+    'B000000005': None,
+    'B000000006': {'rating': 'n/a', 'reviews': '12k'},
+}
+PRODUCTS = [
+    {'asin': 'B000000001', 'rating': 4.55, 'reviewCount': 22000},   # both exactly on the tolerance
+    {'asin': 'B000000001', 'rating': 4.6, 'reviewCount': 22001},    # both just over
+    {'asin': 'B000000002', 'rating': 4.0, 'reviewCount': 1500},     # 1000-review floor
+    {'asin': 'B000000002', 'rating': 3.9, 'reviewCount': 1501},
+    {'asin': 'B000000003', 'rating': 4.1, 'reviewCount': 1000},     # null rating
+    {'asin': 'B000000004', 'rating': 4.2, 'reviewCount': 10},       # reviews key missing
+    {'asin': 'B000000005', 'rating': 4.0, 'reviewCount': 10},       # null entry
+    {'asin': 'B000000006', 'rating': 4.0, 'reviewCount': 10},       # non-numeric values
+    {'asin': 'B999999999', 'rating': 4.0, 'reviewCount': 10},       # unknown ASIN
+]
+
+
+def _random_case(seed=7, asins=300, products=2000):
+    rng = random.Random(seed)
+    real = {f'B{i:09d}': {'rating': round(rng.uniform(3, 5), 1), 'reviews': rng.randrange(0, 100_000)}
+            for i in range(asins)}
+    items = []
+    for _ in range(products):
+        asin = f'B{rng.randrange(asins + 20):09d}'
+        base = real.get(asin, {'rating': 4.0, 'reviews': 5000})
+        items.append({'asin': asin, 'rating': round(base['rating'] + rng.choice([0, 0.05, -0.1, 0.3]), 2),
+                      'reviewCount': int(base['reviews'] * rng.choice([1, 0.9, 1.1, 1.5])) + rng.choice([0, 999, 1001])})
+    return real, items
+
+
+CASES = [(REAL, PRODUCTS), _random_case()]
+
+
+def _evaluate(evaluate_fn, real_data, products):
+    columns = ProductColumns()
+    columns.extend(products)
+    real = RealColumns(real_data)
+    idx = array('q', map(real.index.get, columns.asins, repeat(-1)))
+    return evaluate_fn(real, idx, columns.rating, columns.reviews)
+
+
+def _expected(audit, real_data, products):
+    return [audit.check_product(product, real_data) for product in products]
+
+
+@pytest.mark.parametrize('real_data,products', CASES)
+def test_array_path_matches_check_product(audit, real_data, products):
+    result = _evaluate(columnar._evaluate_array, real_data, products)
+    expected = _expected(audit, real_data, products)
+    assert list(result.rows()) == expected
+    assert result.error_count() == sum(1 for _, _, r, n in expected if r or n)
+
+
+@pytest.mark.parametrize('real_data,products', CASES)
+def test_numpy_path_matches_check_product(audit, real_data, products):
+    pytest.importorskip('numpy')
+    result = _evaluate(columnar._evaluate_numpy, real_data, products)
+    expected = _expected(audit, real_data, products)
+    assert list(result.rows()) == expected
+    assert result.error_count() == sum(1 for _, _, r, n in expected if r or n)
+
+
+def test_evaluate_with_empty_real_data(audit):
+    columns = ProductColumns()
+    columns.extend(PRODUCTS[:2])
+    rows = list(columnar.evaluate(columns, RealColumns({})).rows())
+    assert rows == _expected(audit, {}, PRODUCTS[:2])
@@ -0,0 +1,103 @@
+"""
+Extracteur produits - pages JS, JSON et générées (produits de base + fallbacks)
+"""
+
+from glowpicked.extractor import extract_products
+
+JS_PAGE = '''---
+import Layout from '../../layouts/Layout.astro';
+
+// Top picks
+const products = {
+  budget: [
+    {
+      name: "CeraVe Daily [AM] Lotion",
+      asin: 'B00365DABC',
+      rating: 4.6,
+      reviewCount: 98000,
+      pros: ["Works on {dry} skin", 'Says "no" to fragrance'],
+      badge: "bestseller",
+      con: "Small tube",
+    },
+  ],
+  luxury: [
+    { name: "La Mer Cream", asin: "B000LUX001", rating: 4.2, reviewCount: 1200, pros: [], con: "Price" }
+  ]
+};
+const asins = products.budget.map(p => ({ asin: p.asin }));
+---
+<Layout title="Moisturizers" />
+'''
+
+JSON_PAGE = '''---
+const products = {
+  "budget": [
+    {"name": "The Ordinary Niacinamide", "asin": "B01MDTVZTZ", "rating": 4.4, "reviewCount": 85000,
+     "pros": ["Cheap", "Works"], "con": "Pills under makeup"}
+  ],
+  "luxury": []
+};
+---
+'''
+
+
+def test_js_literal_page():
+    products = extract_products(JS_PAGE)
+    assert [p['asin'] for p in products] == ['B00365DABC', 'B000LUX001']
+    first = products[0]
+    assert first['name'] == 'CeraVe Daily [AM] Lotion'
+    assert first['rating'] == 4.6 and first['reviewCount'] == 98000
+    assert first['pros'] == ['Works on {dry} skin', 'Says "no" to fragrance']
+    assert first['con'] == 'Small tube'
+
+
+def test_json_page():
+    products = extract_products(JSON_PAGE)
+    assert products == [{'name': 'The Ordinary Niacinamide', 'asin': 'B01MDTVZTZ', 'rating': 4.4,
+                         'reviewCount': 85000, 'pros': ['Cheap', 'Works'], 'con': 'Pills under makeup'}]
+
+
+def test_generated_page_merges_fallbacks(generator):
+    budget = [{'name': 'Budget A', 'asin': 'B0000000A1', 'rating': 4.5, 'reviewCount': 1500,
+               'pros': ['x'], 'con': 'y'}]
+    luxury = [{'name': 'Luxury B', 'asin': 'B0000000B2', 'pros': ['x'], 'con': 'y'}]  # no fallback
+    page = generator.generate_dynamic_page_template('serums', 'Best Serums', 'Desc.', budget, luxury)
+    products = extract_products(page)
+    assert [(p['asin'], p.get('rating'), p.get('reviewCount')) for p in products] == [
+        ('B0000000A1', 4.5, 1500),
+        ('B0000000B2', None, None),
+    ]
+
+
+def test_inline_rating_wins_over_fallback():
+    page = '''---
+const fallbacks = {"B000000001": {"rating": 3.0, "reviewCount": 1}};
+const products = [{name: "A", asin: "B000000001", rating: 4.5}];
+---
+'''
+    assert extract_products(page) == [{'name': 'A', 'asin': 'B000000001', 'rating': 4.5, 'reviewCount': 1}]
+
+
+def test_duplicate_declaration_names_keep_every_product():
+    page = '''---
+const products = [{name: "A", asin: "B000000001", rating: 4.5, reviewCount: 100}];
+{
+  const products = [{name: "B", asin: "B000000002", rating: 4.1, reviewCount: 200}];
+}
+const fallbacks = {"B000000003": {"rating": 4.0, "reviewCount": 300}};
+const fallbacks = {"B000000004": {"rating": 3.9, "reviewCount": 400}};
+const extra = [{name: "C", asin: "B000000003"}, {name: "D", asin: "B000000004"}];
+---
+'''
+    products = extract_products(page)
+    assert [(p['asin'], p['rating'], p['reviewCount']) for p in products] == [
+        ('B000000001', 4.5, 100),
+        ('B000000002', 4.1, 200),
+        ('B000000003', 4.0, 300),
+        ('B000000004', 3.9, 400),
+    ]
+
+
+def test_code_is_not_data_and_no_frontmatter():
+    assert extract_products('const x = { asin: product.asin, name: p.name };') == []
+    assert extract_products('<p>No frontmatter</p>') == []
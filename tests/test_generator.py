@@ -0,0 +1,43 @@
+"""
+Générateur - une page dont les entrées n'ont pas changé n'est ni rendue ni réécrite
+"""
+
+from glowpicked.manifest import GeneratorManifest
+from glowpicked.page_index import PageIndex
+
+BUDGET = [{'name': 'Budget A', 'asin': 'B0000000A1', 'rating': 4.5, 'reviewCount': 1500,
+           'pros': ['Cheap'], 'con': 'Small'}]
+LUXURY = [{'name': 'Luxury B', 'asin': 'B0000000B2', 'rating': 4.7, 'reviewCount': 2500,
+           'pros': ['Rich'], 'con': 'Pricey'}]
+CATEGORIES = {'serums': {'budget': [{'asin': 'B0000000A1', 'name': 'Budget A'}],
+                         'luxury': [{'asin': 'B0000000B2', 'name': 'Luxury B'}]}}
+
+
+def _render(generator, tmp_path, manifest):
+    return generator.render_pages(CATEGORIES, {}, tmp_path / 'reviews', PageIndex(tmp_path / 'page-index.json'),
+                                  manifest)
+
+
+def test_unchanged_inputs_are_not_rendered(tmp_path, monkeypatch, generator):
+    reviews = tmp_path / 'reviews'
+    reviews.mkdir()
+    page = reviews / 'serums.astro'
+    page.write_text(generator.generate_dynamic_page_template('serums', 'Old', 'Old.', BUDGET, LUXURY))
+    manifest = GeneratorManifest(tmp_path / 'manifest.json')
+    assert _render(generator, tmp_path, manifest)['written'] == 1
+    written = page.read_text()
+    mtime = page.stat().st_mtime_ns
+
+    def fail(*args):
+        raise AssertionError("page rendue malgré des entrées inchangées")
+
+    render = generator.generate_dynamic_page_template
+    monkeypatch.setattr(generator, 'generate_dynamic_page_template', fail)
+    assert _render(generator, tmp_path, manifest) == {'written': 0, 'unchanged': 1, 'errors': 0}
+    assert page.stat().st_mtime_ns == mtime
+
+    # Edited by hand since: rendered again and restored
+    monkeypatch.setattr(generator, 'generate_dynamic_page_template', render)
+    page.write_text(written.replace('Budget A', 'Budget Z'))
+    assert _render(generator, tmp_path, manifest)['written'] == 1
+    assert page.read_text() == written
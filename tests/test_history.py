@@ -0,0 +1,146 @@
+"""
+Historique des vraies données - as-of à travers les keyframes, vue matérialisée identique au JSON
+"""
+
+import json
+import random
+import shutil
+import subprocess
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+from conftest import ROOT
+from glowpicked.history import KEYFRAME_EVERY, NoSnapshotError, ReviewHistory, index_path, main
+
+REAL_DATA = ROOT / 'data' / 'real-review-counts.json'
+
+
+def _weeks(count, start=date(2026, 1, 5)):
+    return [(start + timedelta(weeks=week)).isoformat() for week in range(count)]
+
+
+def _random_walk(count, seed=7):
+    """Weekly snapshots with changed, unchanged, removed, added and unknown ASINs"""
+    rng = random.Random(seed)
+    data = {f'B{n:09d}': {'reviews': rng.randint(0, 50000), 'rating': rng.choice([3.9, 4.0, 4.35, 4.5, 5])}
+            for n in range(30)}
+    snapshots = []
+    next_asin = 30
+    for _ in range(count):
+        data = {asin: dict(value) for asin, value in data.items()}
+        for value in data.values():
+            if rng.random() < 0.3:
+                value['reviews'] = None if rng.random() < 0.1 else rng.randint(0, 50000)
+            if rng.random() < 0.2:
+                value['rating'] = rng.choice([3.9, 4.0, 4.35, 4.5, 5])
+        for asin in rng.sample(sorted(data), 2):
+            del data[asin]
+        data[f'B{next_asin:09d}'] = {'reviews': rng.randint(0, 50000), 'rating': 4.2}
+        next_asin += 1
+        snapshots.append(data)
+    return snapshots
+
+
+def test_as_of_across_keyframes(tmp_path):
+    dates = _weeks(3 * KEYFRAME_EVERY + 3)
+    snapshots = _random_walk(len(dates))
+    history = ReviewHistory(tmp_path / 'review-history.jsonl')
+    keyframes = [history.append(day, data) for day, data in zip(dates, snapshots)]
+    assert keyframes.count(True) == 4
+
+    reopened = ReviewHistory(tmp_path / 'review-history.jsonl')
+    for day, data in zip(dates, snapshots):
+        assert history.as_of(day) == data
+        assert reopened.as_of(day) == data
+        # Between two snapshots: still the previous one
+        assert history.as_of((date.fromisoformat(day) + timedelta(days=3)).isoformat()) == data
+    assert history.as_of('2025-12-31') == {}
+    assert history.as_of() == snapshots[-1]
+
+    # Index rebuilt from the history when missing
+    (tmp_path / 'review-history.idx').unlink()
+    rebuilt = ReviewHistory(tmp_path / 'review-history.jsonl')
+    assert rebuilt.index == history.index
+    assert rebuilt.as_of(dates[KEYFRAME_EVERY]) == snapshots[KEYFRAME_EVERY]
+
+
+def test_materialize_is_the_source_json(tmp_path):
+    source = REAL_DATA.read_text(encoding='utf-8')
+    history = ReviewHistory(tmp_path / 'review-history.jsonl')
+    history.append('2026-02-19', json.loads(source))
+    for day, data in zip(_weeks(KEYFRAME_EVERY + 1, date(2026, 2, 26)), _random_walk(KEYFRAME_EVERY + 1)):
+        history.append(day, data)
+
+    view = tmp_path / 'real-review-counts.json'
+    history.materialize(view, '2026-02-19')
+    assert view.read_text(encoding='utf-8') == source
+
+
+def test_integral_floats_written_as_js_does(tmp_path):
+    history = ReviewHistory(tmp_path / 'review-history.jsonl')
+    history.append('2026-01-05', {'B000000001': {'reviews': 120.0, 'rating': 4.0},
+                                  'B000000002': {'reviews': 7, 'rating': 4.35}})
+    assert '"rating":[4,4.35],"reviews":[120,7]' in (tmp_path / 'review-history.jsonl').read_text()
+
+    view = tmp_path / 'real-review-counts.json'
+    history.materialize(view)
+    assert view.read_text() == json.dumps({'B000000001': {'reviews': 120, 'rating': 4},
+                                           'B000000002': {'reviews': 7, 'rating': 4.35}}, indent=2)
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason="node absent")
+def test_js_materializes_the_same_bytes(tmp_path):
+    history = ReviewHistory(tmp_path / 'review-history.jsonl')
+    for day, data in zip(_weeks(KEYFRAME_EVERY + 3), _random_walk(KEYFRAME_EVERY + 3)):
+        history.append(day, data)
+    history.materialize(tmp_path / 'python.json')
+    Path(index_path(history.path)).unlink()  # rebuilt by the JS reader too
+
+    script = (f"import {{ ReviewHistory }} from {json.dumps((ROOT / 'scripts/lib/review-history.js').as_uri())};"
+              f"new ReviewHistory({json.dumps(str(history.path))}).materialize({json.dumps(str(tmp_path / 'js.json'))});")
+    subprocess.run(['node', '--input-type=module', '-e', script], check=True)
+    assert (tmp_path / 'js.json').read_bytes() == (tmp_path / 'python.json').read_bytes()
+
+
+@pytest.mark.parametrize('snapshots, date', [(0, None), (1, '2025-12-31')])
+def test_materialize_without_snapshot_keeps_the_json(tmp_path, monkeypatch, snapshots, date):
+    history_file = tmp_path / 'review-history.jsonl'
+    history = ReviewHistory(history_file)
+    for day, data in zip(_weeks(snapshots), _random_walk(snapshots)):
+        history.append(day, data)
+    view = tmp_path / 'real-review-counts.json'
+    source = REAL_DATA.read_text(encoding='utf-8')
+    view.write_text(source, encoding='utf-8')
+
+    with pytest.raises(NoSnapshotError):
+        history.materialize(view, date)
+    argv = ['history', '--history', str(history_file), '--real-data', str(view), 'materialize']
+    monkeypatch.setattr('sys.argv', argv + (['--date', date] if date else []))
+    with pytest.raises(SystemExit) as exit_info:
+        main()
+    assert exit_info.value.code != 0
+    assert view.read_text(encoding='utf-8') == source
+
+
+def test_audit_as_of_without_snapshot_fails(tmp_path, monkeypatch, audit):
+    monkeypatch.setattr('sys.argv', ['audit', '--real-data', str(REAL_DATA), '--as-of', '2026-03-02',
+                                     '--history', str(tmp_path / 'review-history.jsonl')])
+    with pytest.raises(SystemExit) as exit_info:
+        audit.main()
+    assert exit_info.value.code != 0
+
+
+def test_same_date_replaces_the_last_snapshot(tmp_path):
+    history = ReviewHistory(tmp_path / 'review-history.jsonl')
+    first, second, third = _random_walk(3)
+    history.append('2026-01-05', first)
+    history.append('2026-01-12', second)
+    history.append('2026-01-12', third)  # run restarted the same day
+    assert history.dates() == ['2026-01-05', '2026-01-12']
+    assert len((tmp_path / 'review-history.jsonl').read_text().splitlines()) == 2
+    reopened = ReviewHistory(tmp_path / 'review-history.jsonl')
+    assert reopened.index == history.index
+    assert reopened.as_of() == third
+    assert reopened.as_of('2026-01-05') == first
@@ -0,0 +1,43 @@
+"""
+Audit du HTML construit - reviewCount arrondi comme conservativeRoundDown()
+"""
+
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from conftest import ROOT
+from glowpicked.html_audit import conservative_round_down
+
+COUNTS = [0, 99, 100, 950, 999, 1000, 4200, 9999, 10000, 18000, 29000, 49999, 50000, 128765]
+
+
+def test_conservative_round_down():
+    assert [conservative_round_down(count) for count in COUNTS] == [
+        0, 0, 100, 900, 900, 1000, 4000, 9000, 10000, 15000, 25000, 45000, 50000, 120000]
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason="node absent")
+def test_conservative_round_down_matches_the_site():
+    module = (ROOT / 'src' / 'utils' / 'realProductData.js').as_uri()
+    script = (f"import {{ conservativeRoundDown }} from {json.dumps(module)};"
+              f"console.log(JSON.stringify({json.dumps(COUNTS)}.map(conservativeRoundDown)));")
+    output = subprocess.run(['node', '--input-type=module', '-e', script], check=True,
+                            capture_output=True, text=True).stdout
+    assert json.loads(output.splitlines()[-1]) == [conservative_round_down(count) for count in COUNTS]
+
+
+@pytest.mark.parametrize('site_reviews, real_reviews, error', [
+    (25000, 29000, False),  # rendered by the site, rounded down
+    (29000, 29000, False),  # exact count (hand-written page)
+    (15000, 18000, False),
+    (15000, 600, True),
+    (2100, 1200, False),    # within the 1000 reviews tolerance
+    (6000, 900, True),
+])
+def test_built_reviews_checked_against_rounded_count(audit, site_reviews, real_reviews, error):
+    product = {'asin': 'B000000001', 'rating': 4.6, 'reviewCount': site_reviews}
+    real_data = {'B000000001': {'rating': 4.6, 'reviews': real_reviews}}
+    assert audit.check_built_product(product, real_data) == (4.6, real_reviews, False, error)
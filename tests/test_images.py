@@ -0,0 +1,83 @@
+"""
+Images responsives - jamais agrandies, images inchangées ignorées, variantes orphelines supprimées
+"""
+
+import json
+
+import pytest
+
+Image = pytest.importorskip('PIL.Image')
+
+from glowpicked.images import VARIANTS_DIR, build_images, supported_formats  # noqa: E402
+
+
+@pytest.fixture
+def site(tmp_path):
+    images = tmp_path / 'images'
+    images.mkdir()
+    Image.new('RGB', (700, 350), (200, 120, 90)).save(images / 'wide.jpg')
+    Image.new('RGBA', (200, 100), (20, 140, 220, 128)).save(images / 'small.png')
+    Image.new('RGB', (1200, 630), (0, 0, 0)).save(images / 'og-default.jpg')
+    return images, tmp_path / 'responsive-images.json'
+
+
+def _variants(images):
+    return {path.name for path in (images / VARIANTS_DIR).iterdir()}
+
+
+def _metadata(path):
+    return json.loads(path.read_text(encoding='utf-8'))['images']
+
+
+def test_widths_never_upscaled(site):
+    images, metadata = site
+    result = build_images(images, metadata)
+    formats = supported_formats()
+    assert result['built'] == ['/images/small.png', '/images/wide.jpg']
+    assert result['formats'] == formats
+
+    entries = _metadata(metadata)
+    assert set(entries) == {'/images/small.png', '/images/wide.jpg'}  # og-default left alone
+    for url, widths in (('/images/wide.jpg', [320, 480, 640, 700]), ('/images/small.png', [200])):
+        entry = entries[url]
+        assert entry['lqip'].startswith('data:image/')
+        assert set(entry['srcset']) == set(formats)
+        for fmt in formats:
+            assert [int(item.rsplit(' ', 1)[1][:-1]) for item in entry['srcset'][fmt].split(', ')] == widths
+        for name in entry['files']:
+            with Image.open(images / VARIANTS_DIR / name) as variant:
+                width = int(name.rsplit('-', 1)[1].split('.')[0])
+                assert variant.width == width <= entry['width']
+    assert _variants(images) == {name for entry in entries.values() for name in entry['files']}
+
+
+def test_second_run_skips_everything(site):
+    images, metadata = site
+    build_images(images, metadata)
+    mtimes = {path.name: path.stat().st_mtime_ns for path in (images / VARIANTS_DIR).iterdir()}
+
+    result = build_images(images, metadata)
+    assert result['built'] == []
+    assert result['skipped'] == 2
+    assert result['removed'] == []
+    assert result['metadata_written'] is False
+    assert {path.name: path.stat().st_mtime_ns for path in (images / VARIANTS_DIR).iterdir()} == mtimes
+
+
+def test_unreferenced_variants_removed(site):
+    images, metadata = site
+    build_images(images, metadata)
+    before = _metadata(metadata)
+    stray = images / VARIANTS_DIR / 'old-320.deadbeef.webp'
+    stray.write_bytes(b'')
+    (images / 'small.png').unlink()
+    Image.new('RGB', (700, 350), (10, 10, 10)).save(images / 'wide.jpg')
+
+    result = build_images(images, metadata)
+    after = _metadata(metadata)
+    assert result['built'] == ['/images/wide.jpg']
+    assert set(result['removed']) == ({stray.name} | set(before['/images/small.png']['files'])
+                                      | set(before['/images/wide.jpg']['files']))
+    assert set(after) == {'/images/wide.jpg'}
+    assert after['/images/wide.jpg']['hash'] != before['/images/wide.jpg']['hash']
+    assert _variants(images) == set(after['/images/wide.jpg']['files'])
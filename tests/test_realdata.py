@@ -0,0 +1,45 @@
+"""
+Sidecar binaire - aller-retour exact, refus des valeurs non représentables
+"""
+
+import json
+
+import pytest
+
+from glowpicked.realdata import RealDataStore, SidecarValueError, build_sidecar, sidecar_path
+
+DATA = {
+    'B000000001': {'reviews': 12000, 'rating': 4.35},
+    'B000000002': {'reviews': 0, 'rating': 4},
+    'B000000003': {'reviews': None, 'rating': None},
+    'B000000004': None,
+}
+
+
+def _write(tmp_path, data):
+    path = tmp_path / 'real-review-counts.json'
+    path.write_text(json.dumps(data))
+    return path
+
+
+def test_round_trip(tmp_path):
+    store = RealDataStore(build_sidecar(_write(tmp_path, DATA)))
+    assert dict(store.items()) == DATA
+    assert isinstance(store['B000000002']['rating'], int)
+    store.close()
+
+
+@pytest.mark.parametrize('entry', [
+    {'reviews': 10, 'rating': 4.355},       # 3 decimals would be rounded
+    {'reviews': 10, 'rating': 700},         # > u16 / 100
+    {'reviews': 2 ** 32, 'rating': 4.5},    # > u32
+    {'reviews': -1, 'rating': 4.5},
+    {'reviews': 10.5, 'rating': 4.5},
+    {'reviews': 10, 'rating': '4.5'},
+])
+def test_unrepresentable_values_are_refused_before_writing(tmp_path, entry):
+    path = _write(tmp_path, {'B000000001': entry})
+    with pytest.raises(SidecarValueError, match='B000000001'):
+        build_sidecar(path)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['real-review-counts.json']
+    assert not (tmp_path / sidecar_path(path)).exists()
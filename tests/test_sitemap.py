@@ -0,0 +1,39 @@
+"""
+Sitemap - lastmod des pages statiques = dernier commit de la source, pas la date du checkout
+"""
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from glowpicked.sitemap import static_entries
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason="git absent")
+
+
+def _git(cwd, *args, date=None):
+    env = {**os.environ, 'GIT_AUTHOR_NAME': 't', 'GIT_AUTHOR_EMAIL': 't@t', 'GIT_COMMITTER_NAME': 't',
+           'GIT_COMMITTER_EMAIL': 't@t'}
+    if date:
+        env.update(GIT_AUTHOR_DATE=f'{date}T12:00:00', GIT_COMMITTER_DATE=f'{date}T12:00:00')
+    subprocess.run(['git', *args], cwd=cwd, env=env, check=True, capture_output=True)
+
+
+def test_static_lastmod_is_the_last_commit(tmp_path):
+    pages = tmp_path / 'pages'
+    pages.mkdir()
+    _git(tmp_path, 'init', '-q')
+    (pages / 'about.astro').write_text('<h1>About</h1>')
+    (pages / 'terms.astro').write_text('<h1>Terms</h1>')
+    _git(tmp_path, 'add', '.')
+    _git(tmp_path, 'commit', '-q', '-m', 'pages', date='2026-01-05')
+    (pages / 'about.astro').touch()  # fresh checkout: mtime = now, content unchanged
+    (pages / 'terms.astro').write_text('<h1>Terms v2</h1>')  # edited, not committed yet
+
+    lastmod = {loc: date for loc, date, _, _ in static_entries(pages, '2026-02-01', 'https://x')}
+    assert lastmod['https://x/about/'] == '2026-01-05'
+    assert lastmod['https://x/terms/'] not in (None, '2026-01-05')  # mtime
+    assert lastmod['https://x/privacy-policy/'] is None  # no source
+    assert lastmod['https://x/'] == '2026-02-01'  # lists the review pages
@@ -0,0 +1,54 @@
+"""
+Audit --watch - un seul reporter pour toute la session
+"""
+
+import csv
+import io
+import json
+
+import pytest
+
+PAGE = '---\nconst products = [{name: "A", asin: "B000000001", rating: %s, reviewCount: 1000}];\n---\n'
+
+
+def _session(tmp_path, audit, monkeypatch, output_format, edits):
+    reviews = tmp_path / 'reviews'
+    reviews.mkdir()
+    page = reviews / 'serums.astro'
+    page.write_text(PAGE % '4.5')
+    real_path = tmp_path / 'real-review-counts.json'
+    real_path.write_text(json.dumps({'B000000001': {'rating': 4.5, 'reviews': 1000}}))
+
+    def batches(dirs):
+        for rating in edits:
+            page.write_text(PAGE % rating)
+            yield {page.resolve()}
+    monkeypatch.setattr(audit, 'watch_batches', batches)
+    out = io.StringIO()
+    audit.watch_audit(reviews, real_path, output_format, out)
+    return out.getvalue()
+
+
+def test_csv_header_written_once_across_batches(tmp_path, audit, monkeypatch):
+    output = _session(tmp_path, audit, monkeypatch, 'csv', ['4.0', '4.5'])
+    rows = list(csv.DictReader(io.StringIO(output)))
+    assert output.count('type,file,') == 1
+    assert [row['type'] for row in rows] == ['product', 'summary'] * 3
+    assert [row['status'] for row in rows if row['type'] == 'product'] == ['ok', 'error', 'ok']
+
+
+def test_text_details_list_only_the_batch_errors(tmp_path, audit, monkeypatch):
+    output = _session(tmp_path, audit, monkeypatch, 'text', ['4.0', '4.5'])
+    runs = output.split('📊 RÉSUMÉ AUDIT COMPLET')[1:]
+    assert ['ERREURS DÉTAILLÉES' in run for run in runs] == [False, True, False]
+
+
+@pytest.mark.parametrize('flags', [['-j', '4'], ['--cache'], ['--as-of', '2026-03-02'], ['--built'],
+                                   ['--profile'], ['--columnar']])
+def test_watch_rejects_options_it_cannot_honor(audit, monkeypatch, capsys, flags):
+    monkeypatch.setattr('sys.argv', ['audit', '--watch', *flags])
+    monkeypatch.setattr(audit, 'watch_audit', lambda *args: pytest.fail("watch démarré"))
+    with pytest.raises(SystemExit) as exit_info:
+        audit.main()
+    assert exit_info.value.code == 2
+    assert flags[0].replace('-j', '--jobs') in capsys.readouterr().err